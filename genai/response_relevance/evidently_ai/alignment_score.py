@@ -1,9 +1,14 @@
 # Here, is an example of how to generate alignment_score using evidently.ai. This works by generating embedding for both ground_truth, and response using a open-source deep learning encoder model.
 
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import pandas as pd
 from evidently.descriptors import SemanticSimilarity
 from evidently.report import Report
 from evidently.metric_preset import TextEvals
+from utils.evidently_results import EvidentlyResult
 
 # Dummy data
 assistant_log = [
@@ -28,6 +33,6 @@ report = Report(metrics=[
 report.run(reference_data = None, current_data = assistant_log)
 
 # Extracting the alignment score from the 
-alignment_score = float(report.as_dict()["metrics"][0]["result"]["current_characteristics"]["mean"])
+alignment_score = EvidentlyResult(report).metric_float(0, "current_characteristics", "mean")
 print(alignment_score)
 
@@ -0,0 +1,83 @@
+import numpy as np
+from scipy import stats
+
+from predictive.bootstrap import weighted_bincount
+from predictive.drift_engine import DEFAULT_THRESHOLDS, bin_codes, binned_drift_scores, count_layout
+
+
+def _replicate_scores(reference_counts, codes, starts, weights, stattest: str) -> np.ndarray:
+    # Binned drift score of every bootstrap replicate, one (replicates x columns) matrix
+    replicates = weights.shape[0]
+    sizes = np.diff(starts)
+    current_counts = np.empty((replicates, starts[-1]))
+    for i in range(len(sizes)):
+        valid = codes[i] >= 0
+        current_counts[:, starts[i]:starts[i + 1]] = weighted_bincount(codes[i][valid] - starts[i], weights[:, valid], sizes[i])
+    tiled_starts = np.r_[(starts[:-1] + starts[-1] * np.arange(replicates)[:, None]).ravel(), starts[-1] * replicates]
+    scores = binned_drift_scores(np.tile(reference_counts, replicates), current_counts.ravel(), tiled_starts, stattest)
+    return scores.reshape(replicates, len(sizes))
+
+
+def adaptive_drift(profile, current, stattest: str = "psi", stattest_threshold: float = None, columns=None, initial_size: int = 1000, growth: int = 4, confidence: float = 0.95, replicates: int = 50, random_state=None) -> dict:
+    """
+    Compute binned drift against a reference profile on a growing random sample of the current data.
+
+    The current rows are shuffled once, so every prefix is a uniform random sample, like a reservoir that keeps
+    growing. All the columns are scored on the first `initial_size` rows. A column is settled when its score is
+    far enough from the threshold: more than the Poisson-bootstrap standard error times the `confidence` quantile
+    of the normal distribution, plus the bootstrap estimate of the small-sample bias. The other columns are scored
+    again on a sample `growth` times larger, up to the full current data, where every column is settled.
+
+    Parameters:
+    - profile (ReferenceProfile): Profile of the reference data.
+    - current (pd.DataFrame): Current data.
+    - stattest (str): "psi", "kl_div" or "jensenshannon". Defaults to "psi".
+    - stattest_threshold (float, optional): Drift threshold. Defaults to Evidently's threshold of the stattest.
+    - columns (list, optional): Columns to score. Defaults to the profiled columns found in `current`.
+    - initial_size (int): Rows of the first sample. Defaults to 1,000.
+    - growth (int): Factor between two sample sizes. Defaults to 4.
+    - confidence (float): Probability that a settled decision is the one of the full sample. Defaults to 0.95.
+    - replicates (int): Bootstrap replicates per round. Defaults to 50.
+    - random_state (int or np.random.Generator, optional): Seed of the sample and of the bootstrap.
+
+    Returns:
+    - dict: Column name as key and, as value, the fields of Evidently's `drift_by_columns` (`drift_score`,
+      `drift_detected`, `stattest_name`, `stattest_threshold`) with `sample_size`, the rows the decision was
+      taken on, and `score_std`, the bootstrap standard error of the score (0 on the full data).
+    """
+    if columns is None:
+        columns = [name for name in profile.columns if name in current.columns]
+    threshold = DEFAULT_THRESHOLDS[stattest] if stattest_threshold is None else stattest_threshold
+    z = stats.norm.ppf(confidence)
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(current))
+
+    drift_by_columns, active, size = {}, list(columns), initial_size
+    while active:
+        size = min(size, len(current))
+        sample = current.iloc[order[:size]]
+        reference_counts, starts, categories = count_layout(profile, sample, active)
+        codes = bin_codes(profile, sample, active, starts, categories)
+        valid = codes >= 0
+        scores = binned_drift_scores(reference_counts, np.bincount(codes[valid], minlength=starts[-1]), starts, stattest)
+        if size == len(current):
+            std, settled = np.zeros(len(active)), np.ones(len(active), dtype=bool)
+        else:
+            weights = rng.poisson(1.0, size=(replicates, size)).astype(np.float64)
+            replicate_scores = _replicate_scores(reference_counts, codes, starts, weights, stattest)
+            std = np.nanstd(replicate_scores, axis=0)
+            bias = np.nanmean(replicate_scores, axis=0) - scores
+            settled = np.abs(scores - threshold) > z * std + np.abs(bias)
+
+        for name, score, score_std in zip(np.array(active, dtype=object)[settled], scores[settled], std[settled]):
+            drift_by_columns[name] = {
+                "drift_score": float(score),
+                "drift_detected": bool(score >= threshold),
+                "stattest_name": stattest,
+                "stattest_threshold": threshold,
+                "sample_size": size,
+                "score_std": float(score_std),
+            }
+        active = [name for name, done in zip(active, settled) if not done]
+        size *= growth
+    return {name: drift_by_columns[name] for name in columns}
@@ -0,0 +1,200 @@
+import numpy as np
+
+from predictive.classification_engine import compute_classification_metrics, metrics_from_confusion
+from predictive.regression_engine import compute_regression_metrics
+
+
+def poisson_weight_blocks(n_rows: int, replicates: int = 200, block_size: int = 20_000, random_state=None):
+    """
+    Yield Poisson(1) bootstrap weights block by block.
+
+    Drawing an independent Poisson(1) count per row and replicate approximates resampling the rows with replacement,
+    but the replicates can be computed together as weighted sums and the rows can be processed in blocks.
+
+    Parameters:
+    - n_rows (int): Number of rows of the data.
+    - replicates (int): Number of bootstrap replicates B. Defaults to 200.
+    - block_size (int): Number of rows per block, memory is O(B x block_size). Defaults to 20,000.
+    - random_state (int or np.random.Generator, optional): Seed for reproducible intervals.
+
+    Returns:
+    - generator: `(start, stop, weights)` tuples, `weights` being a (B x rows in block) float matrix.
+    """
+    rng = np.random.default_rng(random_state)
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        yield start, stop, rng.poisson(1.0, size=(replicates, stop - start)).astype(np.float64)
+
+
+def weighted_bincount(codes, weights, n_codes: int) -> np.ndarray:
+    """
+    Count integer codes once per row of weights, with a single bincount for all the replicates.
+
+    Replicate b uses the codes offset by b * n_codes, so the counts of every replicate land in their own block.
+
+    Parameters:
+    - codes (np.ndarray): Codes in [0, n_codes), one per row of data.
+    - weights (np.ndarray): (replicates x rows) weights, e.g. Poisson bootstrap weights.
+    - n_codes (int): Number of distinct codes.
+
+    Returns:
+    - np.ndarray: (replicates x n_codes) weighted counts.
+    """
+    replicates = weights.shape[0]
+    offsets = (np.arange(replicates, dtype=np.int64) * n_codes)[:, None]
+    counts = np.bincount((offsets + codes[None, :]).ravel(), weights=weights.ravel(), minlength=replicates * n_codes)
+    return counts.reshape(replicates, n_codes)
+
+
+def _interval(point, values, confidence: float) -> dict:
+    values = np.asarray([np.nan if value is None else value for value in values], dtype=float)
+    alpha = (1.0 - confidence) / 2.0
+    if point is None or np.all(np.isnan(values)):
+        return {"value": point, "lower": None, "upper": None}
+    lower, upper = np.nanquantile(values, [alpha, 1.0 - alpha])
+    return {"value": point, "lower": float(lower), "upper": float(upper)}
+
+
+def bootstrap_classification_metrics(target, prediction, prediction_proba=None, pos_label=1, replicates: int = 200, confidence: float = 0.95, block_size: int = 20_000, bins: int = 1000, random_state=None) -> dict:
+    """
+    Compute bootstrap confidence intervals of the classification metrics with Poisson weights.
+
+    All the replicates are computed in one pass over the rows: each block of rows adds its weighted confusion
+    counts (and, with probabilities, its weighted score histogram and log loss) to B running totals.
+    The ROC AUC of the replicates is estimated from score histograms with `bins` bins.
+
+    Parameters:
+    - target (array-like): True class labels.
+    - prediction (array-like): Predicted class labels.
+    - prediction_proba (array-like, optional): Probabilities of `pos_label` for a binary problem.
+    - pos_label (int or str): Positive class of a binary problem. Defaults to 1.
+    - replicates (int): Number of bootstrap replicates. Defaults to 200.
+    - confidence (float): Confidence level of the intervals. Defaults to 0.95.
+    - block_size (int): Rows processed per block. Defaults to 20,000.
+    - bins (int): Score histogram bins used for the ROC AUC replicates. Defaults to 1000.
+    - random_state (int, optional): Seed for reproducible intervals.
+
+    Returns:
+    - dict: For each metric of `compute_classification_metrics`, a dict with the point `value` and the `lower`
+      and `upper` bounds of the interval.
+    """
+    target = np.asarray(target)
+    prediction = np.asarray(prediction)
+    point = compute_classification_metrics(target, prediction, prediction_proba, pos_label=pos_label)
+
+    labels = np.union1d(target, prediction)
+    n_labels = len(labels)
+    codes = np.searchsorted(labels, target) * n_labels + np.searchsorted(labels, prediction)
+    matrices = np.zeros((replicates, n_labels * n_labels))
+
+    if prediction_proba is not None:
+        is_positive = target == pos_label
+        scores = np.asarray(prediction_proba, dtype=float)
+        score_bins = np.clip(np.floor(scores * bins).astype(np.int64), 0, bins - 1)
+        # Positive and negative rows of a bin get adjacent codes
+        score_codes = score_bins * 2 + is_positive
+        eps = np.finfo(np.float64).eps
+        losses = -np.log(np.clip(np.where(is_positive, scores, 1.0 - scores), eps, 1 - eps))
+        histograms = np.zeros((replicates, bins * 2))
+        loss_sums = np.zeros(replicates)
+        weight_sums = np.zeros(replicates)
+
+    for start, stop, weights in poisson_weight_blocks(len(target), replicates, block_size, random_state):
+        matrices += weighted_bincount(codes[start:stop], weights, n_labels * n_labels)
+        if prediction_proba is not None:
+            histograms += weighted_bincount(score_codes[start:stop], weights, bins * 2)
+            loss_sums += weights @ losses[start:stop]
+            weight_sums += weights.sum(axis=1)
+
+    replicate_metrics = [
+        metrics_from_confusion(matrix.reshape(n_labels, n_labels), labels, pos_label=pos_label)
+        for matrix in matrices
+    ]
+    result = {
+        name: _interval(point[name], [metrics[name] for metrics in replicate_metrics], confidence)
+        for name in replicate_metrics[0]
+    }
+
+    roc_auc_values = log_loss_values = [None] * replicates
+    if prediction_proba is not None:
+        negative, positive = histograms[:, 0::2], histograms[:, 1::2]
+        pairs = positive.sum(axis=1) * negative.sum(axis=1)
+        negative_below = np.cumsum(negative, axis=1) - negative
+        concordant = (positive * negative_below).sum(axis=1) + 0.5 * (positive * negative).sum(axis=1)
+        roc_auc_values = np.divide(concordant, pairs, out=np.full(replicates, np.nan), where=pairs > 0)
+        log_loss_values = np.divide(loss_sums, weight_sums, out=np.full(replicates, np.nan), where=weight_sums > 0)
+    result["roc_auc"] = _interval(point["roc_auc"], roc_auc_values, confidence)
+    result["log_loss"] = _interval(point["log_loss"], log_loss_values, confidence)
+    return result
+
+
+def _regression_from_sums(sums) -> dict:
+    # Every regression metric from (weighted) sums, vectorized over the replicates
+    count = sums["count"]
+    mean_error = sums["error"] / count
+    mean_target = sums["target"] / count
+    squared_error = sums["squared_error"]
+    total_squares = sums["squared_target"] - count * mean_target ** 2
+    error_variance = squared_error - count * mean_error ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "mean_error": mean_error,
+            "mean_abs_error": sums["abs_error"] / count,
+            "mean_abs_perc_error": 100.0 * sums["abs_perc_error"] / count,
+            "abs_error_max": sums["abs_error_max"],
+            "rmse": np.sqrt(squared_error / count),
+            "r2_score": 1.0 - squared_error / total_squares,
+            "error_std": np.sqrt(error_variance / (count - 1)),
+        }
+
+
+def bootstrap_regression_metrics(target, prediction, replicates: int = 200, confidence: float = 0.95, block_size: int = 20_000, random_state=None) -> dict:
+    """
+    Compute bootstrap confidence intervals of the regression metrics with Poisson weights.
+
+    The residuals are computed once, then every block of rows adds its weighted sums of errors, absolute errors,
+    squared errors and targets to B running totals, from which all the metrics of every replicate are derived.
+    The metrics follow Evidently's `RegressionQualityMetric` (error is prediction - target, MAPE is in percent).
+
+    Parameters:
+    - target (array-like): True values.
+    - prediction (array-like): Predicted values.
+    - replicates (int): Number of bootstrap replicates. Defaults to 200.
+    - confidence (float): Confidence level of the intervals. Defaults to 0.95.
+    - block_size (int): Rows processed per block. Defaults to 20,000.
+    - random_state (int, optional): Seed for reproducible intervals.
+
+    Returns:
+    - dict: mean_error, mean_abs_error, mean_abs_perc_error, abs_error_max, rmse, r2_score and error_std,
+      each a dict with the point `value` and the `lower` and `upper` bounds of the interval.
+    """
+    target = np.asarray(target, dtype=float)
+    prediction = np.asarray(prediction, dtype=float)
+    finite = np.isfinite(target) & np.isfinite(prediction)
+    target, prediction = target[finite], prediction[finite]
+    error = prediction - target
+    abs_error = np.abs(error)
+    abs_perc_error = abs_error / np.maximum(target, np.finfo(np.float64).eps)
+    columns = {
+        "count": np.ones_like(error),
+        "error": error,
+        "abs_error": abs_error,
+        "abs_perc_error": abs_perc_error,
+        "squared_error": error ** 2,
+        "target": target,
+        "squared_target": target ** 2,
+    }
+    values = np.vstack(list(columns.values())).T
+
+    point = compute_regression_metrics(target, prediction)
+
+    sums = np.zeros((replicates, len(columns)))
+    abs_error_max = np.zeros(replicates)
+    for start, stop, weights in poisson_weight_blocks(len(error), replicates, block_size, random_state):
+        sums += weights @ values[start:stop]
+        abs_error_max = np.maximum(abs_error_max, np.where(weights > 0, abs_error[start:stop], 0.0).max(axis=1))
+
+    replicate_sums = dict(zip(columns, sums.T))
+    replicate_sums["abs_error_max"] = abs_error_max
+    replicate_values = _regression_from_sums(replicate_sums)
+    return {name: _interval(point[name], replicate_values[name], confidence) for name in replicate_values}
@@ -0,0 +1,475 @@
+from typing import Optional
+
+import numpy as np
+
+
+def confusion_matrix(target, prediction, labels=None) -> tuple:
+    """
+    Build the confusion matrix of a label prediction in a single vectorized pass.
+
+    Parameters:
+    - target (array-like): True class labels.
+    - prediction (array-like): Predicted class labels.
+    - labels (array-like, optional): Class labels to index the matrix by, they are sorted like Evidently does.
+      Defaults to the union of the labels found in `target` and `prediction`.
+
+    Returns:
+    - tuple: `(matrix, labels)` where `matrix[i, j]` counts the rows of true class `labels[i]` predicted as `labels[j]`.
+    """
+    target = np.asarray(target)
+    prediction = np.asarray(prediction)
+    if labels is None:
+        labels = np.union1d(target, prediction)
+    labels = np.sort(np.asarray(labels))
+    n_labels = len(labels)
+
+    target_idx = np.searchsorted(labels, target)
+    prediction_idx = np.searchsorted(labels, prediction)
+    matrix = np.bincount(target_idx * n_labels + prediction_idx, minlength=n_labels * n_labels)
+    return matrix.reshape(n_labels, n_labels), labels
+
+
+def _safe_divide(numerator, denominator):
+    # sklearn reports 0.0 (with a warning) for an undefined ratio, mirror that without the warning
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+
+def metrics_from_confusion(matrix, labels, pos_label=1) -> dict:
+    """
+    Derive the label based classification metrics from a confusion matrix.
+
+    Binary problems are scored for `pos_label` and multiclass problems are macro averaged, exactly like
+    Evidently's `ClassificationQualityMetric`. The rates (tpr, tnr, fpr, fnr) are only defined for binary problems
+    and are None otherwise.
+
+    Parameters:
+    - matrix (np.ndarray): Square confusion matrix, rows are true classes and columns predicted classes.
+    - labels (array-like): Class labels in the order of the matrix rows.
+    - pos_label (int or str): Positive class of a binary problem. Defaults to 1.
+
+    Returns:
+    - dict: accuracy, precision, recall, f1, tpr, tnr, fpr and fnr.
+
+    Raises:
+    - ValueError: If the problem is binary and `pos_label` is not one of `labels`.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    labels = list(np.asarray(labels).tolist())
+    if len(labels) == 2 and pos_label not in labels:
+        raise ValueError(f"pos_label={pos_label!r} is not one of the labels found {labels}, pass the positive class as pos_label.")
+    total = matrix.sum()
+
+    true_positive = np.diag(matrix)
+    false_positive = matrix.sum(axis=0) - true_positive
+    false_negative = matrix.sum(axis=1) - true_positive
+    true_negative = total - (true_positive + false_positive + false_negative)
+
+    precision = _safe_divide(true_positive, true_positive + false_positive)
+    recall = _safe_divide(true_positive, true_positive + false_negative)
+    f1 = _safe_divide(2 * true_positive, 2 * true_positive + false_positive + false_negative)
+
+    result = {
+        "accuracy": float(true_positive.sum() / total) if total else 0.0,
+        "tpr": None,
+        "tnr": None,
+        "fpr": None,
+        "fnr": None,
+    }
+    if len(labels) == 2:
+        pos = labels.index(pos_label)
+        tp, tn, fp, fn = true_positive[pos], true_negative[pos], false_positive[pos], false_negative[pos]
+        result.update({
+            "precision": float(precision[pos]),
+            "recall": float(recall[pos]),
+            "f1": float(f1[pos]),
+            "tpr": float(_safe_divide(tp, tp + fn)),
+            "tnr": float(_safe_divide(tn, tn + fp)),
+            "fpr": float(_safe_divide(fp, fp + tn)),
+            "fnr": float(_safe_divide(fn, fn + tp)),
+        })
+    else:
+        result.update({
+            "precision": float(precision.mean()),
+            "recall": float(recall.mean()),
+            "f1": float(f1.mean()),
+        })
+    return result
+
+
+def roc_auc(y_true, scores) -> Optional[float]:
+    """
+    Compute the binary ROC AUC with one sort, as the normalized Mann-Whitney U statistic.
+
+    Tied scores get their average rank, which gives the same value as `sklearn.metrics.roc_auc_score`.
+
+    Parameters:
+    - y_true (array-like): Boolean or 0/1 array, True for the positive class.
+    - scores (array-like): Positive class probabilities or scores.
+
+    Returns:
+    - float: The ROC AUC, or None when only one class is present.
+    """
+    y_true = np.asarray(y_true, dtype=bool)
+    scores = np.asarray(scores, dtype=float)
+    n_pos = int(y_true.sum())
+    n_neg = len(y_true) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return None
+
+    order = np.argsort(scores, kind="mergesort")
+    sorted_scores = scores[order]
+    # Average the 1-based ranks over every run of tied scores
+    run_starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    run_ends = np.r_[run_starts[1:], len(sorted_scores)]
+    run_ranks = (run_starts + run_ends + 1) / 2.0
+    ranks = np.repeat(run_ranks, run_ends - run_starts)
+
+    positive_rank_sum = ranks[y_true[order]].sum()
+    return float((positive_rank_sum - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+
+def log_loss(y_true, scores) -> float:
+    """
+    Compute the binary log loss with probabilities clipped to [eps, 1 - eps], like `sklearn.metrics.log_loss`.
+
+    Parameters:
+    - y_true (array-like): Boolean or 0/1 array, True for the positive class.
+    - scores (array-like): Positive class probabilities.
+
+    Returns:
+    - float: The mean negative log likelihood.
+    """
+    y_true = np.asarray(y_true, dtype=bool)
+    scores = np.asarray(scores, dtype=float)
+    eps = np.finfo(scores.dtype).eps
+    probability = np.where(y_true, scores, 1.0 - scores)
+    return float(-np.log(np.clip(probability, eps, 1 - eps)).mean())
+
+
+def compute_classification_metrics(target, prediction=None, prediction_proba=None, pos_label=1, threshold: float = 0.5) -> dict:
+    """
+    Compute every classification metric of the Evidently classification reports in one pass over the arrays.
+
+    The confusion matrix is built once and every label metric is read from it. When positive class probabilities
+    are passed, ROC AUC and log loss are computed from them as well, and they are thresholded into labels if no
+    label `prediction` is given.
+
+    Parameters:
+    - target (array-like): True class labels.
+    - prediction (array-like, optional): Predicted class labels.
+    - prediction_proba (array-like, optional): Probabilities of `pos_label` for a binary problem.
+    - pos_label (int or str): Positive class of a binary problem. Defaults to 1.
+    - threshold (float): Probability threshold used to derive labels from `prediction_proba`. Defaults to 0.5.
+
+    Returns:
+    - dict: accuracy, precision, recall, f1, tpr, tnr, fpr, fnr, roc_auc and log_loss, keyed like the
+      `["result"]["current"]` section of Evidently's `ClassificationQualityMetric`.
+    """
+    target = np.asarray(target)
+    if prediction is None:
+        if prediction_proba is None:
+            raise ValueError("Either prediction or prediction_proba has to be passed.")
+        labels = np.unique(target)
+        if len(labels) != 2:
+            raise ValueError("prediction_proba is only supported for binary classification.")
+        neg_label = labels[labels != pos_label][0]
+        prediction = np.where(np.asarray(prediction_proba) >= threshold, pos_label, neg_label)
+
+    matrix, labels = confusion_matrix(target, prediction)
+    result = metrics_from_confusion(matrix, labels, pos_label=pos_label)
+
+    result["roc_auc"] = None
+    result["log_loss"] = None
+    if prediction_proba is not None:
+        is_positive = target == pos_label
+        result["roc_auc"] = roc_auc(is_positive, prediction_proba)
+        result["log_loss"] = log_loss(is_positive, prediction_proba)
+    return result
+
+
+def threshold_sweep(y_true, scores, thresholds=None, max_points: int = None) -> dict:
+    """
+    Compute precision, recall, F1, TPR and FPR at every decision threshold with a single sort of the scores.
+
+    A row is predicted positive when its score is >= the threshold. The scores are sorted once and the TP/FP counts
+    of every threshold are read from their cumulative sums, which is O(n log n) for the whole sweep instead of
+    one full evaluation per threshold.
+
+    Parameters:
+    - y_true (array-like): Boolean or 0/1 array, True for the positive class.
+    - scores (array-like): Positive class probabilities or scores.
+    - thresholds (array-like, optional): Thresholds to evaluate. Defaults to every distinct score.
+    - max_points (int, optional): Keep only this many evenly spaced thresholds of the default sweep.
+
+    Returns:
+    - dict: Lists of `threshold`, `tp`, `fp`, `precision`, `recall`, `f1`, `tpr` and `fpr`, by decreasing threshold.
+    """
+    y_true = np.asarray(y_true, dtype=bool)
+    scores = np.asarray(scores, dtype=float)
+    order = np.argsort(-scores, kind="mergesort")
+    sorted_scores = scores[order]
+    # Cumulative counts with a leading 0, so that index k holds the counts of the k highest scores
+    tps = np.r_[0, np.cumsum(y_true[order])]
+    fps = np.r_[0, np.cumsum(~y_true[order])]
+
+    if thresholds is None:
+        # The last row of every run of tied scores, each run is one distinct threshold
+        n_selected = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1] + 1
+        if max_points is not None and len(n_selected) > max_points:
+            keep = np.unique(np.linspace(0, len(n_selected) - 1, max_points).round().astype(np.int64))
+            n_selected = n_selected[keep]
+        thresholds = sorted_scores[n_selected - 1]
+    else:
+        thresholds = np.sort(np.asarray(thresholds, dtype=float))[::-1]
+        n_selected = np.searchsorted(-sorted_scores, -thresholds, side="right")
+
+    tp = tps[n_selected]
+    fp = fps[n_selected]
+    positives = tps[-1]
+    negatives = fps[-1]
+    fn = positives - tp
+
+    recall = _safe_divide(tp, np.full(len(tp), positives))
+    return {
+        "threshold": thresholds.tolist(),
+        "tp": tp.tolist(),
+        "fp": fp.tolist(),
+        "precision": _safe_divide(tp, tp + fp).tolist(),
+        "recall": recall.tolist(),
+        "f1": _safe_divide(2 * tp, 2 * tp + fp + fn).tolist(),
+        "tpr": recall.tolist(),
+        "fpr": _safe_divide(fp, np.full(len(fp), negatives)).tolist(),
+    }
+
+
+def chunk_columns(chunk, columns) -> list:
+    """
+    Read columns of a chunk as numpy arrays.
+
+    Parameters:
+    - chunk: A (target, prediction, ...) tuple of arrays, a pandas DataFrame or a pyarrow Table/RecordBatch.
+    - columns (list): Columns to read from a DataFrame or Arrow chunk, ignored for tuples.
+
+    Returns:
+    - list: One numpy array per column, or per tuple item.
+    """
+    if isinstance(chunk, tuple):
+        return [np.asarray(values) for values in chunk]
+    if hasattr(chunk, "schema") and hasattr(chunk, "column"):
+        return [chunk.column(name).to_numpy(zero_copy_only=False) for name in columns]
+    return [chunk[name].to_numpy() for name in columns]
+
+
+def iter_parquet_batches(path: str, columns: list, batch_size: int = 1_000_000):
+    """
+    Yield the given columns of a Parquet file as pyarrow record batches, one row group slice at a time.
+
+    Parameters:
+    - path (str): Path of the Parquet file.
+    - columns (list): Columns to read, e.g. `["target", "prediction"]`.
+    - batch_size (int): Maximum number of rows per batch. Defaults to 1,000,000.
+
+    Returns:
+    - generator: pyarrow.RecordBatch objects that can be passed to the streaming accumulators.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+
+class ConfusionMatrixAccumulator:
+    """
+    Streaming confusion matrix for label predictions that never holds more than the per-class counts.
+
+    Feed it chunks of (target, prediction) with `update` or `consume`, combine partial results of several workers
+    with `merge`, and read the metrics at any point. The metrics are the same as `compute_classification_metrics`
+    over all the rows seen so far.
+
+    Parameters:
+    - target (str): Name of the target column in DataFrame and Arrow chunks. Defaults to "target".
+    - prediction (str): Name of the prediction column in DataFrame and Arrow chunks. Defaults to "prediction".
+
+    Example:
+    accumulator = ConfusionMatrixAccumulator()
+    accumulator.consume(pd.read_csv("predictions.csv", chunksize=1_000_000))
+    metrics = accumulator.metrics()
+    """
+
+    def __init__(self, target: str = "target", prediction: str = "prediction"):
+        self.target = target
+        self.prediction = prediction
+        self.labels = np.array([])
+        self.matrix = np.zeros((0, 0), dtype=np.int64)
+
+    def _align(self, labels):
+        # Grow the matrix when new labels show up, keeping the labels sorted like `confusion_matrix` does
+        labels = np.union1d(self.labels, labels) if len(self.labels) else np.sort(np.asarray(labels))
+        if len(labels) != len(self.labels):
+            matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+            if len(self.labels):
+                idx = np.searchsorted(labels, self.labels)
+                matrix[np.ix_(idx, idx)] = self.matrix
+            self.labels, self.matrix = labels, matrix
+
+    def update(self, target, prediction) -> "ConfusionMatrixAccumulator":
+        """Add a chunk of true and predicted labels."""
+        target = np.asarray(target)
+        prediction = np.asarray(prediction)
+        self._align(np.union1d(target, prediction))
+        matrix, _ = confusion_matrix(target, prediction, labels=self.labels)
+        self.matrix += matrix
+        return self
+
+    def consume(self, chunks) -> "ConfusionMatrixAccumulator":
+        """
+        Add every chunk of an iterable.
+
+        Chunks can be pandas DataFrames (e.g. `pd.read_csv(..., chunksize=...)`), pyarrow record batches
+        (e.g. `iter_parquet_batches`) or `(target, prediction)` tuples yielded by a generator.
+        """
+        for chunk in chunks:
+            target, prediction = chunk_columns(chunk, [self.target, self.prediction])[:2]
+            self.update(target, prediction)
+        return self
+
+    def merge(self, other: "ConfusionMatrixAccumulator") -> "ConfusionMatrixAccumulator":
+        """Add the counts of another accumulator, e.g. one filled by another worker, into this one."""
+        if len(other.labels):
+            self._align(other.labels)
+            idx = np.searchsorted(self.labels, other.labels)
+            self.matrix[np.ix_(idx, idx)] += other.matrix
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.matrix.sum())
+
+    def metrics(self, pos_label=1) -> dict:
+        """Return accuracy, precision, recall, f1, tpr, tnr, fpr and fnr of the rows seen so far."""
+        return metrics_from_confusion(self.matrix, self.labels, pos_label=pos_label)
+
+    def class_balance(self) -> dict:
+        """Return the number of rows of each true class."""
+        return {label: int(count) for label, count in zip(self.labels.tolist(), self.matrix.sum(axis=1))}
+
+    def class_balance_ratio(self) -> float:
+        """Return the ratio between the largest and the smallest true class, e.g. 4.0 for a 4:1 imbalance."""
+        counts = self.matrix.sum(axis=1)
+        counts = counts[counts > 0]
+        if len(counts) == 0:
+            return None
+        return float(counts.max() / counts.min())
+
+
+class ScoreHistogram:
+    """
+    Fixed-bin histogram of the positive class scores, kept separately for positive and negative rows.
+
+    Memory is O(bins) whatever the number of rows, histograms with the same bins can be merged across chunks and
+    workers, and the ROC AUC is estimated from the bin counts. Only pairs of a positive and a negative row falling
+    in the same bin cannot be ordered, which bounds the error of the estimate; more bins give a tighter bound.
+
+    Parameters:
+    - bins (int): Number of equal-width bins. Defaults to 1000.
+    - low (float): Lower edge of the score range. Defaults to 0.0.
+    - high (float): Upper edge of the score range. Defaults to 1.0.
+    """
+
+    def __init__(self, bins: int = 1000, low: float = 0.0, high: float = 1.0):
+        self.bins = bins
+        self.low = low
+        self.high = high
+        self.positive = np.zeros(bins, dtype=np.int64)
+        self.negative = np.zeros(bins, dtype=np.int64)
+
+    def update(self, y_true, scores) -> "ScoreHistogram":
+        """Add a chunk of rows. `y_true` is True (or 1) for the positive class, `scores` are its probabilities."""
+        y_true = np.asarray(y_true, dtype=bool)
+        scores = np.asarray(scores, dtype=float)
+        idx = np.floor((scores - self.low) / (self.high - self.low) * self.bins).astype(np.int64)
+        idx = np.clip(idx, 0, self.bins - 1)
+        self.positive += np.bincount(idx[y_true], minlength=self.bins)
+        self.negative += np.bincount(idx[~y_true], minlength=self.bins)
+        return self
+
+    def merge(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        """Add the counts of another histogram with the same bins."""
+        if (self.bins, self.low, self.high) != (other.bins, other.low, other.high):
+            raise ValueError("Only histograms with the same bins can be merged.")
+        self.positive += other.positive
+        self.negative += other.negative
+        return self
+
+    def roc_auc_error_bound(self) -> float:
+        """Return the largest possible absolute difference between `roc_auc()` and the exact ROC AUC."""
+        pairs = float(self.positive.sum()) * float(self.negative.sum())
+        if pairs == 0:
+            return None
+        return float(0.5 * np.dot(self.positive.astype(float), self.negative.astype(float)) / pairs)
+
+    def roc_auc(self, max_error: float = None) -> float:
+        """
+        Estimate the ROC AUC from the bin counts. Pairs sharing a bin count as ties.
+
+        Parameters:
+        - max_error (float, optional): Raise a ValueError if the error bound of the estimate is larger than this.
+
+        Returns:
+        - float: The estimated ROC AUC, or None when only one class has been seen.
+        """
+        positive = self.positive.astype(float)
+        negative = self.negative.astype(float)
+        pairs = positive.sum() * negative.sum()
+        if pairs == 0:
+            return None
+        error_bound = self.roc_auc_error_bound()
+        if max_error is not None and error_bound > max_error:
+            raise ValueError(f"ROC AUC error bound {error_bound:.6f} is larger than {max_error}, use more bins.")
+        negative_below = np.cumsum(negative) - negative
+        return float((np.dot(positive, negative_below) + 0.5 * np.dot(positive, negative)) / pairs)
+
+
+class LogLossAccumulator:
+    """
+    Streaming binary log loss. The per-chunk losses are added with Neumaier compensated summation, so the result
+    does not lose precision over billions of rows, and partial accumulators can be merged.
+
+    The probabilities are clipped to [eps, 1 - eps] like `log_loss`.
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+        self.count = 0
+
+    def _add(self, value: float):
+        total = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - total) + value
+        else:
+            self.compensation += (value - total) + self.total
+        self.total = total
+
+    def update(self, y_true, scores) -> "LogLossAccumulator":
+        """Add a chunk of rows. `y_true` is True (or 1) for the positive class, `scores` are its probabilities."""
+        y_true = np.asarray(y_true, dtype=bool)
+        if len(y_true):
+            self._add(log_loss(y_true, scores) * len(y_true))
+            self.count += len(y_true)
+        return self
+
+    def merge(self, other: "LogLossAccumulator") -> "LogLossAccumulator":
+        """Add the losses of another accumulator into this one."""
+        self._add(other.total)
+        self._add(other.compensation)
+        self.count += other.count
+        return self
+
+    def value(self) -> float:
+        """Return the mean log loss of the rows seen so far."""
+        if self.count == 0:
+            return None
+        return float((self.total + self.compensation) / self.count)
@@ -10,6 +10,7 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.datasets import load_iris
 from datetime import datetime
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
 
 # Load the iris dataset
 iris = load_iris()
@@ -39,7 +40,7 @@ classification_report = Report(metrics=[ClassificationPreset()])
 classification_report.run(reference_data=reference, current_data=current)
 
 # Extract the accuracy of the current dataset from the classification report
-current_accuracy = classification_report.as_dict()["metrics"][0]["result"]["current"]["accuracy"] * 100
+current_accuracy = EvidentlyResult(classification_report).metric_value(0, "current", "accuracy") * 100
 
 # Calling a function to add to a json file
 accuracy_info=get_metrics("accuracy_score",current_accuracy)
@@ -10,6 +10,7 @@ from evidently.metric_preset import ClassificationPreset
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.datasets import load_iris
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
 # Loading the iris dataset, converting it into a DataFrame, and adding the target label as a new column named 'target'
 iris = load_iris()
 dataset = pd.DataFrame(data=iris.data, columns=iris.feature_names)
@@ -37,7 +38,7 @@ classification_report = Report(metrics=[ClassificationPreset()])
 classification_report.run(reference_data=reference, current_data=current)
 
 # Extracting the f1 score from the classification report for the current dataset
-current_f1 = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["f1"])
+current_f1 = EvidentlyResult(classification_report).metric_float(0, "current", "f1")
 
 # Calling a function to add to a json file
 f1_score_dict=get_metrics("f1_score",current_f1)
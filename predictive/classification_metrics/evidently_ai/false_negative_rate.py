@@ -8,6 +8,7 @@ from evidently.metrics import ClassificationQualityMetric
 from sklearn import datasets
 from sklearn.ensemble import RandomForestClassifier
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
 # loading the breast cancer dataset
 dataset = datasets.load_breast_cancer(as_frame=True)
 dataset = dataset.frame
@@ -48,7 +49,7 @@ classification_report = Report(metrics=[ClassificationQualityMetric()])
 classification_report.run(reference_data=reference, current_data=current)
 
 # Extracting the False Negative Rate (FNR) for the current dataset
-current_fnr = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["fnr"]) * 100
+current_fnr = EvidentlyResult(classification_report).metric_float(0, "current", "fnr") * 100
 # Calling a function to add to a json file
 fnr_value_dict=get_metrics("fnr_value",current_fnr)
 '''
@@ -7,6 +7,7 @@ from evidently.metrics import ClassificationQualityMetric
 from sklearn.linear_model import LogisticRegression
 from sklearn import datasets
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
 
 # Load the breast cancer dataset from sklearn
 dataset = datasets.load_breast_cancer(as_frame=True)
@@ -36,7 +37,7 @@ classification_report = Report(metrics=[ClassificationQualityMetric()])
 classification_report.run(reference_data=reference, current_data=current)
 
 # Extract the False Positive Rate (FPR) from the classification report for the current data
-current_fpr = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["fpr"])
+current_fpr = EvidentlyResult(classification_report).metric_float(0, "current", "fpr")
 
 # Calling a function to add to a json file
 current_fpr_dict=get_metrics("fpr_value",current_fpr)
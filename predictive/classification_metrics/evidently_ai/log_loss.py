@@ -7,6 +7,8 @@ from evidently.metrics import ClassificationQualityMetric
 from sklearn.ensemble import RandomForestClassifier
 from sklearn import datasets
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
+from predictive.classification_engine import LogLossAccumulator
 # Load the breast cancer dataset from sklearn
 dataset = datasets.load_breast_cancer(as_frame=True)
 dataset = dataset.frame
@@ -45,10 +47,18 @@ classification_report = Report(metrics=[ClassificationQualityMetric()])
 classification_report.run(reference_data=reference, current_data=current)
 
 # Extract the log_loss metric from the classification report for the current data
-current_log_loss = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["log_loss"])
+current_log_loss = EvidentlyResult(classification_report).metric_float(0, "current", "log_loss")
 # Calling a function to add to a json file
 log_loss_dict=get_metrics("log_loss_value",current_log_loss)
 
+# Optional: Compute the log loss over a stream of predictions
+# The accumulator only keeps a compensated running sum, so the current data can be fed in chunks of any size.
+log_loss_accumulator = LogLossAccumulator()
+for start in range(0, len(current), 50):
+    chunk = current.iloc[start:start + 50]
+    log_loss_accumulator.update(chunk['target'] == 1, chunk['prediction'])
+streaming_log_loss = log_loss_accumulator.value()
+
 # Comprehensive guide and walkthrough of the file:
 '''
 This script demonstrates how to use the Evidently AI library to evaluate the performance of a classification model on new production data. 
@@ -78,6 +88,9 @@ The script uses the breast cancer dataset from sklearn as an example.
 7. **Extracting Log Loss**:
     - The log_loss metric for the current data is extracted from the classification report.
 
+8. **Streaming Log Loss (optional)**:
+    - The same log loss is computed chunk by chunk with `LogLossAccumulator`, which can be merged across workers.
+
 **Scenarios**:
 - This script can be adapted to use any dataset by replacing the dataset loading part.
 - The reference and current datasets can be adjusted based on the specific use case and data availability.
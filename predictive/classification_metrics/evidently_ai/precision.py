@@ -9,6 +9,7 @@ from evidently.metric_preset import ClassificationPreset
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.datasets import load_iris
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
 # Loading the iris dataset, converting it into a DataFrame, and adding the target label as a new column named 'target'
 iris = load_iris()
 dataset = pd.DataFrame(data=iris.data, columns=iris.feature_names)
@@ -48,7 +49,7 @@ classification_report = Report(metrics=[ClassificationPreset()])
 classification_report.run(reference_data=reference, current_data=current)
 
 # Extracting the precision metric for the current dataset
-current_precision = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["precision"]) * 100
+current_precision = EvidentlyResult(classification_report).metric_float(0, "current", "precision") * 100
 # Calling a function to add to a json file
 current_precision_dict=get_metrics("precision_score",current_precision)
 
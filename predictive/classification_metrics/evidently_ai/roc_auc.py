@@ -7,6 +7,8 @@ from evidently.metrics import ClassificationQualityMetric
 from sklearn.ensemble import RandomForestClassifier
 from sklearn import datasets
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
+from predictive.classification_engine import ScoreHistogram
 # Step 1: Load the breast cancer dataset
 # The dataset is loaded from sklearn's datasets module. It contains features and target labels for breast cancer diagnosis.
 dataset = datasets.load_breast_cancer(as_frame=True)
@@ -51,10 +53,19 @@ classification_report.run(reference_data=reference, current_data=current)
 
 # Step 7: Extract the ROC AUC score
 # The ROC AUC score for the current dataset is extracted from the classification report and converted to a percentage.
-current_roc_auc = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["roc_auc"])
+current_roc_auc = EvidentlyResult(classification_report).metric_float(0, "current", "roc_auc")
 # Calling a function to add to a json file
 current_roc_auc_dict=get_metrics("roc_auc_score", current_roc_auc)
 
+# Step 8 (optional): Compute the ROC AUC over a stream of predictions
+# The score histogram keeps a fixed number of bins per class, so memory does not depend on the number of rows.
+# Here the current dataset is fed in chunks of 50 rows, histograms of other chunks or workers can be combined with merge().
+score_histogram = ScoreHistogram(bins=1000)
+for start in range(0, len(current), 50):
+    chunk = current.iloc[start:start + 50]
+    score_histogram.update(chunk['target'] == 1, chunk['prediction'])
+streaming_roc_auc = score_histogram.roc_auc(max_error=0.01)
+
 
 # Comprehensive Guide and Walkthrough:
 ''' This script demonstrates how to use a Random Forest model to evaluate the performance of a classification task using the breast cancer dataset.
@@ -66,6 +77,7 @@ current_roc_auc_dict=get_metrics("roc_auc_score", current_roc_auc)
  5. Get prediction probabilities: The model's prediction probabilities for both reference and current datasets are added to their respective dataframes.
  6. Generate a classification report: A classification report is generated using the evidently library, which contains various classification metrics.
  7. Extract the ROC AUC score: The ROC AUC score for the current dataset is extracted from the classification report and converted to a percentage.
+ 8. Streaming ROC AUC (optional): The same score is estimated from a fixed-bin score histogram fed chunk by chunk, within a configurable error bound.
  
  This script can be adapted to use your own data by replacing the dataset loading step with your own data loading logic.
  Ensure that your data is in a similar format, with features and target labels, and follow the same steps to evaluate your model's performance.'''
\ No newline at end of file
@@ -1,5 +1,8 @@
-def evaluate_metrics(metrics_dict):
+def evaluate_metrics(metrics_dict, confidence_intervals=None):
     # Define thresholds for each metric normalized to 0-1 scale
+    # With a confidence interval, the level of the point estimate is kept and lowered by one step at most, when a
+    # bound of the interval falls in a less severe range: a value past a threshold inside a wide band reads one level
+    # lower, but a real degradation is still reported instead of the least severe level touched by the band.
     thresholds = {
         'accuracy_score': {
             'suspicious': 1.0,  # Nearly perfect accuracy is suspicious
@@ -84,10 +87,18 @@ def evaluate_metrics(metrics_dict):
             return 'MEDIUM RISK'
         else:
             return 'HIGH RISK'
+
+    risk_order = ['ACCEPTABLE', 'LOW RISK', 'MEDIUM RISK', 'HIGH RISK']
+
+    def get_interval_risk_level(metric_name, value, interval):
+        level = risk_order.index(get_risk_level(metric_name, value))
+        best = min(risk_order.index(get_risk_level(metric_name, bound)) for bound in (interval['lower'], interval['upper']))
+        return risk_order[level - 1] if best < level else risk_order[level]
     
-    def print_alert(metric_name, value, risk_level, prefix=''):
-        alert = f"ALERT - {prefix}{metric_name}: {value:.2f} - Risk Level: {risk_level}"
-        msg = f"MESSAGE - {prefix}{metric_name}: {value:.2f} - works fine and is {risk_level}"
+    def print_alert(metric_name, value, risk_level, prefix='', interval=None):
+        band = f" (CI {interval['lower']:.2f}-{interval['upper']:.2f})" if interval else ''
+        alert = f"ALERT - {prefix}{metric_name}: {value:.2f}{band} - Risk Level: {risk_level}"
+        msg = f"MESSAGE - {prefix}{metric_name}: {value:.2f}{band} - works fine and is {risk_level}"
         if risk_level == 'HIGH RISK':
             alert = "🔴 " + alert
         elif risk_level == 'MEDIUM RISK':
@@ -123,16 +134,25 @@ def evaluate_metrics(metrics_dict):
                 risk_level = get_risk_level(metric_lower, score_value)
                 print_alert(metric, score_value, risk_level, prefix)
         
-        # Handle single value metrics
+        # Handle single value metrics, using the confidence interval when one is available
         else:
-            risk_level = get_risk_level(metric_lower, value)
-            print_alert(metric, value, risk_level)
+            interval = (confidence_intervals or {}).get(metric)
+            if interval and interval['lower'] is not None:
+                risk_level = get_interval_risk_level(metric_lower, value, interval)
+                print_alert(metric, value, risk_level, interval=interval)
+            else:
+                risk_level = get_risk_level(metric_lower, value)
+                print_alert(metric, value, risk_level)
 
 """
     Evaluate and print risk levels for various metrics based on predefined thresholds.
     Args:
         metrics_dict (dict): A dictionary where keys are metric names and values are their corresponding scores.
                              Values can be either single float values or dictionaries containing multiple scores.
+        confidence_intervals (dict, optional): Confidence interval per metric name, as a dict with `lower` and `upper`
+                             bounds (see `get_classification_confidence_intervals`). When present, a metric keeps
+                             the risk level of its value, lowered by one step at most when a bound of its interval
+                             falls in a less severe range, so sampling noise on small samples does not escalate alerts.
     The function performs the following steps:
     1. Define thresholds for each metric, normalized to a 0-1 scale.
     2. Define a helper function `get_risk_level` to determine the risk level based on the metric value.
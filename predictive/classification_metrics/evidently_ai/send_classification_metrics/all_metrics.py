@@ -1,15 +1,14 @@
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[4]))
 
 
-from evidently.report import Report
-from evidently.metrics import ClassificationQualityMetric
-from evidently.metric_preset import ClassificationPreset
 from sklearn import datasets
 from sklearn.linear_model import LogisticRegression
+from predictive.classification_engine import compute_classification_metrics, threshold_sweep
+from predictive.bootstrap import bootstrap_classification_metrics
 
-from sklearn.linear_model import LogisticRegression
 # loading the breast cancer dataset
 dataset = datasets.load_breast_cancer(as_frame=True)
 dataset = dataset.frame
@@ -44,44 +43,33 @@ model.fit(X_reference, y_reference)
 reference['prediction'] = model.predict(X_reference)
 current['prediction'] = model.predict(X_current)
 
-# Generate a classification report containing various metrics
-classification_report = Report(metrics=[ClassificationPreset()])
-classification_report.run(reference_data=reference, current_data=current)
-
-# Extract the accuracy of the current dataset from the classification report
-current_accuracy = classification_report.as_dict()["metrics"][0]["result"]["current"]["accuracy"] * 100
-# Extract the precision of the current dataset from the classification report
-current_precision = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["precision"]) * 100
-# Extract the f1_score of the current dataset from the classification report
-current_f1 = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["f1"])
-# Extract the recall of the current dataset from the classification report
-current_recall = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["recall"])
-
-classification_report = Report(metrics=[ClassificationQualityMetric()])
-classification_report.run(reference_data=reference, current_data=current)
-
-# Extracting the False Negative Rate (FNR) for the current dataset
-current_fnr = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["fnr"]) * 100
+# Get the prediction probabilities of the positive class for the current data
+current_proba = model.predict_proba(X_current)[:, 1]
 
-# Extracting the False Positive Rate (FPR) for the current dataset
-current_fpr = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["fpr"])
+# Compute every classification metric of the current dataset in a single pass.
+# The confusion matrix and the score statistics are built once with NumPy instead of running
+# ClassificationPreset and ClassificationQualityMetric and serializing the reports for each metric.
+current_metrics = compute_classification_metrics(
+    target=current['target'],
+    prediction=current['prediction'],
+    prediction_proba=current_proba,
+)
 
+# Extract the accuracy, precision, f1_score and recall of the current dataset
+current_accuracy = current_metrics["accuracy"] * 100
+current_precision = current_metrics["precision"] * 100
+current_f1 = current_metrics["f1"]
+current_recall = current_metrics["recall"]
 
-# Extract the True Negative Rate (TNR) from the classification report
-current_tnr = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["tnr"])
- 
-# Extract the True Poitive Rate (TPR) from the classification report
-current_tpr = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["tpr"])
+# Extract the False Negative Rate (FNR), False Positive Rate (FPR), True Negative Rate (TNR) and True Positive Rate (TPR)
+current_fnr = current_metrics["fnr"] * 100
+current_fpr = current_metrics["fpr"]
+current_tnr = current_metrics["tnr"]
+current_tpr = current_metrics["tpr"]
 
-# Get the prediction proababilities
-reference['prediction'] = model.predict_proba(X_reference)[:, 1]
-current['prediction'] = model.predict_proba(X_current)[:, 1]
-
-# Get the AUC ROC score
-current_roc_auc = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["roc_auc"])
-
-#Get the Log Loss value
-current_log_loss = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["log_loss"])
+# Get the AUC ROC score and the Log Loss value from the prediction probabilities
+current_roc_auc = current_metrics["roc_auc"]
+current_log_loss = current_metrics["log_loss"]
 
 
 # Create a metrics dictionary
@@ -98,6 +86,20 @@ metrics_dict = {
     "roc_auc_score": current_roc_auc
 }
 
+# Name of each entry of metrics_dict in the engine results, and the scale applied to it above
+metric_sources = {
+    "accuracy_score": ("accuracy", 100),
+    "precision_score": ("precision", 100),
+    "recall_score": ("recall", 1),
+    "f1_score": ("f1", 1),
+    "tpr_value": ("tpr", 1),
+    "fpr_value": ("fpr", 1),
+    "tnr_value": ("tnr", 1),
+    "fnr_value": ("fnr", 100),
+    "log_loss_value": ("log_loss", 1),
+    "roc_auc_score": ("roc_auc", 1),
+}
+
 def get_classification_metrics():
     return metrics_dict
 
@@ -109,4 +111,49 @@ def get_classification_metrics():
 
     Summary:
         This function returns a dictionary that holds various classification metrics.
-"""
\ No newline at end of file
+"""
+
+def get_threshold_sweep(thresholds=None, max_points=100):
+    return threshold_sweep(current['target'] == 1, current_proba, thresholds=thresholds, max_points=max_points)
+
+"""
+    Retrieve precision, recall, F1, TPR and FPR of the current dataset at every decision threshold.
+
+    Args:
+        thresholds (list, optional): Thresholds to evaluate. Defaults to the distinct prediction probabilities.
+        max_points (int, optional): Maximum number of thresholds kept from the default sweep. Defaults to 100.
+
+    Returns:
+        dict: Lists of threshold, tp, fp, precision, recall, f1, tpr and fpr, ordered by decreasing threshold.
+
+    Summary:
+        The probabilities are sorted once for the whole sweep, so other operating points can be checked
+        without computing the classification metrics again for each of them.
+"""
+
+def get_classification_confidence_intervals(replicates=200, confidence=0.95):
+    intervals = bootstrap_classification_metrics(
+        current['target'], current['prediction'], current_proba, replicates=replicates, confidence=confidence
+    )
+    return {
+        name: {
+            bound: None if intervals[source][bound] is None else intervals[source][bound] * scale
+            for bound in ("lower", "upper")
+        }
+        for name, (source, scale) in metric_sources.items()
+    }
+
+"""
+    Retrieve bootstrap confidence intervals for every metric of `get_classification_metrics()`.
+
+    Args:
+        replicates (int, optional): Number of bootstrap replicates. Defaults to 200.
+        confidence (float, optional): Confidence level of the intervals. Defaults to 0.95.
+
+    Returns:
+        dict: The same keys as `get_classification_metrics()`, each with a dict holding the `lower` and `upper` bound.
+
+    Summary:
+        All replicates are computed in one vectorized pass with Poisson weights, so the intervals cost about one
+        extra pass over the data. They tell whether a metric on a small sample is distinguishable from noise.
+"""
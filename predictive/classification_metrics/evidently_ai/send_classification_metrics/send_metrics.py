@@ -2,6 +2,7 @@ import requests
 from model_metrics import fetch_model_performance
 
 from alerts import evaluate_metrics
+from all_metrics import get_classification_confidence_intervals
 
 def send_post_request(url, data, headers=None):
 
@@ -19,7 +20,7 @@ payload = fetch_model_performance()
 response = send_post_request(url, payload)
 
 simplified_metrics = {key: value['metric_value'] for key, value in payload["data"].items()}
-evaluate_metrics(simplified_metrics)
+evaluate_metrics(simplified_metrics, confidence_intervals=get_classification_confidence_intervals())
 """
     Sends a POST request to the specified URL with the given data and optional headers.
 
@@ -7,6 +7,7 @@ from evidently.metrics import ClassificationQualityMetric
 from sklearn.linear_model import LogisticRegression
 from sklearn import datasets
 from utils.call_metrics import get_metrics
+from utils.evidently_results import EvidentlyResult
 
 # Step 1: Load the breast cancer dataset
 # This dataset is used for demonstration purposes. Replace this with your own dataset.
@@ -49,7 +50,7 @@ classification_report = Report(metrics=[ClassificationQualityMetric()])
 classification_report.run(reference_data=reference, current_data=current)
 
 # Step 7: Extract the True Positive Rate (TPR) from the classification report
-current_tpr = float(classification_report.as_dict()["metrics"][0]["result"]["current"]["tpr"])
+current_tpr = EvidentlyResult(classification_report).metric_float(0, "current", "tpr")
 # Calling a function to add to a json file
 current_tpr_dict=get_metrics("tpr_value", current_tpr)
 
@@ -1,6 +1,21 @@
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+import pandas as pd
 from evidently.report import Report
 from evidently.metric_preset import DataDriftPreset
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.reference_profile import ReferenceProfile
+from predictive.drift_engine import profile_drift_scores, sketch_drift
+from predictive.ecdf_drift import ecdf_drift_scores
+from predictive.adaptive_drift import adaptive_drift
+from predictive.parallel_drift import parallel_drift_scores
+from predictive.stattest_planner import plan_stattests
+from predictive.windowed_drift import windowed_drift
+from predictive.sketches import CategorySketch
 
 # Step 1: Fetch and prepare the dataset
 # Load the Adult dataset from OpenML
@@ -37,10 +52,7 @@ data_report = Report(
 )
 data_report.run(reference_data=adult_ref, current_data=adult_prod.iloc[0:100, :])
 
-report={
-    column: float(data_report.as_dict()["metrics"][1]["result"]["drift_by_columns"][column]["drift_score"])
-    for column in adult_ref.columns
-}
+report = EvidentlyResult(data_report).drift_scores(1, adult_ref.columns)
 
 # Scenario 2: Using a single statistical test for the entire dataset
 
@@ -51,10 +63,7 @@ data_report = Report(
 )
 data_report.run(reference_data=adult_ref, current_data=adult_prod.iloc[0:100, :])
 
-report={
-    column: float(data_report.as_dict()["metrics"][1]["result"]["drift_by_columns"][column]["drift_score"])
-    for column in adult_ref.columns
-}
+report = EvidentlyResult(data_report).drift_scores(1, adult_ref.columns)
 
 # Scenario 3: Using custom statistical tests for specific columns
 
@@ -81,10 +90,18 @@ data_report = Report(
     ],
 )
 data_report.run(reference_data=adult_ref, current_data=adult_prod.iloc[0:100, :])
-report= {
-    column: float(data_report.as_dict()["metrics"][1]["result"]["drift_by_columns"][column]["drift_score"])
-    for column in adult_ref.columns
-}
+report = EvidentlyResult(data_report).drift_scores(1, adult_ref.columns)
+
+# The same tests can run in parallel: the columns are shared with a pool of worker processes through shared memory
+# and balanced by cost, so the slow anderson and cramer_von_mises columns run side by side. The scores are identical.
+report = parallel_drift_scores(adult_ref, adult_prod.iloc[0:100, :], per_column_stattest=per_column_stattest, workers=4)
+
+# Instead of picking the tests by hand, the planner picks the most sensitive test per column that fits in a latency
+# budget: Anderson-Darling while the windows are small, cheaper ECDF or binned tests when they grow.
+# Each choice comes with its estimated runtime and an explanation, e.g. plan['fnlwgt']['explanation'].
+plan = plan_stattests(adult_ref, adult_prod.iloc[0:100, :], budget_seconds=0.5)
+planned_stattest = {column: choice['stattest'] for column, choice in plan.items()}
+report = parallel_drift_scores(adult_ref, adult_prod.iloc[0:100, :], per_column_stattest=planned_stattest, workers=4)
 
 # Scenario 4: Adjusting drift sensitivity for high-risk features
 
@@ -97,10 +114,57 @@ data_report = Report(
     ],
 )
 data_report.run(reference_data=adult_ref, current_data=adult_prod.iloc[0:100, :])
-report={
-    column: float(data_report.as_dict()["metrics"][1]["result"]["drift_by_columns"][column]["drift_score"])
-    for column in high_risk_features
-}
+report = EvidentlyResult(data_report).drift_scores(1, high_risk_features)
+
+# Scenario 5: Reusing a precomputed reference profile
+
+# The reference is summarized once (bin edges, counts, quantiles, category counts) and saved to disk.
+# Every later window only bins the current data against the loaded profile. The example uses a temporary directory.
+with tempfile.TemporaryDirectory() as profile_dir:
+    profile_path = str(Path(profile_dir) / "adult_ref_profile.npz")
+    ReferenceProfile.build(adult_ref, version="adult_ref").save(profile_path)
+    reference_profile = ReferenceProfile.load(profile_path)
+report = profile_drift_scores(reference_profile, adult_prod.iloc[0:100, :], stattest='psi')
+
+# The binned stattests of Scenario 3 (kl_div, jensenshannon) can be mixed with PSI: all the columns are binned
+# in one vectorized pass and each stattest scores its columns in one batch of array operations.
+binned_stattest = {column: 'kl_div' for column in ['workclass', 'education']}
+for column in ['relationship', 'race', 'native-country']:
+    binned_stattest[column] = 'jensenshannon'
+report = profile_drift_scores(reference_profile, adult_prod.iloc[0:100, :], stattest='psi', per_column_stattest=binned_stattest)
+
+# The ECDF stattests of Scenario 3 (wasserstein, anderson, cramer_von_mises, ks) can also reuse the reference:
+# with `keep_sorted=True` the profile keeps the sorted reference values, and each run only sorts the current data.
+with tempfile.TemporaryDirectory() as profile_dir:
+    profile_path = str(Path(profile_dir) / "adult_ref_profile.npz")
+    ReferenceProfile.build(adult_ref, version="adult_ref", keep_sorted=True).save(profile_path)
+    reference_profile = ReferenceProfile.load(profile_path)
+ecdf_stattest = {column: 'anderson' for column in ['fnlwgt', 'hours-per-week']}
+for column in ['capital-gain', 'capital-loss']:
+    ecdf_stattest[column] = 'cramer_von_mises'
+report = ecdf_drift_scores(reference_profile, adult_prod.iloc[0:100, :], stattest='ks', per_column_stattest=ecdf_stattest)
+
+# Instead of a fixed `iloc[0:100]` slice, the whole production set can be sampled adaptively: every column starts on
+# a small random sample, and only the columns whose score is too close to the threshold are scored again on a
+# larger one. Each column reports the `sample_size` its decision was taken on.
+adaptive_report = adaptive_drift(reference_profile, adult_prod, stattest='psi', initial_size=1000, random_state=0)
+sample_sizes = {column: result['sample_size'] for column, result in adaptive_report.items()}
+
+# High-cardinality categorical columns (merchant IDs, URLs, ...) are summarized by fixed-size sketches instead of
+# full frequency tables: the top-K values of both sides get their own bucket and the rest goes to "other".
+# Each column also reports the approximation error of its score. Sketches of different chunks combine with `merge`.
+high_cardinality_columns = ['native-country', 'education']
+reference_sketches = {column: CategorySketch().update(adult_ref[column]) for column in high_cardinality_columns}
+current_sketches = {column: CategorySketch().update(adult_prod.iloc[0:100, :][column]) for column in high_cardinality_columns}
+report = sketch_drift(reference_sketches, current_sketches, stattest='jensenshannon', top_k=10)
+
+# Scenario 6: Drift over time windows of a production stream
+
+# Instead of picking the current rows by hand, every window of a time-indexed stream is scored.
+# Here the production rows get one timestamp every 10 seconds, and a one hour window slides by 5 minutes.
+# The window histograms are updated with the rows entering and leaving each window instead of being rebuilt.
+adult_stream = adult_prod.assign(timestamp=pd.date_range("2024-01-01", periods=len(adult_prod), freq="10s"))
+drift_over_time = windowed_drift(reference_profile, adult_stream, "timestamp", window="1h", step="5min", stattest='psi')
 
 
 """
@@ -120,12 +184,28 @@ report={
     - Ideal for datasets with diverse feature types or specific customer requirements.
     - **Customer Mapping**: Apply this scenario when you know which features require specific statistical tests due to their importance or unique characteristics.
         Example: For categorical features like `education`, use KL Divergence; for numerical features like `age`, use Wasserstein.
+    - `parallel_drift_scores` runs the same per-column tests on a pool of worker processes (`workers`), with identical scores.
+    - `plan_stattests` picks the stattest of every column within a latency budget (`budget_seconds`) from a runtime model of each test (`calibrate_runtime_model` measures it on the host), and explains each choice.
 
     Scenario 4: High-Risk Feature Sensitivity
     - Focuses on high-risk features with lower drift thresholds for heightened sensitivity.
     - Useful for detecting subtle changes in critical business metrics.
     - **Customer Mapping**: Utilize this scenario for features directly tied to business impact or regulatory compliance. For instance, monitor `capital-gain` and `capital-loss` if they influence key financial decisions.
 
+    Scenario 5: Precomputed Reference Profile
+    - Builds a `ReferenceProfile` of the reference data once and stores it in a compact `.npz` file.
+    - Computes PSI, KL divergence or Jensen-Shannon drift from the profile and the current data only.
+    - All the columns are binned together and scored in batches, so wide tables avoid a Python loop over the columns.
+    - With `keep_sorted=True` the profile keeps the sorted reference values, and `ecdf_drift_scores` runs KS, Wasserstein, Anderson-Darling and Cramer-von Mises with the same scores as Evidently while only sorting the current data. Without it, the quantile grid of the profile gives approximate scores.
+    - `adaptive_drift` samples the current data instead of slicing it: columns far from the threshold are decided on a small random sample, the others on samples growing geometrically until the decision is stable, with the sample size used per column.
+    - `sketch_drift` scores high-cardinality categorical columns from `CategorySketch` summaries (heavy hitters and a count-min sketch), in bounded memory per column, with the approximation error of each score.
+    - **Customer Mapping**: Use this scenario when a large reference dataset is compared against many current windows, so the reference side is not recomputed on every run.
+
+    Scenario 6: Windowed Drift over a Stream
+    - Scores tumbling (`step` omitted) or sliding windows of a stream with a timestamp column against the reference profile.
+    - Returns a DataFrame with one row per window end and the drift score of every column.
+    - **Customer Mapping**: Use this scenario for continuous monitoring, e.g. a 24 hour window sliding every 5 minutes.
+
     Key Parameters:
     - `stattest`: Statistical test to use for drift detection (e.g., PSI, Wasserstein, KL Divergence).
     - `stattest_threshold`: Threshold for detecting drift (default 0.5).
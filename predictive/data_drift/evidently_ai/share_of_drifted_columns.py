@@ -1,7 +1,15 @@
+import sys
+from functools import partial
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 from evidently.test_suite import TestSuite
 from evidently.tests import TestShareOfDriftedColumns
-import re
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.reference_profile import ReferenceProfile
+from predictive.drift_engine import profile_drift
+from predictive.sequential_drift import sequential_drift_share
 
 # Step 1: Fetch the dataset
 # Here we use the 'adult' dataset from OpenML. This dataset is commonly used for classification tasks.
@@ -42,10 +50,27 @@ data_drift_dataset_tests = TestSuite(tests=[
 data_drift_dataset_tests.run(reference_data=adult_ref, current_data=adult_prod.iloc[0:100, :])
 
 # Step 6: Extract the share of drifted columns
-# We use a regular expression to extract the percentage of drifted columns from the test description.
-match = re.search(r'\b\d+(?:\.\d+)?\b', data_drift_dataset_tests.as_dict()["tests"][0]["description"])
-data_drift_percentage = float(match.group())
+# The test parameters list every column with its drift detection, the percentage of drifted columns is computed from them.
+drifted_columns = EvidentlyResult(data_drift_dataset_tests).test(0)["parameters"]["features"]
+data_drift_percentage = 100 * sum(column["detected"] for column in drifted_columns.values()) / len(drifted_columns)
+
+# Step 7 (optional): Compute the share of drifted columns from a precomputed reference profile
+# The profile is built once per reference version, then only the current data is binned on every run.
+reference_profile = ReferenceProfile.build(adult_ref, version="adult_ref")
+drift_by_columns = profile_drift(reference_profile, adult_prod.iloc[0:100, :], stattest="psi")
+profile_drift_percentage = 100 * sum(column["drift_detected"] for column in drift_by_columns.values()) / len(drift_by_columns)
 
+# Step 8 (optional): Stop scoring columns as soon as the pass/fail outcome is settled
+# The columns are scored in priority order, here the drift scores of the previous window, and the scoring stops once
+# the share of drifted columns is certainly >= 0.5 or can no longer reach it. The skipped columns are reported.
+recent_drift = {name: column["drift_score"] for name, column in drift_by_columns.items()}
+drift_gate = sequential_drift_share(
+    partial(profile_drift, reference_profile, adult_prod.iloc[100:200, :], stattest="psi"),
+    list(drift_by_columns),
+    lt=0.5,
+    priority=recent_drift,
+)
+skipped_columns = drift_gate["skipped_columns"]
 
 
 """
@@ -58,7 +83,9 @@ data_drift_percentage = float(match.group())
     3. Split the dataset: We divide the dataset into reference and production data based on certain education levels.
     4. Define the data drift test suite: We use the Population Stability Index (PSI) as the statistical test with a threshold of 0.5.
     5. Run the data drift test: We run the test on the first 100 rows of the production data against the reference data.
-    6. Extract the share of drifted columns: We extract the percentage of drifted columns from the test description using a regular expression.
+    6. Extract the share of drifted columns: We compute the percentage of drifted columns from the drift detection of each column in the test parameters.
+    7. (Optional) Compute the same share from a `ReferenceProfile` of the reference data, which can be saved and reused for every new window.
+    8. (Optional) Gate on the share with `sequential_drift_share`: columns are scored in priority order (feature importance, recent drift) and the scoring stops once the outcome of `lt=0.5` is certain, listing the skipped columns.
 
     This script can be adapted to use any dataset by replacing the dataset fetching and preparation steps.
     The data drift test can be customized by changing the statistical test and threshold in the TestSuite definition.
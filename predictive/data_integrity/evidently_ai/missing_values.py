@@ -1,6 +1,14 @@
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 from evidently.test_suite import TestSuite
 from evidently.tests import TestShareOfMissingValues, TestNumberOfMissingValues, TestNumberOfEmptyRows, TestNumberOfEmptyColumns
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.classification_engine import iter_parquet_batches
+from predictive.integrity_engine import MissingValuesAccumulator
 
 # Step 1: Load the dataset
 # Using the "adult" dataset from OpenML to analyze missing values and dataset integrity.
@@ -49,18 +57,28 @@ missing_values_test = TestSuite(tests=[
 missing_values_test.run(reference_data=adult_ref, current_data=adult_prod.iloc[:100, :])
 
 # Step 6: Extract test results
-# Converting the test results into a dictionary format for easier parsing and analysis.
-results_dict = missing_values_test.as_dict()
+# Wrapping the test suite so its results are converted into a dictionary only once.
+missing_values_result = EvidentlyResult(missing_values_test)
 
 # Step 7: Parse results into a structured dictionary
 # Summarizing the findings from the test suite into a report format.
 missing_values_summary = {
-    "share_of_missing_values": float(results_dict["tests"][0]["parameters"]["value"]),
-    "number_of_missing_values": float(results_dict["tests"][1]["parameters"]["value"]),
-    "number_of_empty_rows": float(results_dict["tests"][2]["parameters"]["value"]),
-    "number_of_empty_columns": float(results_dict["tests"][3]["parameters"]["value"]),
+    "share_of_missing_values": missing_values_result.test_float(0),
+    "number_of_missing_values": missing_values_result.test_float(1),
+    "number_of_empty_rows": missing_values_result.test_float(2),
+    "number_of_empty_columns": missing_values_result.test_float(3),
 }
 
+# Step 8 (optional): Profile missing values while streaming a Parquet file
+# Large daily files are read as Arrow record batches and never converted to pandas: null counts come from the
+# validity bitmaps and empty rows from a running bitmask. The same four numbers come with a per-column breakdown.
+# The example writes the file to a temporary directory.
+with tempfile.TemporaryDirectory() as parquet_dir:
+    parquet_path = str(Path(parquet_dir) / "adult_prod.parquet")
+    adult_prod.iloc[:100, :].to_parquet(parquet_path)
+    streaming_missing_values = MissingValuesAccumulator().consume(iter_parquet_batches(parquet_path, columns=None)).metrics()
+missing_values_by_column = streaming_missing_values["by_column"]
+
 
 
 """
@@ -75,5 +93,6 @@ missing_values_summary = {
     5. Run the test suite: Executes the tests on the reference and production data.
     6. Extract test results: Converts the test results into a dictionary format.
     7. Parse results: Summarizes the test results into a structured dictionary.
+    8. (Optional) Stream a Parquet file through `MissingValuesAccumulator`: the same four numbers and a per-column breakdown, computed from Arrow record batches without converting them to pandas (`iter_csv_batches` does the same for CSV files).
     Users can follow these steps to ensure the quality of their datasets and identify potential issues with missing values and empty structures.
 """
\ No newline at end of file
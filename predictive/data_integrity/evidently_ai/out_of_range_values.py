@@ -1,6 +1,13 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 from evidently.test_suite import TestSuite
 from evidently.tests import TestShareOfOutRangeValues
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.reference_profile import ReferenceProfile
+from predictive.integrity_engine import RangeRuleAccumulator, reference_ranges
 
 # Step 1: Load the dataset
 # Using the "adult" dataset from OpenML to analyze missing values and dataset integrity.
@@ -42,7 +49,17 @@ share_of_out_of_range_values = TestSuite(tests=[
 share_of_out_of_range_values.run(reference_data=adult_ref, current_data=adult_prod.iloc[:100, :])
 
 # Extracting the results from the test suite
-out_of_range_share = float(share_of_out_of_range_values.as_dict()["tests"][0]["parameters"]["value"])
+out_of_range_share = EvidentlyResult(share_of_out_of_range_values).test_float(0)
+
+# Step 6 (optional): Check every numerical column at once with a rule table
+# Explicit bounds are kept ("age"), the other columns get bounds from the reference quantiles, here the 0.1% and 99.9%
+# quantiles. All the rules are evaluated in one vectorized pass per chunk instead of one test suite per column.
+range_rules = reference_ranges(
+    ReferenceProfile.build(adult_ref), lower_quantile=0.001, upper_quantile=0.999, rules={"age": (0, 100)}
+)
+out_of_range_result = RangeRuleAccumulator(range_rules).update(adult_prod.iloc[:100, :]).metrics()
+out_of_range_by_column = {name: column["share_not_in_range"] for name, column in out_of_range_result["by_column"].items()}
+overall_out_of_range_share = out_of_range_result["share_of_out_of_range_values"]
 
 
 """
@@ -68,5 +85,9 @@ out_of_range_share = float(share_of_out_of_range_values.as_dict()["tests"][0]["p
     - We run the test suites on the first 100 rows of the production data.
     - The results are extracted and printed, showing the number and share of out-of-range values.
 
+    Step 6 (optional): Check every numerical column at once
+    - `reference_ranges` builds a rule table from a reference profile: explicit bounds for "age", reference quantiles for the other columns.
+    - `RangeRuleAccumulator` evaluates all the rules in one vectorized pass and returns the share of out-of-range values per column.
+
     This script can be adapted to use other datasets by modifying the dataset loading and preparation steps accordingly.
 """
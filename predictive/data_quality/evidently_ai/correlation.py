@@ -1,9 +1,14 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 from evidently.report import Report
 from evidently.metrics import DatasetCorrelationsMetric
 from sklearn import datasets
 from evidently.test_suite import TestSuite
 from evidently.tests import *
 from sklearn.linear_model import LogisticRegression
+from utils.evidently_results import EvidentlyResult
 
 # Step 1: Load the dataset
 # Loading the breast cancer dataset from sklearn
@@ -52,7 +57,7 @@ correlation = Report(metrics=[
 correlation.run(reference_data=reference, current_data=current.iloc[0:100, :])
 
 # Get the maximum absolute Pearson correlation value from the report
-max_pearson_corr = float(correlation.as_dict()["metrics"][0]["result"]["current"]["stats"]["pearson"]["abs_max_correlation"])
+max_pearson_corr = EvidentlyResult(correlation).metric_float(0, "current", "stats", "pearson", "abs_max_correlation")
 
 # Scenario 2: Create a test suite to check the correlation between target and prediction
 # Create a test suite to check the correlation between the target variable and predictions
@@ -67,10 +72,11 @@ correlation_test.run(reference_data=reference, current_data=current)
 # Step 6: Extract correlation values from the report and test suite
 
 # Extract correlation values from the test suites
-t_p_cor = float(correlation_test.as_dict()["tests"][0]["parameters"]["value"])
-t_f_cor = float(correlation_test.as_dict()["tests"][1]["parameters"]["value"])
-p_f_cor = float(correlation_test.as_dict()["tests"][2]["parameters"]["value"])
-cor_change = float(correlation_test.as_dict()["tests"][3]["parameters"]["value"])
+correlation_test_result = EvidentlyResult(correlation_test)
+t_p_cor = correlation_test_result.test_float(0)
+t_f_cor = correlation_test_result.test_float(1)
+p_f_cor = correlation_test_result.test_float(2)
+cor_change = correlation_test_result.test_float(3)
 
 # Step 7: Store the correlation values in a dictionary
 cor_dict = {
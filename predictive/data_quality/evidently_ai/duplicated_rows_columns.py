@@ -1,7 +1,13 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 from evidently.test_suite import TestSuite
 from evidently.tests import *
 import re
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.duplicate_engine import DuplicateRowAccumulator, duplicated_columns, row_overlap
 
 # Step 1: Fetch the data
 # Here we are using the 'adult' dataset from OpenML. This dataset is used for predicting whether income exceeds $50K/yr based on census data.
@@ -45,8 +51,9 @@ duplicate_rows_cols.run(reference_data=adult_ref, current_data=adult_prod.iloc[0
 
 # Step 6: Extract the results
 # Get the number of duplicated rows and columns from the test results.
-duplicated_rows = duplicate_rows_cols.as_dict()["tests"][0]["parameters"]["value"]
-duplicated_cols = duplicate_rows_cols.as_dict()["tests"][1]["parameters"]["value"]
+duplicate_rows_cols_result = EvidentlyResult(duplicate_rows_cols)
+duplicated_rows = duplicate_rows_cols_result.test_value(0)
+duplicated_cols = duplicate_rows_cols_result.test_value(1)
 
 # Step 7: Create a dictionary to store the results
 # Store the number of duplicated rows and columns in a dictionary.
@@ -55,6 +62,27 @@ duplicated_dict = {
     "duplicated_cols": duplicated_cols
 }
 
+# Step 8 (optional): Count duplicated rows across ingestion batches
+# The test suite only sees duplicates inside one frame. Here the production data arrives in batches of 5,000 rows and
+# every row is hashed once; a row is a duplicate if the same row was seen earlier in its batch or in any earlier batch.
+# Pass `capacity` (expected distinct rows) to use a fixed-size Bloom filter instead of the exact set of row hashes.
+production_batches = (adult_prod.iloc[start:start + 5000] for start in range(0, len(adult_prod), 5000))
+streaming_duplicates = DuplicateRowAccumulator().consume(production_batches).metrics()
+cross_batch_duplicated_rows = streaming_duplicates["number_of_cross_batch_duplicated_rows"]
+
+# Step 9 (optional): Find duplicated columns from column fingerprints
+# Each column is hashed once and only the columns with the same fingerprint are compared, instead of every pair of
+# columns. The groups show which columns are identical, here "education" and "dup_col".
+fingerprinted_duplicates = duplicated_columns(adult_prod.iloc[0:100, :])
+duplicated_column_groups = fingerprinted_duplicates["duplicated_column_groups"]
+
+# Step 10 (optional): Check that no production row leaks from the reference data
+# Both datasets are hashed row by row and the current rows are looked up in the set of reference row hashes, a
+# streaming hash join that never merges the two datasets. Either side can also be an iterable of chunks, e.g.
+# iter_parquet_batches. Here the split on "education" keeps the two datasets apart, so the overlap is 0.
+reference_overlap = row_overlap(adult_ref, adult_prod)
+overlapping_share = reference_overlap["share_of_overlapping_rows"]
+
 
 """
    Comprehensive Guide and Walkthrough:
@@ -83,6 +111,18 @@ duplicated_dict = {
    7. **Store the Results**:
       - The number of duplicated rows and columns is stored in a dictionary for easy access and further use.
 
+   8. **Duplicated Rows Across Batches (optional)**:
+      - `DuplicateRowAccumulator` hashes each row once and keeps the hashes of the rows seen so far, so duplicates are also found between batches.
+      - It reports the total and cross-batch duplicated rows; with `capacity` set it uses a Bloom filter and reports the expected number of false duplicates.
+
+   9. **Duplicated Columns From Fingerprints (optional)**:
+      - `duplicated_columns` hashes every column once, groups the columns with the same fingerprint and verifies only those groups.
+      - It returns the same count as `TestNumberOfDuplicatedColumns` and the groups of identical columns.
+
+   10. **Reference/Production Overlap (optional)**:
+      - `row_overlap` looks up the hash of every production row in the set of reference row hashes and returns the share of production rows also found in the reference.
+      - A non-zero share means that the two datasets leak into each other.
+
 
 
    **Usage with Your Own Data**:
@@ -0,0 +1,300 @@
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from predictive.reference_profile import category_keys, finite_values
+
+# Default thresholds of Evidently's binned stattests, a column drifts when its score is >= the threshold
+DEFAULT_THRESHOLDS = {"psi": 0.1, "kl_div": 0.1, "jensenshannon": 0.1}
+
+
+def count_layout(profile, current, columns) -> tuple:
+    """
+    Lay out the bins of many columns one after the other, column i owning `counts[starts[i]:starts[i + 1]]`.
+
+    Histogram columns keep the reference bins. Categorical and discrete columns keep the reference categories,
+    followed by the categories of `current` missing from the reference (with a reference count of 0), like
+    `histogram_counts`.
+
+    Parameters:
+    - profile (ReferenceProfile): Profile of the reference data.
+    - current (pd.DataFrame): Current data, only read for its new categories.
+    - columns (list): Columns to lay out, in this order.
+
+    Returns:
+    - tuple: `(reference_counts, starts, categories)`, `categories` mapping each categorical column to a pd.Index
+      of its categories in layout order.
+    """
+    reference_parts, categories = [], {}
+    for name in columns:
+        column = profile[name]
+        if "edges" in column:
+            reference_parts.append(column["counts"])
+            continue
+        new_categories = np.setdiff1d(category_keys(finite_values(current[name])).unique().astype(str), column["categories"])
+        categories[name] = pd.Index(np.concatenate([column["categories"], new_categories]))
+        reference_parts.append(np.concatenate([column["counts"], np.zeros(len(new_categories), dtype=np.int64)]))
+    starts = np.r_[0, np.cumsum([len(part) for part in reference_parts])].astype(np.int64)
+    return np.concatenate(reference_parts), starts, categories
+
+
+def bin_codes(profile, frame, columns, starts, categories) -> np.ndarray:
+    """
+    Give every value of `frame` its position in the layout of `count_layout`, -1 for missing values.
+
+    Columns with histogram edges are binned together: the values form one 2-D (columns x rows) array and every
+    value gets its bin from the column's equal-width Sturges edges with array operations, without a Python loop
+    over the columns. Categorical and discrete columns are matched with their layout categories.
+
+    Returns:
+    - np.ndarray: (columns x rows) int64 array of positions.
+    """
+    codes = np.full((len(columns), len(frame)), -1, dtype=np.int64)
+    histogram_columns = [i for i, name in enumerate(columns) if "edges" in profile[name]]
+    for i, name in enumerate(columns):
+        if name in categories:
+            values = frame[name].replace([-np.inf, np.inf], np.nan)
+            finite = values.notna().to_numpy()
+            positions = categories[name].get_indexer(category_keys(values[finite]))
+            codes[i, finite] = np.where(positions >= 0, starts[i] + positions, -1)
+
+    if histogram_columns:
+        n_bins = (starts[1:] - starts[:-1])[histogram_columns][:, None]
+        # One row of edges per column, padded to the widest column and flattened for gathering
+        edges = np.full((len(histogram_columns), n_bins.max() + 1), np.inf)
+        for j, i in enumerate(histogram_columns):
+            edges[j, : n_bins[j, 0] + 1] = profile[columns[i]]["edges"]
+        low = edges[:, :1]
+        span = edges[np.arange(len(edges)), n_bins[:, 0]][:, None] - low
+        norm = n_bins / np.where(span == 0, 1.0, span)
+        edge_rows = (np.arange(len(edges)) * edges.shape[1])[:, None]
+        edges = edges.ravel()
+
+        values = frame[[columns[i] for i in histogram_columns]].to_numpy(dtype=float, na_value=np.nan).T
+        finite = np.isfinite(values)
+        position = values - low
+        position *= norm
+        np.fmax(position, 0, out=position)
+        np.minimum(position, n_bins - 1, out=position)
+        bins = position.astype(np.intp)
+        # Like np.histogram, fix the values that the multiplication put one bin off next to an edge
+        bins -= (values < np.take(edges, bins + edge_rows)) & (bins > 0)
+        bins += (values >= np.take(edges, bins + edge_rows + 1)) & (bins < n_bins - 1)
+        bins += starts[histogram_columns][:, None]
+        codes[histogram_columns] = np.where(finite, bins, -1)
+    return codes
+
+
+def count_rows(profile, frame, columns, starts, categories, block_size: int = 1 << 18) -> np.ndarray:
+    """
+    Count the rows of `frame` in the layout of `count_layout`, `block_size` values (rows x columns) at a time.
+    """
+    counts = np.zeros(starts[-1], dtype=np.int64)
+    block_rows = max(1, block_size // max(len(columns), 1))
+    for row in range(0, len(frame), block_rows):
+        codes = bin_codes(profile, frame.iloc[row:row + block_rows], columns, starts, categories)
+        counts += np.bincount(codes[codes >= 0], minlength=starts[-1])
+    return counts
+
+
+def binned_counts(profile, current, columns, block_size: int = 1 << 18) -> tuple:
+    """
+    Bin the current data of many columns against a reference profile in one vectorized pass.
+
+    The counts of all the columns are concatenated: column i owns `counts[starts[i]:starts[i + 1]]`
+    (see `count_layout`). Values are binned with `bin_codes`, all the columns of a block of rows at once,
+    and counted with a single `bincount`.
+
+    Parameters:
+    - profile (ReferenceProfile): Profile of the reference data.
+    - current (pd.DataFrame): Current data.
+    - columns (list): Columns to bin, in this order.
+    - block_size (int): Values (rows x columns) binned at a time, bounding the memory of the 2-D arrays.
+      Defaults to 2**18.
+
+    Returns:
+    - tuple: `(reference_counts, current_counts, starts)` where `starts` has one more entry than `columns`.
+    """
+    reference_counts, starts, categories = count_layout(profile, current, columns)
+    return reference_counts, count_rows(profile, current, columns, starts, categories, block_size), starts
+
+
+def _fill_zeros(percents, starts):
+    # Evidently's `feel_zeroes` per column: empty bins get a small share so that the logarithms stay finite
+    nonzero_min = np.minimum.reduceat(np.where(percents != 0, percents, np.inf), starts[:-1])
+    fill = np.where(nonzero_min <= 0.0001, nonzero_min / 10**6, 0.0001)
+    return np.where(percents == 0, np.repeat(fill, np.diff(starts)), percents)
+
+
+def _normalize(counts, starts):
+    return counts / np.repeat(np.add.reduceat(counts, starts[:-1]), np.diff(starts))
+
+
+def binned_drift_scores(reference_counts, current_counts, starts, stattest: str = "psi"):
+    """
+    Compute a binned drift score for every column of concatenated counts, like Evidently's stattests.
+
+    Parameters:
+    - reference_counts (np.ndarray): Reference counts of all the columns, see `binned_counts`.
+    - current_counts (np.ndarray): Current counts aligned with `reference_counts`.
+    - starts (np.ndarray): Start of the counts of each column, followed by the total length.
+    - stattest (str): "psi", "kl_div" or "jensenshannon". Defaults to "psi".
+
+    Returns:
+    - np.ndarray: One drift score per column, NaN for a column without current values.
+    """
+    if stattest not in DEFAULT_THRESHOLDS:
+        raise ValueError(f"Unsupported binned stattest: {stattest}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reference_percents = _normalize(reference_counts, starts)
+        current_percents = _normalize(current_counts, starts)
+        if stattest == "jensenshannon":
+            middle = (reference_percents + current_percents) / 2
+            divergence = special.rel_entr(reference_percents, middle) + special.rel_entr(current_percents, middle)
+            return np.sqrt(np.add.reduceat(divergence, starts[:-1]) / 2)
+        reference_percents = _fill_zeros(reference_percents, starts)
+        current_percents = _fill_zeros(current_percents, starts)
+        if stattest == "psi":
+            terms = (reference_percents - current_percents) * np.log(reference_percents / current_percents)
+            return np.add.reduceat(terms, starts[:-1])
+        # scipy's entropy, used by Evidently's kl_div, normalizes both distributions once the zeros are filled
+        terms = special.rel_entr(_normalize(reference_percents, starts), _normalize(current_percents, starts))
+        return np.add.reduceat(terms, starts[:-1])
+
+
+def binned_drift_score(reference_counts, current_counts, stattest: str = "psi") -> float:
+    """Compute the binned drift score of a single column from aligned reference and current counts."""
+    reference_counts = np.asarray(reference_counts)
+    starts = np.array([0, len(reference_counts)])
+    return float(binned_drift_scores(reference_counts, np.asarray(current_counts), starts, stattest)[0])
+
+
+def profile_drift(profile, current, stattest: str = "psi", stattest_threshold: float = None, columns=None, per_column_stattest: dict = None) -> dict:
+    """
+    Compute the drift of the current data against a reference profile.
+
+    Only the current data is binned, the reference side comes from the profile. All the columns are binned
+    together (see `binned_counts`) and scored with one batch of array operations per stattest.
+
+    Parameters:
+    - profile (ReferenceProfile): Profile of the reference data.
+    - current (pd.DataFrame): Current data.
+    - stattest (str): "psi", "kl_div" or "jensenshannon". Defaults to "psi".
+    - stattest_threshold (float, optional): Drift threshold. Defaults to Evidently's threshold of each stattest.
+    - columns (list, optional): Columns to score. Defaults to the profiled columns found in `current`.
+    - per_column_stattest (dict, optional): Stattest of specific columns, the other columns use `stattest`.
+
+    Returns:
+    - dict: Column name as key and, as value, a dict with `drift_score`, `drift_detected`, `stattest_name` and
+      `stattest_threshold`, the fields of Evidently's `drift_by_columns`.
+    """
+    if columns is None:
+        columns = [name for name in profile.columns if name in current.columns]
+    stattests = {name: (per_column_stattest or {}).get(name, stattest) for name in columns}
+    reference_counts, current_counts, starts = binned_counts(profile, current, columns)
+    sizes = np.diff(starts)
+
+    scores = {}
+    for name_of_test in dict.fromkeys(stattests.values()):
+        selected = [i for i, name in enumerate(columns) if stattests[name] == name_of_test]
+        positions = np.concatenate([np.arange(starts[i], starts[i + 1]) for i in selected])
+        selected_starts = np.r_[0, np.cumsum(sizes[selected])]
+        values = binned_drift_scores(reference_counts[positions], current_counts[positions], selected_starts, name_of_test)
+        scores.update({columns[i]: float(value) for i, value in zip(selected, values)})
+
+    drift_by_columns = {}
+    for name in columns:
+        threshold = DEFAULT_THRESHOLDS[stattests[name]] if stattest_threshold is None else stattest_threshold
+        drift_by_columns[name] = {
+            "drift_score": scores[name],
+            "drift_detected": scores[name] >= threshold,
+            "stattest_name": stattests[name],
+            "stattest_threshold": threshold,
+        }
+    return drift_by_columns
+
+
+def profile_drift_scores(profile, current, stattest: str = "psi", columns=None, per_column_stattest: dict = None) -> dict:
+    """Return the drift score per column of `profile_drift`, like `EvidentlyResult.drift_scores`."""
+    drift_by_columns = profile_drift(profile, current, stattest=stattest, columns=columns, per_column_stattest=per_column_stattest)
+    return {name: column["drift_score"] for name, column in drift_by_columns.items()}
+
+
+def sketch_counts(reference_sketch, current_sketch, top_k: int = 100) -> tuple:
+    """
+    Estimate aligned top-K plus "other" counts of a categorical column from two `CategorySketch`.
+
+    The buckets are the `top_k` heavy hitters of the reference and of the current sketch, so a value that becomes
+    frequent only in the current data gets its own bucket. Each bucket is counted with the count-min sketch of
+    both sides and everything else goes to a last "other" bucket.
+
+    Returns:
+    - tuple: `(categories, reference_counts, current_counts, approximation_error)`. `approximation_error` has
+      `bucket_error`, the largest overestimate of a bucket share, `other_error`, the largest error of the "other"
+      share, both with probability `confidence`, and `heavy_hitter_error`, the share under which a frequent value
+      may be missing from the buckets.
+    """
+    categories = pd.Index(reference_sketch.frequent.top(top_k).index).union(current_sketch.frequent.top(top_k).index, sort=False)
+    counts = []
+    for sketch in (reference_sketch, current_sketch):
+        total = sketch.count
+        bucket_counts = np.minimum(sketch.counts.estimate(categories.to_numpy(dtype=object)), total)
+        counts.append(np.r_[bucket_counts, max(total - bucket_counts.sum(), 0)])
+    epsilon = max(reference_sketch.counts.epsilon, current_sketch.counts.epsilon)
+    approximation_error = {
+        "bucket_error": epsilon,
+        "other_error": min(1.0, len(categories) * epsilon),
+        "confidence": min(reference_sketch.counts.confidence, current_sketch.counts.confidence),
+        "heavy_hitter_error": max(
+            sketch.frequent.error / sketch.count if sketch.count else 0.0 for sketch in (reference_sketch, current_sketch)
+        ),
+    }
+    return list(categories) + ["other"], counts[0], counts[1], approximation_error
+
+
+def sketch_drift(reference_sketches: dict, current_sketches: dict, stattest: str = "jensenshannon", stattest_threshold: float = None, top_k: int = 100, columns=None) -> dict:
+    """
+    Compute the drift of high-cardinality categorical columns from bounded-memory sketches.
+
+    Each column is reduced to top-K plus "other" buckets (see `sketch_counts`) and the buckets of all the columns
+    are scored together with `binned_drift_scores`. Only the sketches are needed, never the full frequency
+    tables, so columns with millions of distinct values use a fixed amount of memory.
+
+    Parameters:
+    - reference_sketches (dict): Column name as key and `CategorySketch` of the reference as value.
+    - current_sketches (dict): Column name as key and `CategorySketch` of the current data as value.
+    - stattest (str): "psi", "kl_div" or "jensenshannon". Defaults to "jensenshannon".
+    - stattest_threshold (float, optional): Drift threshold. Defaults to Evidently's threshold of the stattest.
+    - top_k (int): Heavy hitters of each side given their own bucket. Defaults to 100.
+    - columns (list, optional): Columns to score. Defaults to the columns with both sketches.
+
+    Returns:
+    - dict: Column name as key and, as value, a dict with the fields of Evidently's `drift_by_columns`
+      (`drift_score`, `drift_detected`, `stattest_name`, `stattest_threshold`) and `approximation_error`.
+
+    Example:
+    reference_sketches = {"merchant_id": CategorySketch().update(reference["merchant_id"])}
+    current_sketches = {"merchant_id": CategorySketch().update(current["merchant_id"])}
+    drift = sketch_drift(reference_sketches, current_sketches)
+    """
+    if columns is None:
+        columns = [name for name in reference_sketches if name in current_sketches]
+    threshold = DEFAULT_THRESHOLDS[stattest] if stattest_threshold is None else stattest_threshold
+    buckets = [sketch_counts(reference_sketches[name], current_sketches[name], top_k) for name in columns]
+    starts = np.r_[0, np.cumsum([len(categories) for categories, _, _, _ in buckets])].astype(np.int64)
+    scores = binned_drift_scores(
+        np.concatenate([reference_counts for _, reference_counts, _, _ in buckets]).astype(float),
+        np.concatenate([current_counts for _, _, current_counts, _ in buckets]).astype(float),
+        starts,
+        stattest,
+    )
+    return {
+        name: {
+            "drift_score": float(score),
+            "drift_detected": bool(score >= threshold),
+            "stattest_name": stattest,
+            "stattest_threshold": threshold,
+            "approximation_error": error,
+        }
+        for name, score, (_, _, _, error) in zip(columns, scores, buckets)
+    }
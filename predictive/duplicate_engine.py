@@ -0,0 +1,367 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Odd 64-bit multiplier of the row hash recurrence, multiplying by it is a bijection modulo 2**64
+_ROW_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash_key(seed: int) -> str:
+    # pandas' hash functions take a 16 characters key
+    return f"{seed:016d}"[-16:]
+
+
+def _chunk_series(chunk, columns) -> list:
+    # Columns of a pandas DataFrame or of a pyarrow Table/RecordBatch as pandas Series, so both hash the same way
+    if hasattr(chunk, "schema") and hasattr(chunk, "column"):
+        return [chunk.column(name).to_pandas() for name in columns]
+    return [chunk[name] for name in columns]
+
+
+def _value_hashes(series: pd.Series, seed: int) -> np.ndarray:
+    # One uint64 hash per value. Numeric and bool columns are hashed as float64, so 1, 1.0 and True match whatever
+    # dtype a chunk inferred (an int column read with NaN becomes float64), and -0.0 is turned into 0.0 because
+    # pandas compares them equal while their bits differ
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_complex_dtype(series.dtype):
+        series = series.astype("float64") + 0.0
+    return pd.util.hash_pandas_object(series, index=False, hash_key=_hash_key(seed)).to_numpy()
+
+
+def row_hashes(chunk, columns: list = None, seed: int = 0) -> np.ndarray:
+    """
+    Hash every row of a chunk into one 64-bit integer.
+
+    Each column is hashed in one vectorized call (`pd.util.hash_pandas_object`, without the index), and the
+    column hashes are folded left to right with `h = (h ^ column_hash) * multiplier`. Rows with the same values in
+    the same columns get the same hash, missing values included, as in `DataFrame.duplicated`. Numeric and bool
+    columns are hashed as float64, so the hash does not depend on the dtype a chunk inferred. Arrow columns are
+    hashed through their pandas conversion, so a row read from Parquet and the same row in a DataFrame match.
+
+    Parameters:
+    - chunk (pd.DataFrame or pyarrow Table/RecordBatch): Rows to hash.
+    - columns (list, optional): Columns to hash, in this order. Defaults to every column of the chunk.
+    - seed (int): Hash seed, hashes are only comparable with the same seed.
+
+    Returns:
+    - np.ndarray: One uint64 hash per row.
+    """
+    if columns is None:
+        columns = list(chunk.schema.names) if hasattr(chunk, "schema") else list(chunk.columns)
+    hashes = np.full(len(chunk), np.uint64(seed), dtype=np.uint64)
+    for series in _chunk_series(chunk, columns):
+        hashes = (hashes ^ _value_hashes(series, seed)) * _ROW_HASH_MULTIPLIER
+    return hashes
+
+
+class DuplicateRowAccumulator:
+    """
+    Streaming count of duplicated rows across batches, with bounded memory.
+
+    Every row is reduced to a 64-bit `row_hashes` value and a row is a duplicate when its hash was already seen,
+    earlier in the same batch or in any previous batch. Two memories are available:
+    - exact (default): the distinct hashes are kept in a sorted uint64 array, 8 bytes per distinct row. The only
+      error is a 64-bit hash collision, about `distinct rows / 2**64` per checked row;
+    - Bloom filter (`capacity` set): a fixed bit array sized for `capacity` distinct rows at `error_rate`. Rows
+      repeated inside a batch are still found exactly; a row is a cross-batch duplicate when all its `k` bits are
+      already set, which can be a false positive but never misses a duplicate.
+
+    `expected_false_duplicates` adds up the false positive probability of every check, so the true number of
+    duplicated rows lies between `number_of_duplicated_rows - expected_false_duplicates` (on average) and
+    `number_of_duplicated_rows`. With all the rows in one batch, the exact count is the value of Evidently's
+    `TestNumberOfDuplicatedRows`.
+
+    Parameters:
+    - columns (list, optional): Columns that identify a row. Defaults to the columns of the first chunk.
+    - capacity (int, optional): Distinct rows expected over the whole stream. Switches to a Bloom filter.
+    - error_rate (float): False positive rate of the Bloom filter at `capacity` distinct rows. Defaults to 0.1%.
+    - seed (int): Row hash seed.
+
+    Example:
+    accumulator = DuplicateRowAccumulator(capacity=50_000_000).consume(iter_parquet_batches(path, columns=None))
+    duplicates = accumulator.metrics()
+    """
+
+    def __init__(self, columns: list = None, capacity: int = None, error_rate: float = 0.001, seed: int = 0):
+        self.columns = columns
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.seed = seed
+        self.number_of_rows = 0
+        self.number_of_duplicated_rows = 0
+        self.number_of_cross_batch_duplicated_rows = 0
+        self.number_of_distinct_rows = 0
+        self.expected_false_duplicates = 0.0
+        if capacity is None:
+            self.hashes = np.empty(0, dtype=np.uint64)
+        else:
+            self.bits_size = int(np.ceil(-capacity * np.log(error_rate) / np.log(2) ** 2))
+            self.hash_count = max(1, int(round(self.bits_size / capacity * np.log(2))))
+            self.bits = np.zeros((self.bits_size + 7) // 8, dtype=np.uint8)
+            self.bits_set = 0
+
+    @property
+    def exact(self) -> bool:
+        return self.capacity is None
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Probability that a new distinct row is taken for a duplicate, at the current fill."""
+        if self.exact:
+            return self.number_of_distinct_rows / 2.0 ** 64
+        return (self.bits_set / self.bits_size) ** self.hash_count
+
+    def _bit_positions(self, hashes: np.ndarray) -> np.ndarray:
+        # Double hashing: bit i of a row is (h1 + i * h2) mod m, from the two halves of its 64-bit hash
+        low, high = hashes & np.uint64(0xFFFFFFFF), (hashes >> np.uint64(32)) | np.uint64(1)
+        rounds = np.arange(self.hash_count, dtype=np.uint64)[:, None]
+        return (low + rounds * high) % np.uint64(self.bits_size)
+
+    def _seen(self, distinct: np.ndarray) -> np.ndarray:
+        # Which of the distinct hashes of a batch were seen in the previous batches
+        if self.exact:
+            positions = np.minimum(np.searchsorted(self.hashes, distinct), max(len(self.hashes) - 1, 0))
+            return self.hashes[positions] == distinct if len(self.hashes) else np.zeros(len(distinct), dtype=bool)
+        positions = self._bit_positions(distinct)
+        set_bits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return set_bits.all(axis=0).astype(bool)
+
+    def _add(self, new: np.ndarray):
+        # Remember the new distinct hashes of a batch
+        if self.exact:
+            self.hashes = np.insert(self.hashes, np.searchsorted(self.hashes, new), new)
+            return
+        # Only the bytes holding the new bits can change, so the set bits are counted on them before and after
+        positions = np.unique(self._bit_positions(new))
+        touched = np.unique(positions >> np.uint64(3))
+        before = int(np.bitwise_count(self.bits[touched]).sum())
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.bits_set += int(np.bitwise_count(self.bits[touched]).sum()) - before
+
+    def update(self, chunk) -> "DuplicateRowAccumulator":
+        """Add a chunk: a pandas DataFrame or a pyarrow Table/RecordBatch."""
+        if self.columns is None:
+            self.columns = list(chunk.schema.names) if hasattr(chunk, "schema") else list(chunk.columns)
+        distinct, counts = np.unique(row_hashes(chunk, self.columns, self.seed), return_counts=True)
+        self.expected_false_duplicates += len(distinct) * self.false_positive_rate
+        seen = self._seen(distinct)
+        self._add(distinct[~seen])
+
+        self.number_of_rows += len(chunk)
+        self.number_of_distinct_rows += int((~seen).sum())
+        self.number_of_duplicated_rows += len(chunk) - int((~seen).sum())
+        self.number_of_cross_batch_duplicated_rows += int(counts[seen].sum())
+        return self
+
+    def contains_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        """Whether each distinct `row_hashes` value was already seen, a boolean mask; the accumulator is left unchanged."""
+        return self._seen(np.asarray(hashes, dtype=np.uint64))
+
+    def contains(self, chunk) -> np.ndarray:
+        """Whether each row of a chunk was already seen, a boolean mask; the accumulator is left unchanged."""
+        distinct, inverse = np.unique(row_hashes(chunk, self.columns, self.seed), return_inverse=True)
+        return self.contains_hashes(distinct)[inverse.ravel()]
+
+    def consume(self, chunks) -> "DuplicateRowAccumulator":
+        """Add every chunk of an iterable, e.g. `pd.read_csv(..., chunksize=...)` or `iter_parquet_batches`."""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: "DuplicateRowAccumulator") -> "DuplicateRowAccumulator":
+        """
+        Add the rows of another exact accumulator, as if its batches came after the ones of this accumulator.
+
+        A Bloom filter cannot tell how many rows two filters share, so only exact accumulators can be merged.
+        """
+        if not (self.exact and other.exact) or self.seed != other.seed or self.columns != other.columns:
+            raise ValueError("Only exact accumulators with the same columns and seed can be merged")
+        shared = int(np.isin(other.hashes, self.hashes, assume_unique=True).sum())
+        self.expected_false_duplicates += other.expected_false_duplicates + len(other.hashes) * self.false_positive_rate
+        self.hashes = np.union1d(self.hashes, other.hashes)
+        self.number_of_rows += other.number_of_rows
+        self.number_of_distinct_rows = len(self.hashes)
+        self.number_of_duplicated_rows += other.number_of_duplicated_rows + shared
+        self.number_of_cross_batch_duplicated_rows += other.number_of_cross_batch_duplicated_rows + shared
+        return self
+
+    def metrics(self) -> dict:
+        """
+        Return the duplicate counts of all the rows seen so far.
+
+        Returns:
+        - dict: `number_of_rows`, `number_of_duplicated_rows` (rows repeating an earlier row, in the same or an
+          earlier batch), `share_of_duplicated_rows`, `number_of_cross_batch_duplicated_rows` (rows repeating a row
+          of an earlier batch), `number_of_distinct_rows`, `exact`, `false_positive_rate` at the current fill and
+          `expected_false_duplicates`, the expected number of rows counted as duplicates by mistake.
+        """
+        return {
+            "number_of_rows": self.number_of_rows,
+            "number_of_duplicated_rows": self.number_of_duplicated_rows,
+            "share_of_duplicated_rows": self.number_of_duplicated_rows / self.number_of_rows if self.number_of_rows else 0.0,
+            "number_of_cross_batch_duplicated_rows": self.number_of_cross_batch_duplicated_rows,
+            "number_of_distinct_rows": self.number_of_distinct_rows,
+            "exact": self.exact,
+            "false_positive_rate": self.false_positive_rate,
+            "expected_false_duplicates": self.expected_false_duplicates,
+        }
+
+    def to_dict(self) -> dict:
+        """Serialize the accumulator into plain JSON types, e.g. to carry the seen rows over to the next day."""
+        state = {
+            "columns": self.columns,
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "seed": self.seed,
+            "number_of_rows": self.number_of_rows,
+            "number_of_duplicated_rows": self.number_of_duplicated_rows,
+            "number_of_cross_batch_duplicated_rows": self.number_of_cross_batch_duplicated_rows,
+            "number_of_distinct_rows": self.number_of_distinct_rows,
+            "expected_false_duplicates": self.expected_false_duplicates,
+        }
+        if self.exact:
+            state["hashes"] = self.hashes.tolist()
+        else:
+            state["bits"] = self.bits.tolist()
+            state["bits_set"] = self.bits_set
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "DuplicateRowAccumulator":
+        """Rebuild an accumulator serialized with `to_dict`."""
+        accumulator = cls(columns=state["columns"], capacity=state["capacity"], error_rate=state["error_rate"], seed=state["seed"])
+        for key in ("number_of_rows", "number_of_duplicated_rows", "number_of_cross_batch_duplicated_rows",
+                    "number_of_distinct_rows", "expected_false_duplicates"):
+            setattr(accumulator, key, state[key])
+        if accumulator.exact:
+            accumulator.hashes = np.asarray(state["hashes"], dtype=np.uint64)
+        else:
+            accumulator.bits = np.asarray(state["bits"], dtype=np.uint8)
+            # States saved before `bits_set` was serialized count the set bits once
+            bits_set = state.get("bits_set")
+            accumulator.bits_set = int(np.bitwise_count(accumulator.bits).sum()) if bits_set is None else bits_set
+        return accumulator
+
+
+def column_fingerprints(data, columns: list = None, seed: int = 0) -> dict:
+    """
+    Fingerprint the content of every column in one linear pass.
+
+    The values of a column are hashed like in `row_hashes` and the resulting uint64 buffer is digested with
+    BLAKE2b. Two columns with the same values in the same order get the same digest.
+    The dtype is part of the fingerprint, because `Series.equals` never matches columns of different dtypes.
+
+    Parameters:
+    - data (pd.DataFrame or pyarrow Table/RecordBatch): Data of the columns.
+    - columns (list, optional): Columns to fingerprint. Defaults to every column.
+    - seed (int): Hash seed.
+
+    Returns:
+    - dict: Column name as key and `(dtype, digest)` as value.
+    """
+    if columns is None:
+        columns = list(data.schema.names) if hasattr(data, "schema") else list(data.columns)
+    fingerprints = {}
+    for name, series in zip(columns, _chunk_series(data, columns)):
+        digest = hashlib.blake2b(_value_hashes(series, seed).tobytes(), digest_size=16).hexdigest()
+        fingerprints[name] = (series.dtype, digest)
+    return fingerprints
+
+
+def duplicated_columns(data, columns: list = None, seed: int = 0) -> dict:
+    """
+    Find the duplicated columns of a dataset from their fingerprints instead of comparing every pair.
+
+    Columns are grouped by `column_fingerprints`, and only the columns sharing a fingerprint are compared with
+    `Series.equals`, so a hash collision can never report a false duplicate. The count is the number of equal
+    column pairs, the value of Evidently's `TestNumberOfDuplicatedColumns`: a group of `g` identical columns counts
+    `g * (g - 1) / 2`.
+
+    Parameters:
+    - data (pd.DataFrame or pyarrow Table/RecordBatch): Data of the columns.
+    - columns (list, optional): Columns to check. Defaults to every column.
+    - seed (int): Hash seed.
+
+    Returns:
+    - dict: `number_of_duplicated_columns` and `duplicated_column_groups`, the lists of identical columns.
+
+    Example:
+    duplicated = duplicated_columns(adult_prod)["duplicated_column_groups"]  # [["education", "dup_col"]]
+    """
+    candidates = {}
+    for name, fingerprint in column_fingerprints(data, columns, seed).items():
+        candidates.setdefault(fingerprint, []).append(name)
+
+    groups = []
+    for names in candidates.values():
+        if len(names) < 2:
+            continue
+        # Verify the candidates: split them into classes of equal columns, compared with a representative each
+        series = dict(zip(names, _chunk_series(data, names)))
+        classes = []
+        for name in names:
+            match = next((members for members in classes if series[members[0]].equals(series[name])), None)
+            if match is None:
+                classes.append([name])
+            else:
+                match.append(name)
+        groups += [members for members in classes if len(members) > 1]
+    return {
+        "number_of_duplicated_columns": sum(len(members) * (len(members) - 1) // 2 for members in groups),
+        "duplicated_column_groups": groups,
+    }
+
+
+def _as_chunks(data) -> list:
+    # One DataFrame or Arrow table/batch is a single chunk, anything else is an iterable of chunks
+    return [data] if isinstance(data, pd.DataFrame) or hasattr(data, "schema") else data
+
+
+def row_overlap(reference, current, columns: list = None, capacity: int = None, error_rate: float = 0.001, seed: int = 0) -> dict:
+    """
+    Share of the current rows that also appear in the reference data, a streaming hash join on row fingerprints.
+
+    The reference chunks are hashed once into a `DuplicateRowAccumulator` (an exact set of row hashes, or a Bloom
+    filter with `capacity`), then every current chunk is hashed and probed against it. Only 64-bit hashes are kept,
+    never a merge of the two datasets, so memory is 8 bytes per distinct reference row, or fixed with a Bloom filter.
+
+    Parameters:
+    - reference: Reference data, a DataFrame, a pyarrow Table/RecordBatch or an iterable of them (e.g.
+      `iter_parquet_batches`). A filled `DuplicateRowAccumulator` is reused as is, e.g. one saved with `to_dict`.
+    - current: Current data, in the same forms.
+    - columns (list, optional): Columns that identify a row. Defaults to the columns of the first reference chunk.
+    - capacity (int, optional): Distinct reference rows expected. Switches to a Bloom filter.
+    - error_rate (float): False positive rate of the Bloom filter at `capacity` distinct rows. Defaults to 0.1%.
+    - seed (int): Row hash seed.
+
+    Returns:
+    - dict: `number_of_current_rows`, `number_of_overlapping_rows` (current rows found in the reference),
+      `share_of_overlapping_rows`, `number_of_distinct_overlapping_rows`, `number_of_reference_rows`, `exact` and
+      `expected_false_overlaps`, the expected number of current rows matched by mistake.
+
+    Example:
+    leakage = row_overlap(iter_parquet_batches("train.parquet", columns=None), test_df)["share_of_overlapping_rows"]
+    """
+    if isinstance(reference, DuplicateRowAccumulator):
+        index = reference
+    else:
+        index = DuplicateRowAccumulator(columns=columns, capacity=capacity, error_rate=error_rate, seed=seed).consume(_as_chunks(reference))
+
+    # The distinct overlapping rows are kept as a sorted uint64 array of their hashes, like the exact accumulator
+    number_of_rows, overlapping, distinct_overlapping, expected_false = 0, 0, np.empty(0, dtype=np.uint64), 0.0
+    for chunk in _as_chunks(current):
+        distinct, counts = np.unique(row_hashes(chunk, index.columns, index.seed), return_counts=True)
+        found = index.contains_hashes(distinct)
+        number_of_rows += len(chunk)
+        overlapping += int(counts[found].sum())
+        distinct_overlapping = np.union1d(distinct_overlapping, distinct[found])
+        expected_false += len(distinct) * index.false_positive_rate
+    return {
+        "number_of_current_rows": number_of_rows,
+        "number_of_overlapping_rows": overlapping,
+        "share_of_overlapping_rows": overlapping / number_of_rows if number_of_rows else 0.0,
+        "number_of_distinct_overlapping_rows": len(distinct_overlapping),
+        "number_of_reference_rows": index.number_of_rows,
+        "exact": index.exact,
+        "expected_false_overlaps": expected_false,
+    }
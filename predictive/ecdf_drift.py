@@ -0,0 +1,297 @@
+import math
+import weakref
+
+import numpy as np
+import pandas as pd
+from evidently.calculations.stattests import anderson_darling_test, cramer_von_mises as cramer_von_mises_test, ks_stat_test, wasserstein_stat_test
+from evidently.core import ColumnType
+from scipy import special, stats
+
+from predictive.reference_profile import finite_values
+
+ECDF_STATTESTS = ("ks", "wasserstein", "anderson", "cramer_von_mises")
+
+# Below these reference sizes the exact distributions of Evidently's tests are used instead of the asymptotic
+# ones (scipy's ks_2samp up to 10,000 values, the Cramer-von Mises test up to 20), so they run on the raw values
+MAX_EXACT_SIZE = 10_000
+
+# Sorted references of every profile, built on first use and dropped with the profile
+_sorted_references = weakref.WeakKeyDictionary()
+
+
+class SortedReference:
+    """
+    Sorted reference values of one column, with the running sums the ECDF tests read.
+
+    The values are either the full sorted reference (`exact`) or its quantile grid, each grid point then standing
+    for `count / len(values)` reference values.
+
+    Parameters:
+    - values (np.ndarray): Sorted reference values, or their quantiles.
+    - count (int, optional): Number of reference values. Defaults to `len(values)` (full sorted reference).
+    """
+
+    def __init__(self, values: np.ndarray, count: int = None):
+        self.values = np.asarray(values, dtype=float)
+        self.count = len(self.values) if count is None else int(count)
+        self.exact = self.count == len(self.values)
+        self.scale = self.count / len(self.values)
+        self.cumsum = np.r_[0.0, np.cumsum(self.values)]
+        self.std = float(np.std(self.values))
+        self.uniques, first = np.unique(self.values, return_index=True)
+        self.unique_counts = np.diff(np.r_[first, len(self.values)]) * self.scale
+        self.below = first * self.scale
+        # Sum over the tied reference values of the squared distance to their mid-rank, see `cramer_von_mises`
+        self.tie_sum = float(np.sum((self.unique_counts**3 - self.unique_counts) / 12))
+
+    def counts_below(self, x, side: str = "left") -> np.ndarray:
+        """Number of reference values below `x` (`side="left"`) or below or equal to `x` (`side="right"`)."""
+        return np.searchsorted(self.values, x, side=side) * self.scale
+
+    def integral(self, x) -> np.ndarray:
+        """Integral of the reference ECDF from -inf to `x`."""
+        below = np.searchsorted(self.values, x, side="right")
+        return (below * np.asarray(x, dtype=float) - self.cumsum[below]) / len(self.values)
+
+
+def sorted_reference(profile, name: str) -> SortedReference:
+    """Return the cached `SortedReference` of a profiled numerical column, from its sorted values or quantiles."""
+    cache = _sorted_references.setdefault(profile, {})
+    if name not in cache:
+        column = profile[name]
+        if "sorted" in column:
+            cache[name] = SortedReference(column["sorted"])
+        else:
+            cache[name] = SortedReference(column["quantiles"], column["count"])
+    return cache[name]
+
+
+def _current_counts(current: np.ndarray) -> tuple:
+    # Unique current values with the number of current values below and at each of them
+    uniques, first = np.unique(current, return_index=True)
+    return uniques, first.astype(float), np.diff(np.r_[first, len(current)]).astype(float)
+
+
+def ks(reference: SortedReference, current: np.ndarray) -> float:
+    """
+    p-value of the two-sample Kolmogorov-Smirnov test, like scipy's `ks_2samp` with its asymptotic distribution.
+
+    Between two current values the current ECDF is flat and the reference ECDF is monotone, so the largest gap
+    is reached at a current value or just before it: only the current values are looked up in the reference.
+    """
+    n, m = reference.count, len(current)
+    uniques, below, at = _current_counts(current)
+    reference_left = reference.counts_below(uniques, "left") / n
+    reference_right = reference.counts_below(uniques, "right") / n
+    differences = np.r_[reference_right - (below + at) / m, reference_left - below / m]
+    d = max(float(differences.max()), float(np.clip(-differences.min(), 0, 1)))
+    larger, smaller = max(n, m), min(n, m)
+    return float(np.clip(stats.kstwo.sf(d, np.round(larger * smaller / (larger + smaller))), 0, 1))
+
+
+def wasserstein(reference: SortedReference, current: np.ndarray) -> float:
+    """
+    Wasserstein distance normed by the reference standard deviation, like Evidently's "wasserstein" stattest.
+
+    The area between the two ECDFs is integrated between consecutive current values, where the current ECDF is
+    a constant `c`: the reference ECDF crosses `c` once, at its `c` quantile, and the integral of the reference
+    ECDF on each side comes from the running sums of the sorted reference.
+    """
+    m = len(current)
+    uniques, below, at = _current_counts(current)
+    levels = np.r_[0.0, (below + at) / m]
+    start = np.r_[min(reference.values[0], uniques[0]), uniques]
+    end = np.r_[uniques, max(reference.values[-1], uniques[-1])]
+    # First sorted reference value whose ECDF reaches the level, the start of the segment for level 0
+    size = len(reference.values)
+    crossing_index = np.clip(np.ceil(levels * size - 1e-9).astype(np.intp) - 1, 0, size - 1)
+    crossing = np.where(levels > 0, reference.values[crossing_index], start)
+    crossing = np.clip(crossing, start, end)
+    start_integral, crossing_integral, end_integral = (reference.integral(x) for x in (start, crossing, end))
+    area = (
+        levels * (crossing - start)
+        - (crossing_integral - start_integral)
+        + (end_integral - crossing_integral)
+        - levels * (end - crossing)
+    )
+    return float(area.sum()) / max(reference.std, 0.001)
+
+
+def _cvm_limit_cdf(x: float) -> float:
+    # CDF of the limiting distribution of the Cramer-von Mises statistic, eq. 1.2 of Csorgo and Faraway (1996). Adapted
+    # from `_cdf_cvm_inf` of scipy.stats (BSD-3-Clause), the function Evidently's test calls: the terms of the series
+    # are added until they are below 1e-7
+    total, k = 0.0, 0
+    while True:
+        y = 4 * k + 1
+        q = y**2 / (16 * x)
+        term = (
+            np.exp(special.gammaln(k + 0.5) - special.gammaln(k + 1)) / (np.pi**1.5 * np.sqrt(x))
+            * np.sqrt(y) * np.exp(-q) * special.kv(0.25, q)
+        )
+        total += term
+        if abs(term) < 1e-7:
+            return float(total)
+        k += 1
+
+
+def cramer_von_mises(reference: SortedReference, current: np.ndarray) -> float:
+    """
+    p-value of the two-sample Cramer-von Mises test with mid-ranks, like Evidently's "cramer_von_mises" stattest.
+
+    The rank statistic is rewritten per distinct value: the `a` reference values tied at `v` contribute
+    `a * (B + b / 2)**2 + (a**3 - a) / 12`, `B` and `b` being the current values below and at `v`. `B` only
+    changes at current values, so the reference side reduces to range counts between current values plus the
+    tie term summed once for the reference.
+    """
+    n, m = reference.count, len(current)
+    uniques, below, at = _current_counts(current)
+    reference_left = reference.counts_below(uniques, "left")
+    reference_right = reference.counts_below(uniques, "right")
+    reference_at = reference_right - reference_left
+    between = reference_left - np.r_[0.0, reference_right[:-1]]
+    reference_sum = (
+        np.sum(between * below**2)
+        + np.sum(reference_at * (below + at / 2) ** 2)
+        + (n - reference_right[-1]) * m**2
+        + reference.tie_sum
+    )
+    current_sum = np.sum(at * (reference_left + reference_at / 2) ** 2 + (at**3 - at) / 12)
+    u = n * reference_sum + m * current_sum
+    k, size = n * m, n + m
+    t = u / (k * size) - (4 * k - 1) / (6 * size)
+    expected = (1 + 1 / size) / 6
+    variance = (size + 1.0) * (4 * k * size - 3 * (n**2 + m**2) - 2 * k) / (45 * size**2 * 4 * k)
+    normalized = 1 / 6 + (t - expected) / np.sqrt(45 * variance)
+    return 1.0 if normalized < 0.003 else float(max(0, 1.0 - _cvm_limit_cdf(normalized)))
+
+
+def anderson(reference: SortedReference, current: np.ndarray) -> float:
+    """
+    p-value of the k-sample Anderson-Darling test with mid-ranks for two samples, like scipy's `anderson_ksamp`.
+
+    The statistic sums over every distinct value of both samples. The distinct reference values and their counts
+    are cached, so one linear pass over them replaces the sort of the pooled sample; the current values are
+    placed among them with a binary search.
+    """
+    n, m = reference.count, len(current)
+    size = n + m
+    uniques, below, at = _current_counts(current)
+    position = np.searchsorted(reference.uniques, uniques)
+    tied = position < len(reference.uniques)
+    tied[tied] = reference.uniques[position[tied]] == uniques[tied]
+    # Current values below and at each distinct reference value
+    strictly_before = np.bincount(position[~tied], weights=at[~tied], minlength=len(reference.uniques) + 1)
+    current_at = np.bincount(position[tied], weights=at[tied], minlength=len(reference.uniques))
+    current_below = np.cumsum(strictly_before)[:-1] + np.r_[0.0, np.cumsum(current_at)[:-1]]
+    reference_mid = np.r_[reference.below + reference.unique_counts / 2, np.r_[reference.below, n][position[~tied]]]
+    current_mid = np.r_[current_below + current_at / 2, below[~tied] + at[~tied] / 2]
+    ties = np.r_[reference.unique_counts + current_at, at[~tied]]
+    if len(ties) < 2:
+        raise ValueError("anderson_ksamp needs more than one distinct observation")
+
+    pooled_mid = reference_mid + current_mid
+    difference = m * reference_mid - n * current_mid
+    inner = ties / size * difference**2 / (pooled_mid * (size - pooled_mid) - size * ties / 4)
+    statistic = float(inner.sum()) * (1 / n + 1 / m) * (size - 1.0) / size
+
+    # Normalization of Scholz and Stephens for k = 2 samples, as in scipy
+    h_sum = 1 / n + 1 / m
+    harmonic = (1.0 / np.arange(size - 1, 1, -1)).cumsum()
+    h = harmonic[-1] + 1
+    g = (harmonic / np.arange(2, size)).sum()
+    k = 2
+    a = (4 * g - 6) * (k - 1) + (10 - 6 * g) * h_sum
+    b = (2 * g - 4) * k**2 + 8 * h * k + (2 * g - 14 * h - 4) * h_sum - 8 * h + 4 * g - 6
+    c = (6 * h + 2 * g - 2) * k**2 + (4 * h - 4 * g + 6) * k + (2 * h - 6) * h_sum + 4 * h
+    d = (2 * h + 6) * k**2 - 4 * h * k
+    sigmasq = (a * size**3 + b * size**2 + c * size + d) / ((size - 1.0) * (size - 2.0) * (size - 3.0))
+    normalized = (statistic - 1) / math.sqrt(sigmasq)
+    critical = np.array([0.675, 1.281, 1.645, 1.96, 2.326, 2.573, 3.085])
+    critical += np.array([-0.245, 0.25, 0.678, 1.149, 1.822, 2.364, 3.615])
+    critical += np.array([-0.105, -0.305, -0.362, -0.391, -0.396, -0.345, -0.154])
+    significance = np.array([0.25, 0.1, 0.05, 0.025, 0.01, 0.005, 0.001])
+    if normalized < critical.min():
+        return 0.25
+    if normalized > critical.max():
+        return 0.001
+    return math.exp(np.polyval(np.polyfit(critical, np.log(significance), 2), normalized))
+
+
+ECDF_TESTS = {"ks": ks, "wasserstein": wasserstein, "anderson": anderson, "cramer_von_mises": cramer_von_mises}
+
+# Evidently's StatTest of each ECDF stattest, for its default threshold and its exact test on small samples
+_EVIDENTLY_TESTS = {
+    "ks": ks_stat_test,
+    "wasserstein": wasserstein_stat_test,
+    "anderson": anderson_darling_test,
+    "cramer_von_mises": cramer_von_mises_test,
+}
+
+
+def ecdf_drift(profile, current: pd.DataFrame, stattest: str = "ks", stattest_threshold: float = None, columns=None, per_column_stattest: dict = None) -> dict:
+    """
+    Run ECDF-based stattests on the current data against the sorted reference of a profile.
+
+    The reference side is sorted once, when the profile is built, and cached per column with its running sums.
+    Each run only sorts the current values and places them in the reference with binary searches, so the cost
+    grows with the current window instead of the reference. Anderson-Darling also needs one linear pass over
+    the distinct reference values.
+
+    Profiles built with `keep_sorted=True` give the scores of Evidently's stattests (up to rounding). Other
+    profiles use their quantile grid as the reference, an approximation. Exact references of at most
+    `MAX_EXACT_SIZE` values run Evidently's own stattests, which use exact distributions on small samples.
+
+    Parameters:
+    - profile (ReferenceProfile): Profile of the reference data.
+    - current (pd.DataFrame): Current data.
+    - stattest (str): "ks", "wasserstein", "anderson" or "cramer_von_mises". Defaults to "ks".
+    - stattest_threshold (float, optional): Drift threshold. Defaults to Evidently's threshold of each stattest.
+    - columns (list, optional): Columns to test. Defaults to the profiled numerical columns found in `current`.
+    - per_column_stattest (dict, optional): Stattest of specific columns, the other columns use `stattest`.
+
+    Returns:
+    - dict: Column name as key and, as value, a dict with `drift_score`, `drift_detected`, `stattest_name` and
+      `stattest_threshold`, the fields of Evidently's `drift_by_columns`. A column without current values gets
+      a NaN score and no drift.
+    """
+    if columns is None:
+        columns = [name for name in profile.columns if name in current.columns and profile[name]["type"] == "num"]
+
+    drift_by_columns = {}
+    for name in columns:
+        test = (per_column_stattest or {}).get(name, stattest)
+        if test not in ECDF_TESTS:
+            raise ValueError(f"Unsupported ECDF stattest: {test}")
+        reference = sorted_reference(profile, name)
+        values = np.sort(finite_values(current[name]).to_numpy(dtype=float))
+        # Evidently's threshold and comparison for this stattest
+        evidently_test = _EVIDENTLY_TESTS[test]
+        threshold = evidently_test.default_threshold if stattest_threshold is None else stattest_threshold
+        if not len(values):
+            # No current value to compare with the reference
+            score, detected = float("nan"), False
+        elif reference.exact and reference.count <= MAX_EXACT_SIZE:
+            result = evidently_test(pd.Series(reference.values), pd.Series(values), ColumnType.Numerical, threshold)
+            score, detected = float(result.drift_score), bool(result.drifted)
+        else:
+            score = ECDF_TESTS[test](reference, values)
+            if test == "wasserstein":
+                detected = score >= threshold
+            elif test == "anderson":
+                detected = score < threshold
+            else:
+                detected = score <= threshold
+        drift_by_columns[name] = {
+            "drift_score": score,
+            "drift_detected": bool(detected),
+            "stattest_name": test,
+            "stattest_threshold": threshold,
+        }
+    return drift_by_columns
+
+
+def ecdf_drift_scores(profile, current: pd.DataFrame, stattest: str = "ks", columns=None, per_column_stattest: dict = None) -> dict:
+    """Return the drift score per column of `ecdf_drift`, like `EvidentlyResult.drift_scores`."""
+    drift_by_columns = ecdf_drift(profile, current, stattest=stattest, columns=columns, per_column_stattest=per_column_stattest)
+    return {name: column["drift_score"] for name, column in drift_by_columns.items()}
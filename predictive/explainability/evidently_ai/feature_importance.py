@@ -1,7 +1,12 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 from evidently.report import Report
 from evidently.metrics import DataDriftTable
 import numpy as np
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
 
 # Fetching the data from OpenML. Here, we use the "adult" dataset.
 adult_data = datasets.fetch_openml(name="adult", version=2, as_frame="auto")
@@ -36,7 +41,7 @@ report = Report(metrics=[
 report.run(reference_data=adult_ref, current_data=adult_prod.iloc[0:100, :])
 
 # Extract the feature importances from the report.
-original_fi = report.as_dict()["metrics"][0]['result']['current_fi']
+original_fi = EvidentlyResult(report).metric_value(0, "current_fi")
 
 # Arrange the feature importances in descending order.
 arranged_fi = dict(sorted(
@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+
+from predictive.classification_engine import chunk_columns
+
+
+def iter_csv_batches(path: str, columns: list = None, block_size: int = 64 << 20):
+    """
+    Yield a CSV file as pyarrow record batches, `block_size` bytes at a time.
+
+    Empty strings and the usual null markers ("NA", "NaN", "null", ...) are read as nulls in every column, like
+    `pd.read_csv` does, so the counts match the ones of the same file read with pandas.
+
+    Parameters:
+    - path (str): Path of the CSV file.
+    - columns (list, optional): Columns to read. Defaults to every column.
+    - block_size (int): Bytes parsed per batch. Defaults to 64 MiB.
+
+    Returns:
+    - generator: pyarrow.RecordBatch objects.
+    """
+    import pyarrow.csv as pa_csv
+
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(include_columns=columns, strings_can_be_null=True),
+    )
+    yield from reader
+
+
+def _record_batches(chunk) -> list:
+    # A pyarrow Table is split into its record batches, a RecordBatch is used as is
+    return chunk.to_batches() if hasattr(chunk, "to_batches") else [chunk]
+
+
+def _missing_counts(array) -> dict:
+    # Missing values of one Arrow array with Evidently's default definition: nulls and NaN, "" and +/-inf
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    counts = {"null": array.null_count, "empty_string": 0, "infinite": 0}
+    if pa.types.is_floating(array.type):
+        counts["null"] += int(pc.sum(pc.is_nan(array)).as_py() or 0)
+        counts["infinite"] = int(pc.sum(pc.is_inf(array)).as_py() or 0)
+    elif pa.types.is_dictionary(array.type) and pa.types.is_string(array.type.value_type):
+        # Compare the dictionary once, then count the indices pointing to an empty string
+        empty = np.flatnonzero(pc.fill_null(pc.equal(array.dictionary, ""), False).to_numpy(zero_copy_only=False))
+        if len(empty):
+            in_empty = pc.is_in(array.indices, value_set=pa.array(empty, array.indices.type))
+            counts["empty_string"] = int(pc.sum(in_empty).as_py() or 0)
+    elif pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        counts["empty_string"] = int(pc.sum(pc.equal(array, "")).as_py() or 0)
+    return counts
+
+
+def _null_mask(array) -> np.ndarray:
+    # Rows that pandas' isna() flags: Arrow nulls, and NaN in floating point columns
+    import pyarrow.compute as pc
+
+    return pc.is_null(array, nan_is_null=True).to_numpy(zero_copy_only=False)
+
+
+class MissingValuesAccumulator:
+    """
+    Streaming missing-value profile of Arrow record batches, without converting them to pandas.
+
+    Null counts come from the validity bitmaps of the Arrow columns; only floating point columns (NaN, +/-inf) and
+    string columns ("") are scanned for the other missing markers. Empty rows are tracked with a bitmask per batch,
+    AND-ed column by column, and the masks stop being built as soon as a column without nulls proves that no row
+    of the batch is empty.
+
+    The four totals are the values of Evidently's `TestShareOfMissingValues`, `TestNumberOfMissingValues`,
+    `TestNumberOfEmptyRows` and `TestNumberOfEmptyColumns` over all the rows seen: missing values are nulls, NaN,
+    "" and +/-inf, while empty rows and columns only count nulls and NaN.
+
+    Example:
+    accumulator = MissingValuesAccumulator().consume(iter_parquet_batches("day.parquet", columns=None))
+    missing_values = accumulator.metrics()
+    """
+
+    def __init__(self):
+        self.number_of_rows = 0
+        self.number_of_empty_rows = 0
+        self.columns = {}
+
+    def update(self, batch) -> "MissingValuesAccumulator":
+        """Add a pyarrow RecordBatch or Table."""
+        for record_batch in _record_batches(batch):
+            empty_rows = np.ones(record_batch.num_rows, dtype=bool)
+            for name, array in zip(record_batch.schema.names, record_batch.columns):
+                counts = _missing_counts(array)
+                column = self.columns.setdefault(name, dict.fromkeys(counts, 0))
+                for key, value in counts.items():
+                    column[key] += value
+                if counts["null"] == 0:
+                    empty_rows[:] = False
+                elif empty_rows.any():
+                    empty_rows &= _null_mask(array)
+            self.number_of_rows += record_batch.num_rows
+            self.number_of_empty_rows += int(empty_rows.sum()) if self.columns else 0
+        return self
+
+    def consume(self, chunks) -> "MissingValuesAccumulator":
+        """Add every chunk of an iterable of pyarrow record batches or tables, e.g. `iter_parquet_batches`."""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: "MissingValuesAccumulator") -> "MissingValuesAccumulator":
+        """Add the counts of another accumulator, e.g. one filled by another worker on other files."""
+        self.number_of_rows += other.number_of_rows
+        self.number_of_empty_rows += other.number_of_empty_rows
+        for name, counts in other.columns.items():
+            column = self.columns.setdefault(name, dict.fromkeys(counts, 0))
+            for key, value in counts.items():
+                column[key] += value
+        return self
+
+    def metrics(self) -> dict:
+        """
+        Return the missing-value metrics of all the rows seen so far.
+
+        Returns:
+        - dict: `share_of_missing_values`, `number_of_missing_values`, `number_of_empty_rows`,
+          `number_of_empty_columns` and `by_column`, with per column the number and share of missing values and
+          their split into `null` (nulls and NaN), `empty_string` and `infinite`.
+        """
+        by_column = {}
+        for name, counts in self.columns.items():
+            missing = counts["null"] + counts["empty_string"] + counts["infinite"]
+            by_column[name] = {
+                "number_of_missing_values": missing,
+                "share_of_missing_values": missing / self.number_of_rows if self.number_of_rows else 0.0,
+                **counts,
+            }
+        number_of_missing_values = sum(column["number_of_missing_values"] for column in by_column.values())
+        cells = self.number_of_rows * len(self.columns)
+        return {
+            "share_of_missing_values": number_of_missing_values / cells if cells else 0.0,
+            "number_of_missing_values": number_of_missing_values,
+            "number_of_empty_rows": self.number_of_empty_rows,
+            "number_of_empty_columns": sum(counts["null"] == self.number_of_rows for counts in self.columns.values()),
+            "by_column": by_column,
+        }
+
+
+def reference_ranges(profile, columns=None, lower_quantile: float = 0.0, upper_quantile: float = 1.0, rules=None) -> pd.DataFrame:
+    """
+    Build a range rule table, with bounds taken from the quantiles of a reference profile.
+
+    With the default quantiles the bounds are the reference min and max, the default range of Evidently's
+    `TestShareOfOutRangeValues`. Explicit bounds of `rules` take precedence, a `None` bound is learned.
+
+    Parameters:
+    - profile (ReferenceProfile): Profile of the reference data.
+    - columns (list, optional): Columns to cover. Defaults to the numerical profiled columns and the columns of `rules`.
+    - lower_quantile (float): Reference quantile of the left bounds. Defaults to 0 (the minimum).
+    - upper_quantile (float): Reference quantile of the right bounds. Defaults to 1 (the maximum).
+    - rules (dict or pd.DataFrame, optional): Explicit bounds, `{column: (left, right)}` or a rule table.
+
+    Returns:
+    - pd.DataFrame: Rule table indexed by column, with `left` and `right` columns.
+
+    Example:
+    rules = reference_ranges(profile, lower_quantile=0.001, upper_quantile=0.999, rules={"age": (0, 100)})
+    """
+    explicit = _rule_table(rules) if rules is not None else pd.DataFrame(columns=["left", "right"], dtype=float)
+    if columns is None:
+        columns = [name for name in profile.columns if profile[name]["type"] == "num"]
+        columns += [name for name in explicit.index if name not in columns]
+    table = explicit.reindex(columns).astype(float)
+    for name in columns:
+        column = profile[name] if name in profile else {}
+        quantiles = column.get("quantiles", np.empty(0))
+        if len(quantiles):
+            grid = np.linspace(0, 1, len(quantiles))
+            learned = np.interp([lower_quantile, upper_quantile], grid, quantiles)
+            table.loc[name] = table.loc[name].fillna(pd.Series(learned, index=["left", "right"]))
+    return table
+
+
+def _rule_table(rules) -> pd.DataFrame:
+    # Rule tables are DataFrames indexed by column with `left` and `right`, or `{column: (left, right)}` dicts
+    if isinstance(rules, pd.DataFrame):
+        return rules[["left", "right"]].astype(float)
+    return pd.DataFrame.from_dict(dict(rules), orient="index", columns=["left", "right"]).astype(float)
+
+
+class RangeRuleAccumulator:
+    """
+    Share of out-of-range values for many columns, all rules evaluated in one vectorized pass per chunk.
+
+    The columns of a chunk form one (columns x rows) float array that is compared with the left and right bounds
+    of all the rules at once, instead of running one `TestShareOfOutRangeValues` per column. As in Evidently,
+    missing values are left out and the bounds are inclusive; missing bounds (NaN) are unbounded.
+
+    Parameters:
+    - rules (dict or pd.DataFrame): `{column: (left, right)}` or a rule table from `reference_ranges`.
+
+    Example:
+    accumulator = RangeRuleAccumulator(reference_ranges(profile)).consume(iter_parquet_batches(path, columns=None))
+    out_of_range = accumulator.metrics()
+    """
+
+    def __init__(self, rules):
+        self.rules = _rule_table(rules)
+        self.left = self.rules["left"].fillna(-np.inf).to_numpy()[:, None]
+        self.right = self.rules["right"].fillna(np.inf).to_numpy()[:, None]
+        self.number_of_values = np.zeros(len(self.rules), dtype=np.int64)
+        self.number_not_in_range = np.zeros(len(self.rules), dtype=np.int64)
+
+    def update(self, chunk) -> "RangeRuleAccumulator":
+        """Add a chunk: a pandas DataFrame or a pyarrow Table/RecordBatch holding the rule columns."""
+        if isinstance(chunk, pd.DataFrame):
+            values = chunk[list(self.rules.index)].to_numpy(dtype=float, na_value=np.nan).T
+        else:
+            values = np.vstack([np.asarray(column, dtype=float) for column in chunk_columns(chunk, list(self.rules.index))])
+        valid = ~np.isnan(values)
+        in_range = (values >= self.left) & (values <= self.right)
+        self.number_of_values += valid.sum(axis=1)
+        self.number_not_in_range += (valid & ~in_range).sum(axis=1)
+        return self
+
+    def consume(self, chunks) -> "RangeRuleAccumulator":
+        """Add every chunk of an iterable, e.g. `pd.read_csv(..., chunksize=...)` or `iter_parquet_batches`."""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: "RangeRuleAccumulator") -> "RangeRuleAccumulator":
+        """Add the counts of another accumulator built with the same rules."""
+        self.number_of_values += other.number_of_values
+        self.number_not_in_range += other.number_not_in_range
+        return self
+
+    def metrics(self) -> dict:
+        """
+        Return the out-of-range shares of all the rows seen so far.
+
+        Returns:
+        - dict: `share_of_out_of_range_values` and `number_of_out_of_range_values` over all the rule columns, and
+          `by_column` with per column `left`, `right`, `number_of_values`, `number_not_in_range` and
+          `share_not_in_range`, the value of `TestShareOfOutRangeValues`.
+        """
+        by_column = {}
+        for i, name in enumerate(self.rules.index):
+            count, outside = int(self.number_of_values[i]), int(self.number_not_in_range[i])
+            by_column[name] = {
+                "left": float(self.left[i, 0]),
+                "right": float(self.right[i, 0]),
+                "number_of_values": count,
+                "number_not_in_range": outside,
+                "share_not_in_range": outside / count if count else 0.0,
+            }
+        total = int(self.number_of_values.sum())
+        return {
+            "share_of_out_of_range_values": int(self.number_not_in_range.sum()) / total if total else 0.0,
+            "number_of_out_of_range_values": int(self.number_not_in_range.sum()),
+            "by_column": by_column,
+        }
@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+from evidently.calculations.stattests import get_stattest
+from evidently.core import ColumnType
+
+from predictive.reference_profile import infer_column_type
+from predictive.stattest_planner import estimate_runtime
+
+
+def _encode(frame: pd.DataFrame, columns, column_types: dict, categories: dict) -> np.ndarray:
+    # Column-major float64 matrix: numerical columns as is, categorical columns as codes of `categories`, NaN if missing
+    values = np.full((len(columns), len(frame)), np.nan)
+    for i, name in enumerate(columns):
+        column = frame[name].replace([-np.inf, np.inf], np.nan)
+        if column_types[name] == "num":
+            values[i] = column.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            codes = pd.Index(categories[name]).get_indexer(column.astype(object))
+            values[i] = np.where(codes >= 0, codes, np.nan)
+    return values
+
+
+def _column_drift(reference_values, current_values, task) -> dict:
+    # Same steps as Evidently's get_one_column_drift: drop missing values, pick the stattest, run it
+    index, stattest, threshold, column_type = task
+    feature_type = ColumnType.Numerical if column_type == "num" else ColumnType.Categorical
+    reference = pd.Series(reference_values[index]).dropna()
+    current = pd.Series(current_values[index]).dropna()
+    drift_test_function = get_stattest(reference, current, feature_type, stattest)
+    drift_result = drift_test_function(reference, current, feature_type, threshold)
+    return {
+        "drift_score": float(drift_result.drift_score),
+        "drift_detected": bool(drift_result.drifted),
+        "stattest_name": drift_test_function.display_name,
+        "stattest_threshold": drift_result.actual_threshold,
+    }
+
+
+def _attach(name: str, shape: tuple, forked: bool):
+    block = shared_memory.SharedMemory(name=name)
+    if not forked:
+        # A spawned worker has its own resource tracker, which would remove the block the parent still owns
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block, np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+
+def _drift_worker(reference_block: tuple, current_block: tuple, tasks: list, forked: bool) -> list:
+    # Runs in a worker process: read the columns from shared memory instead of unpickled copies
+    reference_memory, reference_values = _attach(*reference_block, forked)
+    current_memory, current_values = _attach(*current_block, forked)
+    try:
+        return [_column_drift(reference_values, current_values, task) for task in tasks]
+    finally:
+        del reference_values, current_values
+        reference_memory.close()
+        current_memory.close()
+
+
+def _share(values: np.ndarray):
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=np.float64, buffer=block.buf)[:] = values
+    return block
+
+
+def balance_columns(costs: list, workers: int) -> list:
+    """
+    Split columns across workers so that every worker gets about the same total cost.
+
+    The columns are taken from the most to the least expensive and each one goes to the worker with the lowest
+    total so far (longest processing time first).
+
+    Parameters:
+    - costs (list): Estimated cost of each column.
+    - workers (int): Number of workers.
+
+    Returns:
+    - list: One list of column indices per worker, empty workers are left out.
+    """
+    loads = np.zeros(workers)
+    assignment = [[] for _ in range(workers)]
+    for index in np.argsort(costs, kind="stable")[::-1]:
+        worker = int(np.argmin(loads))
+        assignment[worker].append(int(index))
+        loads[worker] += costs[index]
+    return [indices for indices in assignment if indices]
+
+
+def parallel_drift(reference: pd.DataFrame, current: pd.DataFrame, columns=None, stattest=None, stattest_threshold: float = None, per_column_stattest: dict = None, workers: int = None) -> dict:
+    """
+    Run Evidently's per-column stattests on a pool of worker processes.
+
+    Every column is tested exactly like `DataDriftTable` does (same default stattest choice, same thresholds),
+    but the columns are spread across `workers` processes. The columns are encoded once into two shared memory
+    blocks (numerical values, categorical codes) that the workers read without copying, and they are assigned to
+    the workers by estimated runtime (see `estimate_runtime`) so that one slow test does not hold back
+    the others. With `workers=1` the same computation runs in the calling process, with identical results.
+
+    The pool uses the "fork" start method where available, so scripts without an `if __name__ == "__main__"`
+    guard can call it.
+
+    Parameters:
+    - reference (pd.DataFrame): Reference data.
+    - current (pd.DataFrame): Current data.
+    - columns (list, optional): Columns to test. Defaults to the columns of `reference` found in `current`.
+    - stattest (str, optional): Stattest of every column. Defaults to Evidently's choice per column.
+    - stattest_threshold (float, optional): Drift threshold. Defaults to the threshold of each stattest.
+    - per_column_stattest (dict, optional): Stattest of specific columns, e.g. `{"fnlwgt": "anderson"}`.
+    - workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+    - dict: Column name as key and, as value, a dict with `drift_score`, `drift_detected`, `stattest_name` and
+      `stattest_threshold`, the fields of Evidently's `drift_by_columns`.
+    """
+    if columns is None:
+        columns = [name for name in reference.columns if name in current.columns]
+    workers = workers or os.cpu_count()
+
+    column_types, categories, tasks, costs = {}, {}, [], []
+    for index, name in enumerate(columns):
+        finite = reference[name].replace([-np.inf, np.inf], np.nan).dropna()
+        column_types[name] = infer_column_type(name, reference[name], finite.nunique())
+        if column_types[name] == "cat":
+            categories[name] = pd.unique(pd.concat([finite, current[name].dropna()]).astype(object))
+        test = (per_column_stattest or {}).get(name, stattest)
+        tasks.append((index, test, stattest_threshold, column_types[name]))
+        costs.append(estimate_runtime(test or "ks", len(reference) + len(current)))
+
+    reference_values = _encode(reference, columns, column_types, categories)
+    current_values = _encode(current, columns, column_types, categories)
+
+    if workers == 1 or len(columns) < 2:
+        results = [_column_drift(reference_values, current_values, task) for task in tasks]
+        return dict(zip(columns, results))
+
+    reference_memory, current_memory = _share(reference_values), _share(current_values)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    results = [None] * len(columns)
+    try:
+        groups = balance_columns(costs, min(workers, len(columns)))
+        with ProcessPoolExecutor(max_workers=len(groups), mp_context=context) as pool:
+            futures = [
+                pool.submit(
+                    _drift_worker,
+                    (reference_memory.name, reference_values.shape),
+                    (current_memory.name, current_values.shape),
+                    [tasks[index] for index in group],
+                    context.get_start_method() == "fork",
+                )
+                for group in groups
+            ]
+            for group, future in zip(groups, futures):
+                for index, result in zip(group, future.result()):
+                    results[index] = result
+    finally:
+        reference_memory.close()
+        reference_memory.unlink()
+        current_memory.close()
+        current_memory.unlink()
+    return dict(zip(columns, results))
+
+
+def parallel_drift_scores(reference: pd.DataFrame, current: pd.DataFrame, columns=None, stattest=None, per_column_stattest: dict = None, workers: int = None) -> dict:
+    """Return the drift score per column of `parallel_drift`, like `EvidentlyResult.drift_scores`."""
+    drift_by_columns = parallel_drift(reference, current, columns=columns, stattest=stattest, per_column_stattest=per_column_stattest, workers=workers)
+    return {name: column["drift_score"] for name, column in drift_by_columns.items()}
@@ -0,0 +1,237 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Same limits as Evidently: integer columns with at most 5 values are categorical,
+# numerical columns with at most 20 values are binned by value instead of by histogram bins
+NUMBER_UNIQUE_AS_CATEGORICAL = 5
+NUMBER_UNIQUE_AS_DISCRETE = 20
+
+
+def infer_column_type(name: str, values: pd.Series, n_unique: int) -> str:
+    """
+    Infer the type of a column like Evidently's data definition does without a column mapping.
+
+    Booleans and non-numeric columns are categorical. Integer columns, and the "target" column, are categorical
+    when they have at most `NUMBER_UNIQUE_AS_CATEGORICAL` values. Every other numeric column is numerical.
+
+    Parameters:
+    - name (str): Column name, "target" is inferred like an integer column.
+    - values (pd.Series): Values of the column, only their dtype is read.
+    - n_unique (int): Number of distinct non-missing values of the column.
+
+    Returns:
+    - str: "num" or "cat".
+    """
+    if pd.api.types.is_bool_dtype(values) or not pd.api.types.is_numeric_dtype(values):
+        return "cat"
+    if pd.api.types.is_integer_dtype(values) or name == "target":
+        return "cat" if n_unique <= NUMBER_UNIQUE_AS_CATEGORICAL else "num"
+    return "num"
+
+
+def finite_values(values: pd.Series) -> pd.Series:
+    """Drop the missing and infinite values of a column, the values Evidently's stattests are computed on."""
+    return values.replace([-np.inf, np.inf], np.nan).dropna()
+
+
+def category_keys(values: pd.Series) -> pd.Series:
+    """
+    String keys of category values, the form in which profiles and sketches store their categories.
+
+    Numbers are keyed by value: integral values are written as integers, so an int column and the same column read
+    as float64 (e.g. a CSV chunk with a missing value) share the keys, "1" for both 1 and 1.0, like Evidently
+    matches them. Other values are keyed with `str`.
+
+    Parameters:
+    - values (pd.Series): Non-missing values of a column.
+
+    Returns:
+    - pd.Series: One string key per value, with the index of `values`.
+    """
+    if pd.api.types.is_bool_dtype(values) or not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_complex_dtype(values):
+        return values.astype(str)
+    numbers = values.to_numpy(dtype=float)
+    integral = (np.abs(numbers) < 2.0**53) & (numbers == np.floor(numbers))
+    keys = numbers.astype(str).astype(object)
+    keys[integral] = numbers[integral].astype(np.int64).astype(str)
+    return pd.Series(keys, index=values.index, dtype=object)
+
+
+def _sorted_quantiles(array: np.ndarray, n_quantiles: int) -> np.ndarray:
+    # Linear interpolation between order statistics, like np.quantile, without partitioning sorted data again
+    position = np.linspace(0, 1, n_quantiles) * (len(array) - 1)
+    low = np.floor(position).astype(np.intp)
+    high = np.minimum(low + 1, len(array) - 1)
+    return array[low] + (array[high] - array[low]) * (position - low)
+
+
+def profile_column(name: str, values: pd.Series, column_type: str = None, n_quantiles: int = 1001, keep_sorted: bool = False) -> dict:
+    """
+    Summarize one reference column.
+
+    Numerical values are sorted once; the number of unique values, the histogram counts, the quantiles and the
+    extremes are all read from the sorted array.
+
+    Parameters:
+    - name (str): Column name, used for the type inference of the target.
+    - values (pd.Series): Reference values.
+    - column_type (str, optional): "num" or "cat". Defaults to Evidently's type inference.
+    - n_quantiles (int): Number of evenly spaced quantiles kept for numerical columns. Defaults to 1001.
+    - keep_sorted (bool): Also keep the sorted values of numerical columns (`sorted`), for the exact ECDF tests
+      of `predictive.ecdf_drift`. Defaults to False.
+
+    Returns:
+    - dict: type, count (non-missing rows), missing, and either `edges` (histogram bin edges) or `categories`
+      (values as strings) with the matching `counts`. Numerical columns also keep `quantiles`, `min`, `max` and `std`.
+    """
+    finite = finite_values(values)
+    array = None
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        array = np.sort(finite.to_numpy(dtype=float))
+        n_unique = int(np.count_nonzero(np.diff(array))) + 1 if len(array) else 0
+    else:
+        n_unique = finite.nunique()
+    column_type = column_type or infer_column_type(name, values, n_unique)
+    if column_type == "num" and array is None:
+        array = np.sort(finite.to_numpy(dtype=float))
+    column = {"type": column_type, "count": len(finite), "missing": int(len(values) - len(finite))}
+
+    if column_type == "num" and n_unique > NUMBER_UNIQUE_AS_DISCRETE:
+        column["edges"] = np.histogram_bin_edges(array, bins="sturges")
+        positions = np.searchsorted(array, column["edges"], side="left")
+        # The last bin includes its right edge, the maximum
+        positions[-1] = len(array)
+        column["counts"] = np.diff(positions).astype(np.int64)
+    else:
+        counts = category_keys(finite).value_counts(sort=False).sort_index()
+        column["categories"] = counts.index.to_numpy(dtype=str)
+        column["counts"] = counts.to_numpy(dtype=np.int64)
+
+    if column_type == "num":
+        column["quantiles"] = _sorted_quantiles(array, n_quantiles) if len(array) else np.empty(0)
+        column["min"] = float(array[0]) if len(array) else None
+        column["max"] = float(array[-1]) if len(array) else None
+        column["std"] = float(array.std(ddof=1)) if len(array) > 1 else None
+        if keep_sorted:
+            column["sorted"] = array
+    return column
+
+
+def histogram_counts(column: dict, values) -> tuple:
+    """
+    Count current values in the bins of a profiled reference column.
+
+    Values below the first or above the last reference edge fall in the outer bins. Categories that are not in the
+    reference are appended with a reference count of 0, like Evidently does with the union of the categories.
+
+    Parameters:
+    - column (dict): Column profile from `profile_column`.
+    - values (array-like): Current values of the column.
+
+    Returns:
+    - tuple: `(reference_counts, current_counts)`, aligned int arrays.
+    """
+    values = finite_values(pd.Series(values))
+    if "edges" in column:
+        edges = column["edges"]
+        bins = np.clip(np.searchsorted(edges, values.to_numpy(dtype=float), side="right") - 1, 0, len(edges) - 2)
+        return column["counts"], np.bincount(bins, minlength=len(edges) - 1)
+
+    keys = category_keys(values).to_numpy(dtype=str)
+    codes = pd.Index(column["categories"]).get_indexer(keys)
+    new_categories = np.unique(keys[codes < 0])
+    codes[codes < 0] = len(column["categories"]) + np.searchsorted(new_categories, keys[codes < 0])
+    reference_counts = np.concatenate([column["counts"], np.zeros(len(new_categories), dtype=np.int64)])
+    return reference_counts, np.bincount(codes, minlength=len(reference_counts))
+
+
+class ReferenceProfile:
+    """
+    Precomputed summary of a reference dataset for drift detection.
+
+    Building the profile reads the reference once. It keeps, per column, the histogram bin edges and counts
+    (or the category counts) and a sorted quantile summary, optionally the fully sorted values, so drift against
+    any number of current windows only has to bin or sort the current data. The profile is saved to a compressed
+    `.npz` file and loaded back without pickling.
+
+    Numerical bins follow Evidently's `get_binned_data` (Sturges bins, value counts for columns with at most
+    20 values) but the edges are fixed on the reference alone, because the reference is not read again.
+    Evidently computes them on reference and current together, so binned scores can differ slightly.
+
+    Parameters:
+    - columns (dict): Column name as key and column profile (see `profile_column`) as value.
+    - version (str, optional): Label of the reference version the profile was built from.
+
+    Example:
+    profile = ReferenceProfile.build(reference, version="2024-06")
+    profile.save("reference_profile.npz")
+    profile = ReferenceProfile.load("reference_profile.npz")
+    """
+
+    def __init__(self, columns: dict, version: str = None):
+        self.columns = columns
+        self.version = version
+
+    @classmethod
+    def build(cls, reference: pd.DataFrame, columns=None, categorical_columns=None, numerical_columns=None, n_quantiles: int = 1001, version: str = None, keep_sorted: bool = False) -> "ReferenceProfile":
+        """
+        Profile the columns of a reference DataFrame.
+
+        Parameters:
+        - reference (pd.DataFrame): Reference data.
+        - columns (list, optional): Columns to profile. Defaults to every column.
+        - categorical_columns (list, optional): Columns forced to be categorical.
+        - numerical_columns (list, optional): Columns forced to be numerical.
+        - n_quantiles (int): Number of quantiles kept per numerical column. Defaults to 1001.
+        - version (str, optional): Label of the reference version.
+        - keep_sorted (bool): Keep the sorted values of numerical columns, so that the ECDF tests of
+          `predictive.ecdf_drift` are exact instead of read from the quantiles. Defaults to False.
+
+        Returns:
+        - ReferenceProfile: The profile.
+        """
+        forced = {
+            **dict.fromkeys(categorical_columns or [], "cat"),
+            **dict.fromkeys(numerical_columns or [], "num"),
+        }
+        columns = reference.columns if columns is None else columns
+        return cls(
+            {name: profile_column(name, reference[name], forced.get(name), n_quantiles, keep_sorted) for name in columns},
+            version=version,
+        )
+
+    def __contains__(self, name) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name) -> dict:
+        return self.columns[name]
+
+    def save(self, path: str):
+        """Write the profile to a compressed `.npz` file: arrays are stored as is, scalars in a JSON header."""
+        header = {"version": self.version, "columns": []}
+        arrays = {}
+        for i, (name, column) in enumerate(self.columns.items()):
+            scalars = {"name": name}
+            for key, value in column.items():
+                if isinstance(value, np.ndarray):
+                    arrays[f"{i}_{key}"] = value
+                    scalars.setdefault("arrays", []).append(key)
+                else:
+                    scalars[key] = value
+            header["columns"].append(scalars)
+        np.savez_compressed(path, header=np.array(json.dumps(header)), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ReferenceProfile":
+        """Read a profile written by `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            columns = {}
+            for i, scalars in enumerate(header["columns"]):
+                column = {key: value for key, value in scalars.items() if key not in ("name", "arrays")}
+                for key in scalars.get("arrays", []):
+                    column[key] = data[f"{i}_{key}"]
+                columns[scalars["name"]] = column
+        return cls(columns, version=header["version"])
@@ -0,0 +1,213 @@
+import numpy as np
+
+from predictive.classification_engine import chunk_columns
+from predictive.sketches import QuantileSketch
+
+# Percentiles reported by `RegressionAccumulator.error_percentiles`
+ERROR_PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+
+def compute_regression_metrics(target, prediction) -> dict:
+    """
+    Compute every regression metric of Evidently's `RegressionQualityMetric` from a single residual vector.
+
+    The residuals (prediction - target) are computed once and every metric is read from them, which replaces
+    one `TestSuite` run per metric. Rows where the target or the prediction is NaN or infinite are dropped first,
+    like Evidently does.
+
+    Parameters:
+    - target (array-like): True values.
+    - prediction (array-like): Predicted values.
+
+    Returns:
+    - dict: mean_error, mean_abs_error, mean_abs_perc_error (in percent), abs_error_max, rmse, r2_score, error_std,
+      abs_error_std and abs_perc_error_std, keyed like the `["result"]["current"]` section of `RegressionQualityMetric`.
+    """
+    target = np.asarray(target, dtype=float)
+    prediction = np.asarray(prediction, dtype=float)
+    finite = np.isfinite(target) & np.isfinite(prediction)
+    target = target[finite]
+    prediction = prediction[finite]
+
+    error = prediction - target
+    abs_error = np.abs(error)
+    abs_perc_error = abs_error / np.maximum(target, np.finfo(np.float64).eps)
+    squared_error_sum = np.dot(error, error)
+    centered_target = target - target.mean()
+    total_sum_of_squares = np.dot(centered_target, centered_target)
+    if total_sum_of_squares == 0:
+        # Constant target, sklearn's r2_score reports 1.0 for a perfect prediction and 0.0 otherwise
+        r2_score = 1.0 if squared_error_sum == 0 else 0.0
+    else:
+        r2_score = 1.0 - squared_error_sum / total_sum_of_squares
+
+    return {
+        "mean_error": float(error.mean()),
+        "mean_abs_error": float(abs_error.mean()),
+        "mean_abs_perc_error": float(100.0 * abs_perc_error.mean()),
+        "abs_error_max": float(abs_error.max()),
+        "rmse": float(np.sqrt(squared_error_sum / len(error))),
+        "r2_score": float(r2_score),
+        "error_std": float(np.std(error, ddof=1)),
+        "abs_error_std": float(np.std(abs_error, ddof=1)),
+        "abs_perc_error_std": float(np.std(abs_perc_error, ddof=1)),
+    }
+
+
+def _combine_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b) -> tuple:
+    # Chan et al. update: mean and sum of squared deviations of the union of two groups
+    count = count_a + count_b
+    if count_b == 0:
+        return count_a, mean_a, m2_a
+    delta = mean_b - mean_a
+    mean = mean_a + delta * count_b / count
+    m2 = m2_a + m2_b + delta * delta * count_a * count_b / count
+    return count, mean, m2
+
+
+class RegressionAccumulator:
+    """
+    Mergeable streaming state of the regression metrics.
+
+    Every chunk adds its count, its sums of errors, absolute errors and squared errors and its maximum absolute error,
+    and updates the Welford mean and M2 (sum of squared deviations) of the error and of the target, so the error
+    standard deviation and R² stay numerically stable over many chunks. The residuals and absolute residuals also go
+    into `QuantileSketch` t-digests for tail percentiles without keeping the residual arrays. Partial states filled by
+    several workers, e.g. one per Parquet partition, are combined with `merge`.
+
+    The metrics match `compute_regression_metrics` over all the rows seen so far, except MAPE which skips the rows
+    with a zero target (and divides by the absolute target) instead of dividing by machine epsilon.
+
+    Parameters:
+    - target (str): Name of the target column in DataFrame and Arrow chunks. Defaults to "target".
+    - prediction (str): Name of the prediction column in DataFrame and Arrow chunks. Defaults to "prediction".
+    - compression (int): Compression of the residual sketches. Defaults to 500.
+
+    Example:
+    accumulator = RegressionAccumulator()
+    accumulator.consume(iter_parquet_batches("predictions.parquet", ["target", "prediction"]))
+    metrics = accumulator.metrics()
+    """
+
+    def __init__(self, target: str = "target", prediction: str = "prediction", compression: int = 500):
+        self.target = target
+        self.prediction = prediction
+        self.count = 0
+        self.error_sum = 0.0
+        self.abs_error_sum = 0.0
+        self.squared_error_sum = 0.0
+        self.abs_error_max = 0.0
+        self.error_mean = 0.0
+        self.error_m2 = 0.0
+        self.target_mean = 0.0
+        self.target_m2 = 0.0
+        self.abs_perc_error_sum = 0.0
+        self.abs_perc_error_count = 0
+        self.error_sketch = QuantileSketch(compression)
+        self.abs_error_sketch = QuantileSketch(compression)
+
+    def update(self, target, prediction) -> "RegressionAccumulator":
+        """Add a chunk of true and predicted values, rows with a NaN or infinite value are dropped."""
+        target = np.asarray(target, dtype=float)
+        prediction = np.asarray(prediction, dtype=float)
+        finite = np.isfinite(target) & np.isfinite(prediction)
+        target, prediction = target[finite], prediction[finite]
+        if len(target) == 0:
+            return self
+
+        error = prediction - target
+        abs_error = np.abs(error)
+        nonzero = target != 0
+        chunk_error_mean = error.mean()
+        chunk_target_mean = target.mean()
+        count = self.count
+        _, self.error_mean, self.error_m2 = _combine_moments(
+            count, self.error_mean, self.error_m2,
+            len(error), chunk_error_mean, np.sum((error - chunk_error_mean) ** 2),
+        )
+        self.count, self.target_mean, self.target_m2 = _combine_moments(
+            count, self.target_mean, self.target_m2,
+            len(target), chunk_target_mean, np.sum((target - chunk_target_mean) ** 2),
+        )
+        self.error_sum += float(error.sum())
+        self.abs_error_sum += float(abs_error.sum())
+        self.squared_error_sum += float(np.dot(error, error))
+        self.abs_error_max = max(self.abs_error_max, float(abs_error.max()))
+        self.abs_perc_error_sum += float(np.sum(abs_error[nonzero] / np.abs(target[nonzero])))
+        self.abs_perc_error_count += int(nonzero.sum())
+        self.error_sketch.update(error)
+        self.abs_error_sketch.update(abs_error)
+        return self
+
+    def consume(self, chunks) -> "RegressionAccumulator":
+        """
+        Add every chunk of an iterable.
+
+        Chunks can be pandas DataFrames (e.g. `pd.read_csv(..., chunksize=...)`), pyarrow record batches
+        (e.g. `iter_parquet_batches`) or `(target, prediction)` tuples yielded by a generator.
+        """
+        for chunk in chunks:
+            target, prediction = chunk_columns(chunk, [self.target, self.prediction])[:2]
+            self.update(target, prediction)
+        return self
+
+    def merge(self, other: "RegressionAccumulator") -> "RegressionAccumulator":
+        """Add the state of another accumulator, e.g. one filled by another worker, into this one."""
+        count = self.count
+        _, self.error_mean, self.error_m2 = _combine_moments(
+            count, self.error_mean, self.error_m2, other.count, other.error_mean, other.error_m2,
+        )
+        self.count, self.target_mean, self.target_m2 = _combine_moments(
+            count, self.target_mean, self.target_m2, other.count, other.target_mean, other.target_m2,
+        )
+        self.error_sum += other.error_sum
+        self.abs_error_sum += other.abs_error_sum
+        self.squared_error_sum += other.squared_error_sum
+        self.abs_error_max = max(self.abs_error_max, other.abs_error_max)
+        self.abs_perc_error_sum += other.abs_perc_error_sum
+        self.abs_perc_error_count += other.abs_perc_error_count
+        self.error_sketch.merge(other.error_sketch)
+        self.abs_error_sketch.merge(other.abs_error_sketch)
+        return self
+
+    def metrics(self) -> dict:
+        """
+        Return mean_error, mean_abs_error, mean_abs_perc_error (in percent), abs_error_max, rmse, r2_score and
+        error_std of the rows seen so far, keyed like `compute_regression_metrics`. Undefined values are None.
+        """
+        if self.count == 0:
+            return dict.fromkeys(
+                ["mean_error", "mean_abs_error", "mean_abs_perc_error", "abs_error_max", "rmse", "r2_score", "error_std"]
+            )
+        if self.target_m2 == 0:
+            # Constant target, same convention as `compute_regression_metrics`
+            r2_score = 1.0 if self.squared_error_sum == 0 else 0.0
+        else:
+            r2_score = 1.0 - self.squared_error_sum / self.target_m2
+        return {
+            "mean_error": self.error_sum / self.count,
+            "mean_abs_error": self.abs_error_sum / self.count,
+            "mean_abs_perc_error": (
+                100.0 * self.abs_perc_error_sum / self.abs_perc_error_count if self.abs_perc_error_count else None
+            ),
+            "abs_error_max": self.abs_error_max,
+            "rmse": float(np.sqrt(self.squared_error_sum / self.count)),
+            "r2_score": float(r2_score),
+            "error_std": float(np.sqrt(self.error_m2 / (self.count - 1))) if self.count > 1 else None,
+        }
+
+    def error_percentiles(self) -> dict:
+        """
+        Return the p50, p90, p99 and p999 of the error and of the absolute error estimated by the residual sketches,
+        e.g. `error_p99` and `abs_error_p99`. Values are None before any row was added.
+        """
+        percentiles = {}
+        for name, sketch in (("error", self.error_sketch), ("abs_error", self.abs_error_sketch)):
+            values = sketch.quantile(list(ERROR_PERCENTILES.values()))
+            for i, suffix in enumerate(ERROR_PERCENTILES):
+                percentiles[f"{name}_{suffix}"] = None if values is None else float(values[i])
+        return percentiles
+
+    def sketches(self) -> dict:
+        """Serialize the residual sketches, they can be rebuilt and merged with `QuantileSketch.from_dict`."""
+        return {"error": self.error_sketch.to_dict(), "abs_error": self.abs_error_sketch.to_dict()}
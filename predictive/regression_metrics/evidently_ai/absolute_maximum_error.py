@@ -1,9 +1,15 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import pandas as pd
 import numpy as np
 from evidently.tests import TestValueAbsMaxError
 from evidently.test_suite import TestSuite
 from sklearn.linear_model import LinearRegression
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.regression_engine import RegressionAccumulator
 
 # Step 1: Fetching the dataset
 # Here we use the California Housing dataset from sklearn for demonstration purposes.
@@ -54,7 +60,20 @@ regression_report.run(reference_data=reference, current_data=current)
 
 # Step 8: Extracting the Absolute Maximum Error
 # Extracting the Absolute Maximum Error from the regression report.
-abs_max_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
+abs_max_error = EvidentlyResult(regression_report).test_value(0)
+
+# Step 9 (optional): Computing the Absolute Maximum Error over a stream of predictions
+# Each partition keeps its own accumulator and the maxima are combined with merge(), e.g. one accumulator per Parquet file.
+partition_accumulators = [
+    RegressionAccumulator().update(partition['target'], partition['prediction'])
+    for partition in (current.iloc[:2500], current.iloc[2500:])
+]
+regression_accumulator = RegressionAccumulator()
+for partition_accumulator in partition_accumulators:
+    regression_accumulator.merge(partition_accumulator)
+streaming_abs_max_error = regression_accumulator.metrics()["abs_error_max"]
+# The merged residual sketches also give the tail percentiles (p50, p90, p99, p999) of the absolute error
+abs_error_percentiles = {name: value for name, value in regression_accumulator.error_percentiles().items() if name.startswith("abs_")}
 
 
 """
@@ -88,5 +107,9 @@ abs_max_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
     8. **Extracting the Absolute Maximum Error**:
         - We extract the Absolute Maximum Error from the regression report. This value indicates the maximum error observed in the predictions.
 
+    9. **Streaming Absolute Maximum Error (optional)**:
+        - We fill one RegressionAccumulator per partition of the current data and merge them. The merged state gives the same maximum error without loading every partition at once.
+        - The accumulators also sketch the residuals, so the p50, p90, p99 and p999 of the absolute error are available in bounded memory.
+
     This guide provides a step-by-step walkthrough of how to use a regression model to make predictions and evaluate the model's performance using the Absolute Maximum Error metric. Customers can replace the dataset with their own data and follow the same steps to evaluate their models.
 """
@@ -1,8 +1,13 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import numpy as np
 from evidently.tests import TestValueMAE
 from evidently.test_suite import TestSuite
 from sklearn.linear_model import LinearRegression
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
 
 # Step 1: Fetching the dataset
 # Here, we use the California Housing dataset from sklearn for demonstration purposes.
@@ -54,7 +59,7 @@ regression_report.run(reference_data=reference, current_data=current)
 
 # Step 8: Extracting the MAE value
 # Extracting the computed MAE value from the regression report.
-mean_abs_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
+mean_abs_error = EvidentlyResult(regression_report).test_value(0)
 
 
 """
@@ -1,8 +1,13 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import numpy as np
 from evidently.tests import TestValueMAPE
 from evidently.test_suite import TestSuite
 from sklearn.linear_model import LinearRegression
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
 
 # Fetching the California housing dataset
 # This dataset is used for demonstration purposes
@@ -47,7 +52,7 @@ regression_report = TestSuite(tests=[TestValueMAPE()])
 regression_report.run(reference_data=reference, current_data=current)
 
 # Extracting the mean_absolute_percentage_error value from the report
-mean_abs_perc_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
+mean_abs_perc_error = EvidentlyResult(regression_report).test_value(0)
 
 
 """
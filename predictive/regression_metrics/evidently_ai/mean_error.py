@@ -1,8 +1,14 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import numpy as np
 from evidently.tests import TestValueMeanError
 from evidently.test_suite import TestSuite
 from sklearn.linear_model import LinearRegression
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.regression_engine import RegressionAccumulator
 
 # Fetching the California housing dataset
 dataset = datasets.fetch_california_housing(as_frame=True)
@@ -46,7 +52,14 @@ regression_report = TestSuite(tests=[TestValueMeanError()])
 regression_report.run(reference_data=reference, current_data=current)
 
 # Extracting the mean error value from the report
-mean_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
+mean_error = EvidentlyResult(regression_report).test_value(0)
+
+# Optional: Compute the mean error over a stream of predictions
+# The accumulator only keeps running sums, so the data can be read in chunks (or from Parquet with iter_parquet_batches).
+# Here the current dataset is split in two partitions, each filled chunk by chunk, and the partial states are merged.
+first_partition = RegressionAccumulator().consume(current.iloc[start:start + 500] for start in range(0, 2500, 500))
+second_partition = RegressionAccumulator().consume(current.iloc[start:start + 500] for start in range(2500, len(current), 500))
+streaming_mean_error = first_partition.merge(second_partition).metrics()["mean_error"]
 
 # Comprehensive guide and walkthrough of the file:
 '''
@@ -76,6 +89,10 @@ mean_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
         - Run the TestSuite with reference and current data.
         - Extract the mean error value from the report.
 
+    8. Optionally compute the same mean error with a RegressionAccumulator:
+        - Feed the current data in chunks, one accumulator per partition.
+        - Merge the partial states and read the mean error.
+
     Scenarios:
     - Historical data comparison: Use historical data as the reference dataset to monitor changes in new data.
     - Real-time monitoring: Continuously update the current dataset with new production data and compare it against the reference dataset.
@@ -1,8 +1,14 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import numpy as np
 from evidently.tests import TestValueR2Score
 from evidently.test_suite import TestSuite
 from sklearn.linear_model import LinearRegression
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.regression_engine import RegressionAccumulator
 
 # Fetching the California housing dataset
 dataset = datasets.fetch_california_housing(as_frame=True)
@@ -46,7 +52,14 @@ regression_report = TestSuite(tests=[TestValueR2Score()])
 regression_report.run(reference_data=reference, current_data=current)
 
 # Extracting the r_squared_score from the regression report
-r_squared_score = regression_report.as_dict()["tests"][0]["parameters"]["value"]
+r_squared_score = EvidentlyResult(regression_report).test_value(0)
+
+# Optional: Compute the R-squared score over a stream of predictions
+# R² needs the spread of the target, which the accumulator tracks with a Welford mean and M2 merged chunk by chunk.
+regression_accumulator = RegressionAccumulator().consume(
+    current.iloc[start:start + 500] for start in range(0, len(current), 500)
+)
+streaming_r_squared_score = regression_accumulator.metrics()["r2_score"]
 
 
 """
@@ -60,6 +73,8 @@ r_squared_score = regression_report.as_dict()["tests"][0]["parameters"]["value"]
     7. Predict the target values for both reference and current datasets using the trained model and add these predictions to the respective dataframes.
     8. Use Evidently AI's TestSuite to compute the R-squared score, which measures the goodness of fit of the regression model.
     9. Extract the R-squared score from the regression report and store it in the variable 'r_squared_score'.
+    10. Optionally compute the same R-squared score with a RegressionAccumulator fed in chunks, without holding the whole dataset in memory.
+
 
     This guide helps customers understand how to use their own data to compute the R-squared score for a regression model using Evidently AI and sklearn.
 """
@@ -1,3 +1,7 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import numpy as np
 from evidently.tests import TestValueRMSE
 from evidently.test_suite import TestSuite
@@ -5,6 +9,7 @@ from evidently.test_suite import TestSuite
 from sklearn.linear_model import LinearRegression
 
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
 
 # fetching the dataset
 dataset = datasets.fetch_california_housing(as_frame=True)
@@ -52,7 +57,7 @@ regression_report=TestSuite(
 regression_report.run(reference_data=reference, current_data=current)
 
 # getting the Root Mean Squared Error (RMSE)
-rmse=regression_report.as_dict()["tests"][0]["parameters"]["value"]
+rmse=EvidentlyResult(regression_report).test_value(0)
 
 """
     This script performs the following steps:
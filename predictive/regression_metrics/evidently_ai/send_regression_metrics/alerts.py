@@ -1,5 +1,8 @@
-def evaluate_metrics(metrics_dict):
+def evaluate_metrics(metrics_dict, confidence_intervals=None):
     # Define thresholds for each metric
+    # With a confidence interval, the level of the point estimate is kept and lowered by one step at most, when a
+    # bound of the interval falls in a less severe range: a value past a threshold inside a wide band reads one level
+    # lower, but a real degradation is still reported instead of the least severe level touched by the band.
     thresholds = {
         'r_square_error': {
             'acceptable': (0.75, 1.0),
@@ -64,10 +67,21 @@ def evaluate_metrics(metrics_dict):
             return 'HIGH RISK'
         
         return 'UNKNOWN'
+
+    risk_order = ['ACCEPTABLE', 'LOW RISK', 'MEDIUM RISK', 'HIGH RISK', 'UNKNOWN']
+
+    def get_interval_risk_level(metric_name, value, interval):
+        risk_level = get_risk_level(metric_name, value)
+        if risk_level == 'UNKNOWN':
+            return risk_level
+        level = risk_order.index(risk_level)
+        best = min(risk_order.index(get_risk_level(metric_name, bound)) for bound in (interval['lower'], interval['upper']))
+        return risk_order[level - 1] if best < level else risk_level
     
-    def print_alert(metric_name, value, risk_level):
-        alert = f"ALERT - {metric_name}: {value:.2f} - Risk Level: {risk_level}"
-        msg = f"MESSAGE - {metric_name}: {value:.2f} - works fine and is {risk_level}"
+    def print_alert(metric_name, value, risk_level, interval=None):
+        band = f" (CI {interval['lower']:.2f}-{interval['upper']:.2f})" if interval else ''
+        alert = f"ALERT - {metric_name}: {value:.2f}{band} - Risk Level: {risk_level}"
+        msg = f"MESSAGE - {metric_name}: {value:.2f}{band} - works fine and is {risk_level}"
         
         if risk_level == 'HIGH RISK':
             alert = "🔴 " + alert
@@ -82,13 +96,21 @@ def evaluate_metrics(metrics_dict):
     
     # Evaluate each metric
     for metric, value in metrics_dict.items():
-        risk_level = get_risk_level(metric, value)
-        print_alert(metric, value, risk_level)
+        interval = (confidence_intervals or {}).get(metric)
+        if interval and interval['lower'] is not None:
+            risk_level = get_interval_risk_level(metric, value, interval)
+            print_alert(metric, value, risk_level, interval)
+        else:
+            risk_level = get_risk_level(metric, value)
+            print_alert(metric, value, risk_level)
 
 """
     Evaluates regression metrics against predefined thresholds and prints alerts based on risk levels.
     Parameters:
     metrics_dict (dict): A dictionary where keys are metric names and values are the corresponding metric values.
+    confidence_intervals (dict, optional): Confidence interval per metric name, as a dict with `lower` and `upper` bounds
+    (see `get_regression_confidence_intervals`). When present, a metric keeps the risk level of its value, lowered by one
+    step at most when a bound of its interval falls in a less severe range, so sampling noise does not escalate alerts.
     The function performs the following steps:
     1. Defines thresholds for each metric, categorizing them into 'acceptable', 'low risk', 'medium risk', and 'high risk' levels.
     2. Defines a helper function `get_risk_level` to determine the risk level of a given metric value based on the predefined thresholds.
@@ -1,11 +1,13 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[4]))
+
 import pandas as pd
 import numpy as np
-from evidently.tests import *
-from evidently.metrics import RegressionQualityMetric
-from evidently.test_suite import TestSuite
 from sklearn.linear_model import LinearRegression
 from sklearn import datasets
-from evidently.report import Report
+from predictive.regression_engine import compute_regression_metrics, RegressionAccumulator
+from predictive.bootstrap import bootstrap_regression_metrics
 # Step 1: Fetching the dataset
 # Here we use the California Housing dataset from sklearn for demonstration purposes.
 dataset = datasets.fetch_california_housing(as_frame=True)
@@ -49,65 +51,28 @@ reference['prediction'] = model.predict(X_reference)
 current['prediction'] = model.predict(X_current)
 
 # Step 7: Getting the metrics
-# Computing the Absolute Maximum Error
-# Using Evidently AI's TestSuite to compute the Absolute Maximum Error between the reference and current datasets.
-regression_report = TestSuite(tests=[TestValueAbsMaxError()])
-regression_report.run(reference_data=reference, current_data=current)
-
-# Extracting the Absolute Maximum Error
-# Extracting the Absolute Maximum Error from the regression report 
-abs_max_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
-
-
-# We use the Evidently AI library to compute the MAE between the reference and current datasets.
-regression_report = TestSuite(tests=[TestValueMAE()])
-regression_report.run(reference_data=reference, current_data=current)
-
-# Extracting the MAE value
-# Extracting the computed MAE value from the regression report.
-mean_abs_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
-
-
-# Computing the mean_absolute_percentage_error using Evidently AI
-regression_report = TestSuite(tests=[TestValueMAPE()])
-regression_report.run(reference_data=reference, current_data=current)
-
-# Extracting the mean_absolute_percentage_error value from the report
-mean_abs_perc_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
-
-
-
-# Computing the mean error using Evidently AI's TestSuite
-regression_report = TestSuite(tests=[TestValueMeanError()])
-regression_report.run(reference_data=reference, current_data=current)
-
-# Extracting the mean error value from the report
-mean_error = regression_report.as_dict()["tests"][0]["parameters"]["value"]
-
-
-# Computing the r_squared_score using Evidently AI's TestSuite
-regression_report = TestSuite(tests=[TestValueR2Score()])
-regression_report.run(reference_data=reference, current_data=current)
-
-# Extracting the r_squared_score from the regression report
-r_squared_score = regression_report.as_dict()["tests"][0]["parameters"]["value"]
-
-
-# computing the Root Mean Squared Error (RMSE)
-regression_report=TestSuite(
-    tests=[TestValueRMSE()])
-regression_report.run(reference_data=reference, current_data=current)
-
-# getting the Root Mean Squared Error (RMSE)
-rmse=regression_report.as_dict()["tests"][0]["parameters"]["value"]
-
-
-# classification report containing the metrics R2 score, MAE, RMSE
-regression_report = Report(metrics=[RegressionQualityMetric()])
-regression_report.run(reference_data=reference, current_data=current)
+# Computing every regression metric of the current dataset with a single kernel.
+# The residuals are computed once instead of running one Evidently TestSuite per metric plus a RegressionQualityMetric report,
+# and the values are the same as Evidently's (TestValueAbsMaxError, TestValueMAE, TestValueMAPE, TestValueMeanError,
+# TestValueR2Score, TestValueRMSE and the error_std of RegressionQualityMetric).
+current_metrics = compute_regression_metrics(current['target'], current['prediction'])
+
+# Extracting the Absolute Maximum Error, MAE, MAPE and mean error
+abs_max_error = current_metrics["abs_error_max"]
+mean_abs_error = current_metrics["mean_abs_error"]
+mean_abs_perc_error = current_metrics["mean_abs_perc_error"]
+mean_error = current_metrics["mean_error"]
+
+# Extracting the r_squared_score and the Root Mean Squared Error (RMSE)
+r_squared_score = current_metrics["r2_score"]
+rmse = current_metrics["rmse"]
 
 # getting the standard deviation of error
-current_error_std=regression_report.as_dict()["metrics"][0]["result"]["current"]["error_std"]
+current_error_std = current_metrics["error_std"]
+
+# Tail percentiles of the error, estimated with bounded-memory sketches of the residuals
+current_accumulator = RegressionAccumulator().update(current['target'], current['prediction'])
+current_error_percentiles = current_accumulator.error_percentiles()
 
 
 def get_regression_results():
@@ -118,10 +83,42 @@ def get_regression_results():
         "absolute_maximum_error": abs_max_error,
         "root_mean_squared_error": rmse,
         "std_dev_error": current_error_std,
-        "mean_absolute_percentage_error": mean_abs_perc_error
+        "mean_absolute_percentage_error": mean_abs_perc_error,
     }
     return metrics
 
+def get_error_percentiles():
+    # Tail percentiles of the absolute error, sent apart from the thresholded metrics of get_regression_results()
+    return {
+        "absolute_error_p50": current_error_percentiles["abs_error_p50"],
+        "absolute_error_p90": current_error_percentiles["abs_error_p90"],
+        "absolute_error_p99": current_error_percentiles["abs_error_p99"],
+        "absolute_error_p999": current_error_percentiles["abs_error_p999"],
+    }
+
+def get_residual_sketches():
+    return current_accumulator.sketches()
+
+# Name of each entry of get_regression_results() in the bootstrap results
+metric_sources = {
+    "r_square_error": "r2_score",
+    "mean_absolute_error": "mean_abs_error",
+    "mean_error": "mean_error",
+    "absolute_maximum_error": "abs_error_max",
+    "root_mean_squared_error": "rmse",
+    "std_dev_error": "error_std",
+    "mean_absolute_percentage_error": "mean_abs_perc_error",
+}
+
+def get_regression_confidence_intervals(replicates=200, confidence=0.95):
+    intervals = bootstrap_regression_metrics(
+        current['target'], current['prediction'], replicates=replicates, confidence=confidence
+    )
+    return {
+        name: {bound: intervals[source][bound] for bound in ("lower", "upper")}
+        for name, source in metric_sources.items()
+    }
+
 """
     This script performs regression analysis on the California Housing dataset using Evidently AI for metric computation.
 
@@ -146,19 +143,24 @@ def get_regression_results():
         - Predictions are made for both reference and current datasets using the fitted model.
 
     7. **Getting the metrics**:
-        - Various regression metrics are computed using Evidently AI's TestSuite:
+        - All regression metrics are computed from a single residual vector with `compute_regression_metrics`:
             - Absolute Maximum Error
             - Mean Absolute Error (MAE)
             - Mean Absolute Percentage Error (MAPE)
             - Mean Error
             - R-Squared Score
             - Root Mean Squared Error (RMSE)
-        - The computed metrics are extracted.
-
-    8. **Generating a regression report**:
-        - A regression report containing metrics like R2 score, MAE, and RMSE is generated using Evidently AI's Report.
-        - The standard deviation of error is extracted.
-
-    9. **Function to get regression results**:
-        - `get_regression_results()`: Returns a dictionary containing all the computed regression metrics.
+            - Standard deviation of error
+        - The values match Evidently AI's regression tests and `RegressionQualityMetric` report.
+        - The p50, p90, p99 and p999 of the absolute error are estimated from t-digest sketches of the residuals.
+
+    8. **Function to get regression results**:
+        - `get_regression_results()`: Returns a dictionary containing the computed regression metrics that have alert
+          thresholds.
+        - `get_error_percentiles()`: Returns the p50, p90, p99 and p999 of the absolute error. They have no alert
+          thresholds and are sent under "error_percentiles".
+        - `get_regression_confidence_intervals()`: Returns bootstrap confidence intervals (`lower`, `upper`) for the
+          same metrics, computed in one vectorized pass with Poisson weights.
+        - `get_residual_sketches()`: Returns the serialized error and absolute error sketches, which can be merged with
+          the sketches of other shards to recompute the percentiles over all of them.
 """
\ No newline at end of file
@@ -1,10 +1,12 @@
 from utils import generate_performance_dict
 from datetime import datetime
-from all_metrics import get_regression_results
+from all_metrics import get_regression_results, get_error_percentiles, get_residual_sketches
 
 def fetch_regression_results() -> dict:
     try:
         data=get_regression_results()
+        data["error_percentiles"] = get_error_percentiles()
+        data["residual_sketches"] = get_residual_sketches()
 
         performance = generate_performance_dict(client_id="client_secret", metric_type="regression", created_at=datetime.utcnow().isoformat() + "Z", metric_id="string", name="string", type="string", description="string", source="string", data=data, collected_on="string", collected_by="string", authorized_user="string", test_mode=False)
         return performance
@@ -26,7 +28,9 @@ def fetch_regression_results() -> dict:
         RuntimeError: If there is an error fetching the regression results.
 
     Steps:
-    1. Call the `get_regression_results` function to retrieve regression data.
+    1. Call the `get_regression_results` function to retrieve regression data, add the absolute error percentiles
+       (`get_error_percentiles`) under "error_percentiles", and the serialized residual sketches
+       (`get_residual_sketches`) under "residual_sketches" so tail percentiles can be merged across shards.
     2. Generate a performance dictionary using the `generate_performance_dict` function with the following parameters:
         - client_id: "new_client105_evidently"
         - metric_type: "classification"
@@ -3,6 +3,7 @@ import requests
 from regression_metrics import fetch_regression_results
 
 from alerts import evaluate_metrics
+from all_metrics import get_regression_confidence_intervals
 
 def send_post_request(url, data, headers=None):
     response = requests.post(url, json=data, headers=headers)
@@ -18,8 +19,9 @@ payload = fetch_regression_results()
 
 response = send_post_request(url, payload)
 
-simplified_metrics = {key: value for key, value in payload["data"].items()}
-evaluate_metrics(simplified_metrics)
+# The error percentiles and the serialized residual sketches are nested dicts without alert thresholds
+simplified_metrics = {key: value for key, value in payload["data"].items() if not isinstance(value, dict)}
+evaluate_metrics(simplified_metrics, confidence_intervals=get_regression_confidence_intervals())
 """
     Sends a POST request to the specified URL with the given data and optional headers.
 
@@ -1,3 +1,7 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
 import numpy as np
 from evidently.report import Report
 from evidently.metrics import RegressionQualityMetric
@@ -5,6 +9,8 @@ from evidently.metrics import RegressionQualityMetric
 from sklearn.linear_model import LinearRegression
 
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult
+from predictive.regression_engine import RegressionAccumulator
 
 # fetching the dataset
 dataset = datasets.fetch_california_housing(as_frame=True)
@@ -51,7 +57,15 @@ regression_report = Report(metrics=[RegressionQualityMetric()])
 regression_report.run(reference_data=reference, current_data=current)
 
 # getting the standard deviation of error
-current_error_std=regression_report.as_dict()["metrics"][0]["result"]["current"]["error_std"]
+current_error_std=EvidentlyResult(regression_report).metric_value(0, "current", "error_std")
+
+# optional: standard deviation of error over a stream of predictions
+# the accumulator keeps a Welford mean and M2 of the error, so chunks (or Parquet batches) never need to be held together
+regression_accumulator = RegressionAccumulator()
+for start in range(0, len(current), 500):
+    chunk = current.iloc[start:start + 500]
+    regression_accumulator.update(chunk['target'], chunk['prediction'])
+streaming_error_std = regression_accumulator.metrics()["error_std"]
 
 """
     This script performs the following steps:
@@ -80,4 +94,6 @@ current_error_std=regression_report.as_dict()["metrics"][0]["result"]["current"]
     8. Generates a regression report containing metrics such as R2 score, MAE, and RMSE using evidently's Report and RegressionQualityMetric.
 
     9. Calculates the standard deviation of error for the current dataset and multiplies it by 100 to get the final value.
+
+    10. Optionally computes the same standard deviation of error with a RegressionAccumulator fed chunk by chunk.
 """
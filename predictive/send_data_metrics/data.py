@@ -1,11 +1,19 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
 from evidently.report import Report
 from evidently.metric_preset import *
 from evidently.test_suite import TestSuite
 from evidently.tests import *
 from evidently.metrics import *
-import re
 from sklearn.linear_model import LogisticRegression
 from sklearn import datasets
+from utils.evidently_results import EvidentlyResult, DataDriftResult
+from predictive.reference_profile import ReferenceProfile
+from predictive.drift_engine import profile_drift
+from predictive.integrity_engine import RangeRuleAccumulator, reference_ranges
+from predictive.duplicate_engine import duplicated_columns, row_overlap
 
 # Step 1: Fetch and prepare the dataset
 # Load the Adult dataset from OpenML
@@ -39,56 +47,30 @@ model.fit(X_reference, y_reference)
 reference['prediction'] = model.predict(X_reference)
 current['prediction'] = model.predict(X_current)
 
-# Step 2: Define scenarios for data drift analysis
-# Scenario 1: Using default parameters
-data_report = Report(
-    metrics=[
-        DataDriftPreset(),
-    ],
-)
-data_report.run(reference_data=reference, current_data=current)
-
-columns_drift_score={
-    column: float(data_report.as_dict()["metrics"][1]["result"]["drift_by_columns"][column]["drift_score"])
-    for column in reference.columns
-}
-
-data_drift_dataset_tests = TestSuite(tests=[
-    TestShareOfDriftedColumns(stattest="psi", lt=0.5),
-])
-
-# Step 5: Run the data drift test
-# We run the test on the first 100 rows of the production data against the reference data.
-data_drift_dataset_tests.run(reference_data=reference, current_data=current)
-
-# Step 6: Extract the share of drifted columns
-# We use a regular expression to extract the percentage of drifted columns from the test description.
-match = re.search(r'\b\d+(?:\.\d+)?\b', data_drift_dataset_tests.as_dict()["tests"][0]["description"])
-share_of_drifted_cols = float(match.group())
-
-
-# Scenario 2: Using a specific statistical test and threshold for target drift detection
-# Create a report to detect target drift using Population Stability Index (PSI)
-num_target_drift_report = Report(metrics=[
-    TargetDriftPreset(stattest="psi", stattest_threshold=0.5),
+# Step 2: Data drift analysis
+# Evidently runs the drift of every column once, with its default stattest per column (as DataDriftPreset does),
+# the meaning of "columns_drift_score" in the payload.
+data_drift_report = Report(metrics=[
+    DataDriftTable(),
 ])
+data_drift_report.run(reference_data=reference, current_data=current)
+columns_drift_score = DataDriftResult(data_drift_report).columns_drift_score(reference.columns)
 
-# Run the report on the reference and production datasets
-num_target_drift_report.run(reference_data=reference, current_data=current.iloc[0:1000, :])
+# The PSI drift of every column is scored from a profile of the reference (one vectorized pass over the current
+# data) instead of a second Evidently run. The share of drifted columns and the target drift both come from it.
+reference_profile = ReferenceProfile.build(reference)
+psi_drift = profile_drift(reference_profile, current, stattest="psi", columns=list(reference.columns))
 
-# Step 5: Extract and print the drift detection results
-# Extract relevant information from the report
-drift_score = float(num_target_drift_report.as_dict()["metrics"][0]["result"]["drift_score"])
-stattest_name = num_target_drift_report.as_dict()["metrics"][0]["result"]["stattest_name"]
-stattest_threshold = num_target_drift_report.as_dict()["metrics"][0]["result"]["stattest_threshold"]
-drift_detected = num_target_drift_report.as_dict()["metrics"][0]["result"]["drift_detected"]
+# Share of drifted columns, in percent, at the default PSI threshold
+share_of_drifted_cols = 100 * sum(column["drift_detected"] for column in psi_drift.values()) / len(psi_drift)
 
-# Create a dictionary to store the drift detection results
+# Target drift with a PSI threshold of 0.5
+target_psi = psi_drift["target"]["drift_score"]
 target_drift = {
-    "drift_detected": drift_detected,
-    "drift_score": drift_score,
-    "stattest_name": stattest_name,
-    "stattest_threshold": stattest_threshold
+    "drift_detected": target_psi >= 0.5,
+    "drift_score": target_psi,
+    "stattest_name": "PSI",
+    "stattest_threshold": 0.5,
 }
 
 missing_values_test = TestSuite(tests=[
@@ -104,30 +86,30 @@ missing_values_test = TestSuite(tests=[
 missing_values_test.run(reference_data=reference, current_data=current.iloc[:100, :])
 
 # Step 6: Extract test results
-# Converting the test results into a dictionary format for easier parsing and analysis.
-results_dict = missing_values_test.as_dict()
+# Wrapping the test suite so its results are converted into a dictionary only once.
+missing_values_result = EvidentlyResult(missing_values_test)
 
 # Step 7: Parse results into a structured dictionary
 # Summarizing the findings from the test suite into a report format.
 missing_values = {
-    "share_of_missing_values": float(results_dict["tests"][0]["parameters"]["value"]),
-    "number_of_missing_values": float(results_dict["tests"][1]["parameters"]["value"]),
-    "number_of_empty_rows": float(results_dict["tests"][2]["parameters"]["value"]),
-    "number_of_empty_columns": float(results_dict["tests"][3]["parameters"]["value"]),
+    "share_of_missing_values": missing_values_result.test_float(0),
+    "number_of_missing_values": missing_values_result.test_float(1),
+    "number_of_empty_rows": missing_values_result.test_float(2),
+    "number_of_empty_columns": missing_values_result.test_float(3),
 }
 
-# Step 4: Initialize a test suite for detecting Out of Range Values.
-# Pass the column name and the range of values to check for out-of-range values. If the range is not passed, values will be calculated from the reference datset
-share_of_out_of_range_values = TestSuite(tests=[
-    TestShareOfOutRangeValues(column_name="mean area", left=0, right=100) # optional: left and right  Compulsory: column_name
-])
+# Step 4: Define the out-of-range rules of every numerical feature
+# "mean area" keeps its explicit range, the other columns get the min and max of the reference data (the default range
+# of TestShareOfOutRangeValues). All the rules are checked in one vectorized pass instead of one test suite per column.
+range_rules = reference_ranges(reference_profile, rules={"mean area": (0, 100)})
 
-# Step 5: Run the test suite on the reference and production data
+# Step 5: Check the rules on the current data
 # Here, we are using the first 100 rows of the production data for the test.
-share_of_out_of_range_values.run(reference_data=reference, current_data=current.iloc[:100, :])
+out_of_range_result = RangeRuleAccumulator(range_rules).update(current.iloc[:100, :]).metrics()
 
-# Extracting the results from the test suite
-out_of_range_values = float(share_of_out_of_range_values.as_dict()["tests"][0]["parameters"]["value"])
+# Extracting the share of out-of-range values of "mean area", and of every checked column
+out_of_range_values = out_of_range_result["by_column"]["mean area"]["share_not_in_range"]
+out_of_range_by_column = {name: column["share_not_in_range"] for name, column in out_of_range_result["by_column"].items()}
 
 # Scenario 1: Create a report to detect correlations in the dataset
 # Create a correlation report using Evidently AI
@@ -138,7 +120,7 @@ correlation = Report(metrics=[
 correlation.run(reference_data=reference, current_data=current)
 
 # Get the maximum absolute Pearson correlation value from the report
-max_pearson_corr = float(correlation.as_dict()["metrics"][0]["result"]["current"]["stats"]["pearson"]["abs_max_correlation"])
+max_pearson_corr = EvidentlyResult(correlation).metric_float(0, "current", "stats", "pearson", "abs_max_correlation")
 
 # Scenario 2: Create a test suite to check the correlation between target and prediction
 # Create a test suite to check the correlation between the target variable and predictions
@@ -153,10 +135,11 @@ correlation_test.run(reference_data=reference, current_data=current)
 # Step 6: Extract correlation values from the report and test suite
 
 # Extract correlation values from the test suites
-t_p_cor = float(correlation_test.as_dict()["tests"][0]["parameters"]["value"])
-t_f_cor = float(correlation_test.as_dict()["tests"][1]["parameters"]["value"])
-p_f_cor = float(correlation_test.as_dict()["tests"][2]["parameters"]["value"])
-cor_change = float(correlation_test.as_dict()["tests"][3]["parameters"]["value"])
+correlation_test_result = EvidentlyResult(correlation_test)
+t_p_cor = correlation_test_result.test_float(0)
+t_f_cor = correlation_test_result.test_float(1)
+p_f_cor = correlation_test_result.test_float(2)
+cor_change = correlation_test_result.test_float(3)
 
 # Step 7: Store the correlation values in a dictionary
 correlation = {
@@ -167,12 +150,11 @@ correlation = {
     "correlation_change": cor_change
 }
 
-# Step 4: Define the tests for duplicated rows and columns
-# We are using Evidently AI's TestSuite to check for duplicated rows and columns.
+# Step 4: Define the test for duplicated rows
+# We are using Evidently AI's TestSuite to check for duplicated rows.
 duplicate_rows_cols = TestSuite(
     tests=[
-        TestNumberOfDuplicatedRows(),
-        TestNumberOfDuplicatedColumns()
+        TestNumberOfDuplicatedRows()
     ])
 
 # Step 5: Run the tests
@@ -180,15 +162,25 @@ duplicate_rows_cols = TestSuite(
 duplicate_rows_cols.run(reference_data=reference, current_data=current)
 
 # Step 6: Extract the results
-# Get the number of duplicated rows and columns from the test results.
-duplicated_rows = duplicate_rows_cols.as_dict()["tests"][0]["parameters"]["value"]
-duplicated_cols = duplicate_rows_cols.as_dict()["tests"][1]["parameters"]["value"]
+# Get the number of duplicated rows from the test results.
+duplicate_rows_cols_result = EvidentlyResult(duplicate_rows_cols)
+duplicated_rows = duplicate_rows_cols_result.test_value(0)
+
+# Duplicated columns are found from one content fingerprint per column instead of comparing every pair of columns.
+# The count is the number of equal column pairs, the value of TestNumberOfDuplicatedColumns.
+duplicated_cols = duplicated_columns(current)["number_of_duplicated_columns"]
+
+# Reference and current are sampled independently from the same dataset, so some rows can be in both (leakage).
+# The share of current rows also found in the reference is computed with a hash join on row fingerprints, without
+# merging the two datasets. The prediction column is left out, only the data columns identify a row.
+reference_overlap = row_overlap(reference, current, columns=list(dataset.columns))["share_of_overlapping_rows"]
 
 # Step 7: Create a dictionary to store the results
-# Store the number of duplicated rows and columns in a dictionary.
+# Store the number of duplicated rows and columns, and the reference overlap, in a dictionary.
 dup_rows_cols = {
     "duplicated_rows": duplicated_rows,
-    "duplicated_cols": duplicated_cols
+    "duplicated_cols": duplicated_cols,
+    "reference_overlap": reference_overlap
 }
 
 # Generate a report containing the feature importance for each column.
@@ -199,7 +191,7 @@ report = Report(metrics=[
 report.run(reference_data=reference, current_data=current)
 
 # Extract the feature importances from the report.
-original_fi = report.as_dict()["metrics"][0]['result']['current_fi']
+original_fi = EvidentlyResult(report).metric_value(0, "current_fi")
 
 # Arrange the feature importances in descending order.
 feature_importance = dict(sorted(
@@ -218,6 +210,7 @@ def get_data_metrics():
         "target_drift": target_drift,
         "missing_values": missing_values,
         "out_of_range_values": out_of_range_values,
+        "out_of_range_by_column": out_of_range_by_column,
         "dup_rows_cols": dup_rows_cols,
         "correlation": correlation,
         "feature_importance": feature_importance
@@ -236,16 +229,11 @@ def get_data_metrics():
         - Add predictions to both reference and current datasets.
 
     3. **Data Drift Analysis**:
-        - **Scenario 1**: Using default parameters to detect data drift.
-            - Create a data drift report using Evidently AI.
-            - Calculate and print the drift score for each column.
-            - Define and run a test suite to detect the share of drifted columns.
-            - Extract and print the share of drifted columns.
-
-        - **Scenario 2**: Using a specific statistical test (PSI) and threshold for target drift detection.
-            - Create a target drift report using Evidently AI.
-            - Run the report on the reference and current datasets.
-            - Extract and print the target drift detection results.
+        - Run a single `DataDriftTable` report with Evidently's default stattests for the drift score of each column.
+        - Score the Population Stability Index (PSI) of every column from a `ReferenceProfile` of the reference data
+          (`profile_drift`), without a second Evidently run, and derive from this one result:
+            - The share of drifted columns.
+            - The target drift, detected with a PSI threshold of 0.5.
 
     4. **Missing Values Analysis**:
         - Define a test suite to detect missing values.
@@ -253,9 +241,9 @@ def get_data_metrics():
         - Extract and print the missing values statistics.
 
     5. **Out of Range Values Analysis**:
-        - Define a test suite to detect out-of-range values for a specific column.
-        - Run the test suite on the reference and current datasets.
-        - Extract and print the share of out-of-range values.
+        - Build a range rule table for every numerical column: explicit bounds for `mean area`, reference min and max for the others.
+        - Check all the rules on the current data in one vectorized pass (`RangeRuleAccumulator`).
+        - Extract the share of out-of-range values of `mean area` and of every column; both are sent in the payload.
 
     6. **Correlation Analysis**:
         - **Scenario 1**: Create a report to detect correlations in the dataset.
@@ -268,8 +256,9 @@ def get_data_metrics():
             - Extract and print the correlation values.
 
     7. **Duplicated Rows and Columns Analysis**:
-        - Define a test suite to detect duplicated rows and columns.
-        - Run the test suite on the reference and current datasets.
+        - Define a test suite to detect duplicated rows and run it on the reference and current datasets.
+        - Count the duplicated columns from one content fingerprint per column (`duplicated_columns`).
+        - Measure the share of current rows that also appear in the reference data (`row_overlap`).
         - Extract and print the number of duplicated rows and columns.
 
     8. **Feature Importance Analysis**:
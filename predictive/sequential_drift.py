@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def sequential_drift_share(drift_function, columns, lt: float, priority: dict = None, batch_size: int = 1) -> dict:
+    """
+    Decide `share of drifted columns < lt`, like Evidently's `TestShareOfDriftedColumns(lt=...)`, scoring as few
+    columns as possible.
+
+    The columns are scored in priority order, `batch_size` at a time, and the scoring stops as soon as the outcome
+    is settled: the test fails once `drifted >= lt * n` whatever the remaining columns do, and passes once
+    `drifted + remaining < lt * n` even if every remaining column drifts. Putting the columns most likely to
+    drift first (feature importance, recent drift scores) settles failing tables early.
+
+    Parameters:
+    - drift_function (callable): Called as `drift_function(columns=batch)`, returns a `drift_by_columns` dict,
+      e.g. `functools.partial(profile_drift, profile, current, stattest="psi")` or `parallel_drift`.
+    - columns (list): Columns of the test, the share is over all of them.
+    - lt (float): Share of drifted columns under which the test passes.
+    - priority (dict, optional): Column name as key and priority as value, higher first. Columns without a
+      priority come last, in the order of `columns`.
+    - batch_size (int): Columns scored per call of `drift_function`. Defaults to 1.
+
+    Returns:
+    - dict: `passed`, `drift_by_columns` of the scored columns, `skipped_columns`, `number_of_columns`,
+      `number_of_drifted_columns` among the scored ones, and `share_of_drifted_columns` as a `(low, high)` range
+      of the shares still possible (a single value when no column was skipped).
+
+    Example:
+    gate = sequential_drift_share(partial(profile_drift, profile, current, stattest="psi"), columns, lt=0.5)
+    """
+    priority = priority or {}
+    order = sorted(range(len(columns)), key=lambda i: (-priority.get(columns[i], -np.inf), i))
+    ordered = [columns[i] for i in order]
+    limit = lt * len(columns)
+
+    drift_by_columns, drifted = {}, 0
+    for start in range(0, len(ordered), batch_size):
+        if drifted >= limit or drifted + len(ordered) - start < limit:
+            break
+        batch = ordered[start:start + batch_size]
+        result = drift_function(columns=batch)
+        drift_by_columns.update({name: result[name] for name in batch})
+        drifted += sum(bool(result[name]["drift_detected"]) for name in batch)
+
+    skipped_columns = [name for name in ordered if name not in drift_by_columns]
+    low, high = drifted / len(columns), (drifted + len(skipped_columns)) / len(columns)
+    return {
+        "passed": drifted < limit,
+        "drift_by_columns": drift_by_columns,
+        "skipped_columns": skipped_columns,
+        "number_of_columns": len(columns),
+        "number_of_drifted_columns": drifted,
+        "share_of_drifted_columns": low if low == high else (low, high),
+    }
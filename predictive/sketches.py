@@ -0,0 +1,303 @@
+import numpy as np
+import pandas as pd
+
+from predictive.reference_profile import category_keys
+
+
+class QuantileSketch:
+    """
+    Mergeable t-digest of a numeric stream, for quantiles in bounded memory.
+
+    Values are summarized by weighted centroids. Centroids near the median may absorb many values while the ones in
+    the tails stay small, so high percentiles such as p99 and p999 remain accurate. The number of centroids is about
+    `compression / 2` whatever the number of values added, and sketches of different shards combine with `merge`.
+
+    Parameters:
+    - compression (int): Size parameter of the digest, more centroids give more accurate quantiles. Defaults to 500,
+      which keeps the rank error of p999 within a few percent of the tail mass.
+
+    Example:
+    sketch = QuantileSketch()
+    for chunk in chunks:
+        sketch.update(chunk)
+    p99 = sketch.quantile(0.99)
+    """
+
+    def __init__(self, compression: int = 500):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _compress(self, means, weights):
+        # Merge neighbouring centroids whose cumulative weights fall in the same unit of the k1 scale function
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q_left = (cumulative - weights) / cumulative[-1]
+        k_left = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        starts = np.r_[0, np.flatnonzero(np.diff(np.floor(k_left))) + 1]
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def update(self, values) -> "QuantileSketch":
+        """Add a chunk of values, NaN and infinite values are ignored."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add the centroids of another sketch, e.g. one built on another shard, into this one."""
+        if len(other.weights):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.weights.sum())
+
+    def quantile(self, q):
+        """
+        Return the estimated quantile(s) of the values seen so far.
+
+        Parameters:
+        - q (float or array-like): Quantile(s) between 0 and 1.
+
+        Returns:
+        - float or np.ndarray: Estimated value(s), None if the sketch is empty.
+        """
+        if not len(self.weights):
+            return None
+        # Each centroid sits at the middle of its weight, the exact min and max anchor both ends
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, self.weights.sum()]
+        values = np.r_[self.min, self.means, self.max]
+        estimate = np.interp(np.asarray(q, dtype=float) * positions[-1], positions, values)
+        return float(estimate) if np.ndim(estimate) == 0 else estimate
+
+    def to_dict(self) -> dict:
+        """Serialize the sketch into plain JSON types, e.g. to send it in a metric payload."""
+        return {
+            "compression": self.compression,
+            "min": None if not len(self.weights) else self.min,
+            "max": None if not len(self.weights) else self.max,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "QuantileSketch":
+        """Rebuild a sketch serialized with `to_dict`."""
+        sketch = cls(compression=state["compression"])
+        sketch.means = np.asarray(state["means"], dtype=float)
+        sketch.weights = np.asarray(state["weights"], dtype=float)
+        if len(sketch.weights):
+            sketch.min, sketch.max = state["min"], state["max"]
+        return sketch
+
+
+def _category_counts(values) -> pd.Series:
+    # Counts of the non-missing values of a chunk, keyed with `category_keys` like the profile categories, so chunks
+    # of the same column read as int or as float64 count the same keys
+    values = pd.Series(np.asarray(values).ravel()).dropna()
+    return category_keys(values).value_counts(sort=False)
+
+
+class FrequentItems:
+    """
+    Mergeable Misra-Gries summary of the most frequent values of a categorical stream.
+
+    At most `capacity` counters are kept. When a chunk or a merge brings more values, the count of the
+    `capacity + 1`-th largest counter is subtracted from all of them and the counters that reach zero are dropped.
+    A kept count is therefore a lower bound of the true count, short by at most `error`, and any value more
+    frequent than `error` is kept.
+
+    Parameters:
+    - capacity (int): Number of counters kept. Defaults to 1000.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counters = pd.Series(dtype=float)
+        self.error = 0.0
+
+    def _reduce(self, counters: pd.Series):
+        if len(counters) > self.capacity:
+            cut = float(counters.nlargest(self.capacity + 1).iloc[-1])
+            counters = counters - cut
+            counters = counters[counters > 0]
+            self.error += cut
+        self.counters = counters
+
+    def update(self, values) -> "FrequentItems":
+        """Add a chunk of values, missing values are ignored."""
+        return self.add_counts(_category_counts(values))
+
+    def add_counts(self, counts: pd.Series) -> "FrequentItems":
+        """Add precomputed counts, a pd.Series of counts indexed by value."""
+        if len(counts):
+            self._reduce(self.counters.add(counts.astype(float), fill_value=0))
+        return self
+
+    def merge(self, other: "FrequentItems") -> "FrequentItems":
+        """Add the counters of another summary, the error bounds add up."""
+        self.error += other.error
+        return self.add_counts(other.counters)
+
+    def top(self, k: int) -> pd.Series:
+        """Return the `k` largest counters, as lower bounds of the true counts."""
+        return self.counters.nlargest(k)
+
+    def to_dict(self) -> dict:
+        """Serialize the summary into plain JSON types."""
+        return {
+            "capacity": self.capacity,
+            "error": self.error,
+            "values": self.counters.index.tolist(),
+            "counts": self.counters.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "FrequentItems":
+        """Rebuild a summary serialized with `to_dict`."""
+        summary = cls(capacity=state["capacity"])
+        summary.counters = pd.Series(state["counts"], index=pd.Index(state["values"], dtype=object), dtype=float)
+        summary.error = state["error"]
+        return summary
+
+
+class CountMinSketch:
+    """
+    Mergeable count-min sketch: approximate counts of any value in a fixed `depth x width` table.
+
+    Every value is hashed to one cell per row and the estimate is the smallest of its cells. Estimates never
+    undercount, and with probability `confidence` they overcount by at most `epsilon` times the number of values.
+
+    Parameters:
+    - width (int): Cells per row, `epsilon = e / width`. Defaults to 2719 (epsilon = 0.1%).
+    - depth (int): Number of rows, `confidence = 1 - exp(-depth)`. Defaults to 5 (99.3%).
+    - seed (int): Hash seed, sketches are only mergeable and comparable with the same width, depth and seed.
+    """
+
+    def __init__(self, width: int = 2719, depth: int = 5, seed: int = 0):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    @property
+    def epsilon(self) -> float:
+        return float(np.e / self.width)
+
+    @property
+    def confidence(self) -> float:
+        return float(1 - np.exp(-self.depth))
+
+    @property
+    def count(self) -> int:
+        return int(self.table[0].sum())
+
+    def _cells(self, keys) -> np.ndarray:
+        # Double hashing: the cell of row i is (h1 + i * h2) mod width, from one 64-bit hash per value
+        hashes = pd.util.hash_array(np.asarray(keys, dtype=object), hash_key=f"{self.seed:016d}"[-16:])
+        low, high = hashes & np.uint64(0xFFFFFFFF), (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((low + rows * high) % np.uint64(self.width)).astype(np.intp)
+
+    def update(self, values) -> "CountMinSketch":
+        """Add a chunk of values, missing values are ignored."""
+        return self.add_counts(_category_counts(values))
+
+    def add_counts(self, counts: pd.Series) -> "CountMinSketch":
+        """Add precomputed counts, a pd.Series of counts indexed by value."""
+        if len(counts):
+            cells = self._cells(counts.index.to_numpy(dtype=object)) + (np.arange(self.depth) * self.width)[:, None]
+            weights = np.broadcast_to(counts.to_numpy(dtype=float), cells.shape)
+            self.table += np.bincount(cells.ravel(), weights.ravel(), self.table.size).astype(np.int64).reshape(self.table.shape)
+        return self
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Add the table of another sketch built with the same width, depth and seed."""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Count-min sketches must share width, depth and seed to be merged")
+        self.table += other.table
+        return self
+
+    def estimate(self, values) -> np.ndarray:
+        """Estimated counts of `values`, keyed with `category_keys` like the counted values."""
+        keys = category_keys(pd.Series(np.asarray(values).ravel())).to_numpy(dtype=object)
+        if not len(keys):
+            return np.zeros(0, dtype=np.int64)
+        return np.take_along_axis(self.table, self._cells(keys), axis=1).min(axis=0)
+
+    def to_dict(self) -> dict:
+        """Serialize the sketch into plain JSON types."""
+        return {"width": self.width, "depth": self.depth, "seed": self.seed, "table": self.table.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "CountMinSketch":
+        """Rebuild a sketch serialized with `to_dict`."""
+        sketch = cls(width=state["width"], depth=state["depth"], seed=state["seed"])
+        sketch.table = np.asarray(state["table"], dtype=np.int64).reshape(sketch.depth, sketch.width)
+        return sketch
+
+
+class CategorySketch:
+    """
+    Bounded-memory summary of a high-cardinality categorical column for drift detection.
+
+    A `FrequentItems` summary finds the heavy hitters and a `CountMinSketch` estimates the count of any value,
+    so the memory per column is fixed whatever the number of distinct values (merchant IDs, URLs, ...).
+    Sketches of different shards or days combine with `merge`. See `predictive.drift_engine.sketch_drift`.
+
+    Parameters:
+    - capacity (int): Heavy-hitter counters kept. Defaults to 1000.
+    - width (int): Count-min cells per row. Defaults to 2719.
+    - depth (int): Count-min rows. Defaults to 5.
+    - seed (int): Count-min hash seed, equal for the sketches compared. Defaults to 0.
+
+    Example:
+    sketch = CategorySketch()
+    for chunk in chunks:
+        sketch.update(chunk["merchant_id"])
+    """
+
+    def __init__(self, capacity: int = 1000, width: int = 2719, depth: int = 5, seed: int = 0):
+        self.frequent = FrequentItems(capacity)
+        self.counts = CountMinSketch(width, depth, seed)
+
+    @property
+    def count(self) -> int:
+        return self.counts.count
+
+    def update(self, values) -> "CategorySketch":
+        """Add a chunk of values, missing values are ignored."""
+        counts = _category_counts(values)
+        self.frequent.add_counts(counts)
+        self.counts.add_counts(counts)
+        return self
+
+    def merge(self, other: "CategorySketch") -> "CategorySketch":
+        """Combine with the sketch of another shard."""
+        self.frequent.merge(other.frequent)
+        self.counts.merge(other.counts)
+        return self
+
+    def to_dict(self) -> dict:
+        """Serialize the sketch into plain JSON types."""
+        return {"frequent": self.frequent.to_dict(), "counts": self.counts.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "CategorySketch":
+        """Rebuild a sketch serialized with `to_dict`."""
+        sketch = cls()
+        sketch.frequent = FrequentItems.from_dict(state["frequent"])
+        sketch.counts = CountMinSketch.from_dict(state["counts"])
+        return sketch
@@ -0,0 +1,167 @@
+import heapq
+import time
+
+import numpy as np
+import pandas as pd
+from evidently.calculations.stattests import get_stattest
+from evidently.core import ColumnType
+
+from predictive.reference_profile import infer_column_type
+
+# Runtime of Evidently's stattests as `overhead + coefficient x size`, size being N log2 N for the tests that sort
+# the pooled sample and N for the ones that count values, N = reference + current values.
+# Measured on a single core, `calibrate_runtime_model` measures them on the host instead.
+RUNTIME_MODEL = {
+    "anderson": (1e-3, 19e-9, "nlogn"),
+    "cramer_von_mises": (1e-3, 7.5e-9, "nlogn"),
+    "ks": (1e-3, 18e-9, "nlogn"),
+    "wasserstein": (1e-3, 15e-9, "nlogn"),
+    "psi": (1e-3, 85e-9, "n"),
+    "chisquare": (2e-3, 60e-9, "n"),
+    "z": (2e-3, 540e-9, "n"),
+}
+
+# Candidate stattests from the most to the least sensitive. Anderson-Darling weighs the tails, Cramer-von Mises the
+# whole ECDF, KS only its largest gap; binned PSI loses everything within a bin. Z only applies to binary columns.
+SENSITIVITY_ORDER = {
+    "num": ["anderson", "cramer_von_mises", "ks", "wasserstein", "psi"],
+    "cat": ["chisquare", "z", "psi"],
+}
+
+
+def estimate_runtime(stattest: str, n_values: int, runtime_model: dict = None) -> float:
+    """
+    Estimate the runtime in seconds of a stattest on `n_values` reference and current values.
+
+    Stattests missing from the model are estimated like "ks".
+    """
+    runtime_model = runtime_model or RUNTIME_MODEL
+    overhead, coefficient, growth = runtime_model.get(stattest, runtime_model["ks"])
+    size = n_values * np.log2(max(n_values, 2)) if growth == "nlogn" else n_values
+    return overhead + coefficient * size
+
+
+def calibrate_runtime_model(sizes=(20_000, 200_000), random_state=0) -> dict:
+    """
+    Measure the stattests of `RUNTIME_MODEL` on synthetic data and fit their overhead and coefficient.
+
+    Parameters:
+    - sizes (tuple): Reference sizes to time, the current sample is a quarter of the reference. Defaults to (20,000, 200,000).
+    - random_state (int): Seed of the synthetic data.
+
+    Returns:
+    - dict: A runtime model with the same layout as `RUNTIME_MODEL`.
+    """
+    rng = np.random.default_rng(random_state)
+    model = {}
+    for stattest, (_, _, growth) in RUNTIME_MODEL.items():
+        feature_type = ColumnType.Numerical if stattest in SENSITIVITY_ORDER["num"] else ColumnType.Categorical
+        x, y = [], []
+        for n_reference in sizes:
+            n_current = max(n_reference // 4, 1)
+            if feature_type == ColumnType.Numerical:
+                reference, current = pd.Series(rng.normal(size=n_reference)), pd.Series(rng.normal(size=n_current))
+            else:
+                categories = ["a", "b"] if stattest == "z" else list("abcdefgh")
+                reference = pd.Series(rng.choice(categories, n_reference))
+                current = pd.Series(rng.choice(categories, n_current))
+            test = get_stattest(reference, current, feature_type, stattest)
+            start = time.perf_counter()
+            test(reference, current, feature_type, None)
+            n_values = n_reference + n_current
+            x.append(n_values * np.log2(n_values) if growth == "nlogn" else n_values)
+            y.append(time.perf_counter() - start)
+        coefficient, overhead = np.polyfit(x, y, 1)
+        model[stattest] = (max(float(overhead), 0.0), max(float(coefficient), 0.0), growth)
+    return model
+
+
+def plan_stattests(reference: pd.DataFrame, current: pd.DataFrame, budget_seconds: float, columns=None, runtime_model: dict = None) -> dict:
+    """
+    Pick for every column the most sensitive stattest that fits in a total latency budget, and explain the choice.
+
+    Each column starts with its cheapest candidate. The columns are then upgraded one sensitivity level at a time,
+    always applying the cheapest upgrade of all the columns first, as long as the estimated total runtime stays
+    within `budget_seconds`. Small columns therefore get Anderson-Darling, and the largest ones fall back to
+    cheaper tests when the current window grows.
+
+    Parameters:
+    - reference (pd.DataFrame): Reference data.
+    - current (pd.DataFrame): Current data.
+    - budget_seconds (float): Estimated runtime allowed for all the columns together.
+    - columns (list, optional): Columns to plan. Defaults to the columns of `reference` found in `current`.
+    - runtime_model (dict, optional): Runtime model, e.g. from `calibrate_runtime_model`. Defaults to `RUNTIME_MODEL`.
+
+    Returns:
+    - dict: Column name as key and, as value, a dict with `stattest`, `estimated_seconds`, `column_type`,
+      `n_values` and a human readable `explanation`.
+
+    Example:
+    plan = plan_stattests(reference, current, budget_seconds=2.0)
+    per_column_stattest = {column: choice["stattest"] for column, choice in plan.items()}
+    """
+    if columns is None:
+        columns = [name for name in reference.columns if name in current.columns]
+
+    candidates, levels = {}, {}
+    for name in columns:
+        reference_values, current_values = reference[name].dropna(), current[name].dropna()
+        n_unique = pd.concat([reference_values, current_values]).nunique()
+        column_type = infer_column_type(name, reference[name], reference_values.nunique())
+        n_values = len(reference_values) + len(current_values)
+        tests = [test for test in SENSITIVITY_ORDER[column_type] if test != "z" or n_unique <= 2]
+        candidates[name] = {
+            "column_type": column_type,
+            "n_values": n_values,
+            "tests": tests,
+            "seconds": [estimate_runtime(test, n_values, runtime_model) for test in tests],
+        }
+        # Start from the cheapest candidate, ties go to the most sensitive
+        levels[name] = int(np.argmin(candidates[name]["seconds"]))
+
+    total = sum(candidates[name]["seconds"][levels[name]] for name in columns)
+    upgrades = []
+
+    def push_upgrade(position, name):
+        # The column position breaks ties between equal costs, in the order of `columns`
+        level = levels[name]
+        if level > 0:
+            extra = candidates[name]["seconds"][level - 1] - candidates[name]["seconds"][level]
+            heapq.heappush(upgrades, (extra, position, name))
+
+    for position, name in enumerate(columns):
+        push_upgrade(position, name)
+    blocked = {}
+    while upgrades:
+        extra, position, name = heapq.heappop(upgrades)
+        if total + extra > budget_seconds:
+            blocked[name] = extra
+            continue
+        total += extra
+        levels[name] -= 1
+        push_upgrade(position, name)
+
+    plan = {}
+    for name in columns:
+        column = candidates[name]
+        level = levels[name]
+        test, seconds = column["tests"][level], column["seconds"][level]
+        estimate = f"{test} (est. {seconds * 1000:.1f} ms on {column['n_values']:,} values)"
+        if level == 0:
+            explanation = f"{estimate}: the most sensitive {'numerical' if column['column_type'] == 'num' else 'categorical'} test fits in the budget."
+        elif total > budget_seconds:
+            explanation = f"{estimate}: the cheapest test, the budget of {budget_seconds:g} s is exceeded even with the cheapest tests."
+        else:
+            better = column["tests"][level - 1]
+            explanation = (
+                f"{estimate}: {better} would add {blocked.get(name, 0.0) * 1000:.1f} ms, "
+                f"more than the {(budget_seconds - total) * 1000:.1f} ms left in the budget."
+            )
+        plan[name] = {
+            "stattest": test,
+            "estimated_seconds": seconds,
+            "column_type": column["column_type"],
+            "n_values": column["n_values"],
+            "explanation": explanation,
+        }
+    return plan
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from predictive.drift_engine import DEFAULT_THRESHOLDS, profile_drift
+from predictive.ecdf_drift import ECDF_TESTS, ecdf_drift
+from predictive.parallel_drift import parallel_drift
+
+
+def target_drift(current: pd.DataFrame, reference: pd.DataFrame = None, profile=None, target: str = "target", prediction: str = None, stattest: str = None, stattest_threshold: float = None) -> dict:
+    """
+    Test the distribution drift of the target, and optionally of the prediction, without the rest of
+    `TargetDriftPreset`.
+
+    The preset also computes target/feature correlations and per-feature behaviour that are not needed to read
+    `drift_score`, `stattest_name`, `stattest_threshold` and `drift_detected`. Here only the distribution test of
+    each column runs:
+    - with a `ReferenceProfile`, binned stattests ("psi", "kl_div", "jensenshannon") are scored from the profile
+      and ECDF stattests ("ks", "wasserstein", "anderson", "cramer_von_mises") from its sorted reference, so the
+      reference data is not read again;
+    - otherwise, or for other stattests, Evidently's test of the column runs on `reference`, with the same default
+      stattest choice as the preset.
+
+    Parameters:
+    - current (pd.DataFrame): Current data.
+    - reference (pd.DataFrame, optional): Reference data, required without a profile or for other stattests.
+    - profile (ReferenceProfile, optional): Cached profile of the reference data.
+    - target (str): Target column. Defaults to "target".
+    - prediction (str, optional): Prediction column to test as well.
+    - stattest (str, optional): Stattest of both columns. Defaults to Evidently's choice per column.
+    - stattest_threshold (float, optional): Drift threshold. Defaults to the threshold of the stattest.
+
+    Returns:
+    - dict: Column name as key and, as value, a dict with `drift_score`, `drift_detected`, `stattest_name` and
+      `stattest_threshold`.
+
+    Example:
+    drift = target_drift(current, profile=ReferenceProfile.load("reference_profile.npz"), stattest="psi")["target"]
+    """
+    columns = [target] + ([prediction] if prediction else [])
+    profiled = profile is not None and all(name in profile for name in columns)
+    if profiled and stattest in DEFAULT_THRESHOLDS:
+        return profile_drift(profile, current, stattest=stattest, stattest_threshold=stattest_threshold, columns=columns)
+    if profiled and stattest in ECDF_TESTS and all(profile[name]["type"] == "num" for name in columns):
+        return ecdf_drift(profile, current, stattest=stattest, stattest_threshold=stattest_threshold, columns=columns)
+    if reference is None:
+        raise ValueError(f"Stattest {stattest} needs the reference data or a profile of {columns}")
+    return parallel_drift(reference, current, columns=columns, stattest=stattest, stattest_threshold=stattest_threshold, workers=1)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from predictive.drift_engine import binned_drift_scores, count_layout, count_rows
+
+
+def window_bounds(timestamps, window, step=None) -> tuple:
+    """
+    Compute the row bounds of tumbling or sliding time windows over sorted timestamps.
+
+    Windows are `[end - window, end)`. The first one ends `window` after the first timestamp floored to `step`,
+    the next ones every `step`, up to the first window that contains the last timestamp.
+
+    Parameters:
+    - timestamps (pd.Series or pd.DatetimeIndex): Sorted timestamps.
+    - window (str or pd.Timedelta): Window length, e.g. "24h".
+    - step (str or pd.Timedelta, optional): Slide between two windows, e.g. "5min". Defaults to `window` (tumbling).
+
+    Returns:
+    - tuple: `(window_ends, first_rows, last_rows)`, row `i` of the sorted data being in window `k`
+      when `first_rows[k] <= i < last_rows[k]`.
+    """
+    window = pd.Timedelta(window)
+    step = window if step is None else pd.Timedelta(step)
+    timestamps = pd.DatetimeIndex(timestamps)
+    first_end = timestamps[0].floor(step) + window
+    n_windows = max(1, int(np.ceil((timestamps[-1] - first_end) / step + 1e-12)) + 1)
+    window_ends = first_end + step * np.arange(n_windows)
+    if window_ends[-1] <= timestamps[-1]:
+        window_ends = window_ends.append(pd.DatetimeIndex([window_ends[-1] + step]))
+    first_rows = timestamps.searchsorted(window_ends - window, side="left")
+    last_rows = timestamps.searchsorted(window_ends, side="left")
+    return window_ends, first_rows, last_rows
+
+
+def windowed_drift(profile, current: pd.DataFrame, timestamp_column: str, window, step=None, stattest: str = "psi", columns=None) -> pd.DataFrame:
+    """
+    Compute a drift score time series per column over tumbling or sliding windows of a time-indexed stream.
+
+    The current histograms are kept from one window to the next: the rows entering the window are added and the
+    rows leaving it are subtracted, so every row is binned twice at most, whatever the overlap of the windows.
+    Each window is then scored against the reference profile for all the columns at once.
+
+    Parameters:
+    - profile (ReferenceProfile): Profile of the reference data.
+    - current (pd.DataFrame): Current data with a timestamp column.
+    - timestamp_column (str): Name of the timestamp column.
+    - window (str or pd.Timedelta): Window length, e.g. "24h".
+    - step (str or pd.Timedelta, optional): Slide between two windows, e.g. "5min". Defaults to `window` (tumbling).
+    - stattest (str): "psi", "kl_div" or "jensenshannon". Defaults to "psi".
+    - columns (list, optional): Columns to score. Defaults to the profiled columns found in `current`.
+
+    Returns:
+    - pd.DataFrame: One row per window, indexed by the window end, with the drift score of every column.
+      Scores of empty windows are NaN.
+
+    Example:
+    scores = windowed_drift(profile, events, "timestamp", window="24h", step="5min")
+    """
+    if columns is None:
+        columns = [name for name in profile.columns if name in current.columns and name != timestamp_column]
+    current = current.sort_values(timestamp_column, kind="stable")
+    reference_counts, starts, categories = count_layout(profile, current, columns)
+    window_ends, first_rows, last_rows = window_bounds(current[timestamp_column], window, step)
+
+    def counts_of(first: int, last: int):
+        return count_rows(profile, current.iloc[first:last], columns, starts, categories)
+
+    counts = np.zeros(starts[-1], dtype=np.int64)
+    scores = np.full((len(window_ends), len(columns)), np.nan)
+    first, last = 0, 0
+    for k, (window_first, window_last) in enumerate(zip(first_rows, last_rows)):
+        if window_first >= last:
+            # No overlap with the previous window
+            counts = counts_of(window_first, window_last)
+        else:
+            counts += counts_of(last, window_last)
+            counts -= counts_of(first, window_first)
+        first, last = window_first, window_last
+        if window_last > window_first:
+            scores[k] = binned_drift_scores(reference_counts, counts, starts, stattest)
+    return pd.DataFrame(scores, index=pd.Index(window_ends, name="window_end"), columns=columns)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from predictive.drift_engine import profile_drift
+from predictive.reference_profile import ReferenceProfile, category_keys
+
+
+def test_category_keys_match_int_and_integral_float():
+    assert category_keys(pd.Series([0, 4])).tolist() == category_keys(pd.Series([0.0, 4.0])).tolist() == ["0", "4"]
+    assert category_keys(pd.Series([0.5, -0.0])).tolist() == ["0.5", "0"]
+    assert category_keys(pd.Series(["a", "1"])).tolist() == ["a", "1"]
+
+
+def test_int_reference_does_not_drift_against_float_current_with_missing_values():
+    rng = np.random.default_rng(0)
+    reference = pd.DataFrame({"code": rng.integers(0, 5, 2000)})
+    current = pd.DataFrame({"code": rng.integers(0, 5, 2000)})
+    float_current = current.astype(float)
+    float_current.loc[0, "code"] = np.nan
+    profile = ReferenceProfile.build(reference)
+
+    int_drift = profile_drift(profile, current, stattest="psi")["code"]
+    float_drift = profile_drift(profile, float_current, stattest="psi")["code"]
+    assert profile["code"]["categories"].tolist() == ["0", "1", "2", "3", "4"]
+    assert not float_drift["drift_detected"]
+    assert abs(float_drift["drift_score"] - int_drift["drift_score"]) < 1e-3
+
+
+def test_sketch_drift_matches_int_and_float_chunks():
+    from predictive.drift_engine import sketch_drift
+    from predictive.sketches import CategorySketch
+
+    rng = np.random.default_rng(1)
+    reference = rng.integers(0, 50, 5000)
+    current = rng.integers(0, 50, 5000)
+    float_current = current.astype(float)
+    float_current[0] = np.nan
+    reference_sketch = {"code": CategorySketch().update(reference)}
+
+    int_drift = sketch_drift(reference_sketch, {"code": CategorySketch().update(current)})["code"]
+    float_drift = sketch_drift(reference_sketch, {"code": CategorySketch().update(float_current)})["code"]
+    assert not float_drift["drift_detected"]
+    assert abs(float_drift["drift_score"] - int_drift["drift_score"]) < 1e-3
+    assert CategorySketch().update(current).counts.estimate([float(current[0])])[0] >= 1
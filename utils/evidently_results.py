@@ -0,0 +1,134 @@
+from functools import cached_property
+
+
+class EvidentlyResult:
+    """
+    Wrap a Report or TestSuite that has already been run, serialize it once and read values from the cached dictionary.
+
+    `as_dict()` rebuilds the whole nested result every time it is called, which is slow on wide datasets.
+    Every accessor of this class goes through the same cached dictionary instead.
+
+    Parameters:
+    - run (Report | TestSuite): An Evidently Report or TestSuite on which `run()` has been called.
+
+    Example:
+    result = EvidentlyResult(report)
+    accuracy = result.metric_float(0, "current", "accuracy")
+    """
+
+    def __init__(self, run):
+        self.run = run
+
+    @cached_property
+    def result(self) -> dict:
+        return self.run.as_dict()
+
+    def metric_result(self, index: int = 0) -> dict:
+        """Return the `result` section of the metric at `index` of a Report."""
+        return self.result["metrics"][index]["result"]
+
+    def metric_value(self, index: int, *path):
+        """Return the value found by following the keys in `path` inside the result of the metric at `index`."""
+        value = self.metric_result(index)
+        for key in path:
+            value = value[key]
+        return value
+
+    def metric_float(self, index: int, *path) -> float:
+        """Same as `metric_value`, converted to a float. None stays None."""
+        value = self.metric_value(index, *path)
+        return None if value is None else float(value)
+
+    def test(self, index: int = 0) -> dict:
+        """Return the test at `index` of a TestSuite."""
+        return self.result["tests"][index]
+
+    def test_value(self, index: int = 0):
+        """Return the `parameters.value` of the test at `index` of a TestSuite."""
+        return self.test(index)["parameters"]["value"]
+
+    def test_float(self, index: int = 0) -> float:
+        """Same as `test_value`, converted to a float. None stays None."""
+        value = self.test_value(index)
+        return None if value is None else float(value)
+
+    def test_description(self, index: int = 0) -> str:
+        """Return the human readable description of the test at `index` of a TestSuite."""
+        return self.test(index)["description"]
+
+    def drift_scores(self, index: int = 1, columns=None) -> dict:
+        """
+        Return the drift score per column of a `DataDriftTable` result.
+
+        Parameters:
+        - index (int): Position of the metric holding `drift_by_columns`. Defaults to 1, the table of `DataDriftPreset`.
+        - columns (list, optional): Columns to return, in this order. Defaults to every column of the result.
+
+        Returns:
+        - dict: Column name as key and drift score as float value.
+        """
+        drift_by_columns = self.metric_value(index, "drift_by_columns")
+        if columns is None:
+            columns = drift_by_columns.keys()
+        return {column: float(drift_by_columns[column]["drift_score"]) for column in columns}
+
+
+class DataDriftResult(EvidentlyResult):
+    """
+    Per-column drift computed once by a `DataDriftTable`, from which every drift figure of a payload is derived.
+
+    The column scores, the share of drifted columns and the drift of a single column (e.g. the target) are read
+    from the same result, instead of running `DataDriftPreset`, `TestShareOfDriftedColumns` and `TargetDriftPreset`
+    over the same data. The share is read as a number from the metric result rather than from a test description.
+
+    Parameters:
+    - run (Report): An Evidently Report on which `run()` has been called.
+    - index (int): Position of the `DataDriftTable` in the report. Defaults to 0.
+
+    Example:
+    report = Report(metrics=[DataDriftTable(stattest="psi")])
+    report.run(reference_data=reference, current_data=current)
+    drift = DataDriftResult(report)
+    share = drift.share_of_drifted_columns()
+    target_drift = drift.column_drift("target", stattest_threshold=0.5)
+    """
+
+    def __init__(self, run, index: int = 0):
+        super().__init__(run)
+        self.index = index
+
+    @property
+    def drift_by_columns(self) -> dict:
+        return self.metric_value(self.index, "drift_by_columns")
+
+    def columns_drift_score(self, columns=None) -> dict:
+        """Return the drift score per column, in the order of `columns` if given."""
+        return self.drift_scores(self.index, columns)
+
+    def share_of_drifted_columns(self) -> float:
+        """Return the share (between 0 and 1) of columns whose drift was detected."""
+        return self.metric_float(self.index, "share_of_drifted_columns")
+
+    def column_drift(self, column: str, stattest_threshold: float = None) -> dict:
+        """
+        Return the drift of one column like `ColumnDriftMetric` does.
+
+        Parameters:
+        - column (str): Column name, e.g. "target".
+        - stattest_threshold (float, optional): Threshold to detect the drift with instead of the one of the run.
+          Scores are compared as Evidently does for distances (drift when score >= threshold), use it only with
+          distance stattests such as PSI.
+
+        Returns:
+        - dict: drift_detected, drift_score, stattest_name and stattest_threshold.
+        """
+        result = self.drift_by_columns[column]
+        drift_score = float(result["drift_score"])
+        threshold = result["stattest_threshold"] if stattest_threshold is None else stattest_threshold
+        drift_detected = result["drift_detected"] if stattest_threshold is None else drift_score >= threshold
+        return {
+            "drift_detected": bool(drift_detected),
+            "drift_score": drift_score,
+            "stattest_name": result["stattest_name"],
+            "stattest_threshold": threshold,
+        }